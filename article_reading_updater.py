@@ -10,9 +10,21 @@
 
 import json
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from article_selection import (
+    EMPTY_STATS_CONDITION, LAST_FETCHED_COLUMN, count_fresh_articles, count_pufa_articles,
+    freshness_condition, get_fresh_since, iter_pufa_articles
+)
+from budget_planner import RefreshBudget
 from database import DatabaseManager
-from dsf_api_client import DSFApiClient
+from job_lease import REFRESH_LEASE, JobLease
+from reading_stats_writer import ReadingStatsWriter
+from refresh_schedule import RefreshSchedule
+from retry_queue import RetryQueue
+from metrics import start_exporter
+from run_history import RunRecorder
+from unavailable_cache import UnavailableCache, unavailable_condition
+from reading_summary import ReadingSummary
 from spider.log.utils import logger
 
 
@@ -38,19 +50,28 @@ class ArticleReadingUpdater:
             database=self.config.get('database', {}).get('database', 'faxuan')
         )
         
-        # 初始化API客户端
-        api_config = self.config.get('api', {})
-        self.api_client = DSFApiClient(
-            api_key=api_config.get('key', ''),
-            verify_code=api_config.get('verify_code', ''),
-            base_url=api_config.get('base_url', 'https://www.dajiala.com')
-        )
+        # API客户端第一次使用时创建（见 api_client）
+        self._api_client = None
         
         # 配置参数
         self.days_to_check = self.config.get('days_to_check', 7)  # 检查近7天
         self.batch_size = self.config.get('batch_size', 50)       # 批处理大小
         self.max_retries = self.config.get('max_retries', 3)      # 最大重试次数
+        self.page_size = self.config.get('page_size', 500)        # 分页查询每页行数
+        self.concurrency = self.config.get('concurrency', 5)      # 并发请求线程数
+        self.fresh_skipped = 0                                    # 本次因近期已刷新而跳过的文章数
+        self.lease = None                                         # 本次运行持有的刷新租约
+        self.history = None                                       # 本次运行的耗时记录
+        self.schedule = RefreshSchedule(self.config)              # 刷新时间表
         
+    @property
+    def api_client(self):
+        """第三方API客户端（第一次使用时创建，统计、检查等不调用API的命令不加载 requests）"""
+        if self._api_client is None:
+            from dsf_client_pool import create_api_client
+            self._api_client = create_api_client(self.config.get('api', {}))  # 配置了多个密钥时为客户端池
+        return self._api_client
+    
     def _load_config(self) -> Dict:
         """加载配置文件"""
         try:
@@ -80,12 +101,19 @@ class ArticleReadingUpdater:
             "api": {
                 "key": "your_api_key_here",
                 "verify_code": "",
-                "base_url": "https://www.dajiala.com"
+                "base_url": "https://www.dajiala.com",
+                "qps": 5
             },
             "days_to_check": 7,
             "batch_size": 50,
             "max_retries": 3,
-            "enabled": True
+            "page_size": 500,
+            "concurrency": 5,
+            "refresh_schedule": {"horizons_days": [1, 3, 6], "theme_end": True},
+            "freshness_hours": {"default": 12},
+            "unavailable_recheck_days": 30,
+            "enabled": True,
+            "summary_max_age_minutes": 60
         }
     
     def _save_config(self, config: Dict):
@@ -97,9 +125,54 @@ class ArticleReadingUpdater:
         except Exception as e:
             logger.error(f"配置文件保存失败: {e}")
     
+    def iter_articles_need_update(self, days: int = None, only_empty: bool = False) -> Iterator[Dict]:
+        """
+        逐页获取需要更新阅读量的普法文章
+        
+        Args:
+            days: 检查的天数，默认使用配置值
+            only_empty: 是否只获取阅读量为空的文章
+            
+        Yields:
+            Dict: 需要更新的文章
+        """
+        if days is None:
+            days = self.days_to_check
+        
+        # 计算时间范围
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+        
+        # 如果只获取阅读量为空的文章，添加额外条件
+        conditions = []
+        if only_empty:
+            conditions.append(EMPTY_STATS_CONDITION)
+        
+        # 跳过近期已经获取过阅读数据的文章
+        fresh_since = get_fresh_since(self.config, 'empty' if only_empty else 'default', end_date)
+        fresh_conditions, fresh_params = freshness_condition(fresh_since)
+        
+        # 排除永久不可用的文章（被删除、链接有误等）
+        available_conditions, available_params = unavailable_condition(self.config, end_date)
+        
+        # 在刷新之前统计跳过的文章（本次刷新过的文章随后也会变成"新鲜"的）
+        self._count_fresh_skipped(start_date, end_date, fresh_since,
+                                  conditions + available_conditions, available_params)
+        
+        count = 0
+        for article in iter_pufa_articles(self.db, start_date, end_date,
+                                          conditions + fresh_conditions + available_conditions,
+                                          fresh_params + available_params, page_size=self.page_size):
+            count += 1
+            yield article
+        
+        article_type = "阅读量为空的" if only_empty else ""
+        logger.info(f"查询到 {count} 篇需要更新{article_type}普法文章 "
+                   f"(时间范围: {start_date.strftime('%Y-%m-%d')} 到 {end_date.strftime('%Y-%m-%d')})")
+    
     def get_articles_need_update(self, days: int = None, only_empty: bool = False) -> List[Dict]:
         """
-        获取需要更新阅读量的普法文章
+        获取需要更新阅读量的普法文章（一次性返回列表，供预览使用）
         
         Args:
             days: 检查的天数，默认使用配置值
@@ -108,74 +181,112 @@ class ArticleReadingUpdater:
         Returns:
             List[Dict]: 需要更新的文章列表
         """
-        if days is None:
-            days = self.days_to_check
+        return list(self.iter_articles_need_update(days, only_empty))
+    
+    def iter_articles_for_specific_day(self, target_date: datetime) -> Iterator[Dict]:
+        """
+        逐页获取指定日期发布的普法文章
         
-        # 确保数据库连接有效
-        if not self.db.ensure_connection():
-            logger.error("数据库连接失败，无法查询文章")
-            return []
+        Args:
+            target_date: 目标日期
             
-        try:
-            with self.db.connection.cursor() as cursor:
-                # 计算时间范围
-                end_date = datetime.now()
-                start_date = end_date - timedelta(days=days)
-                
-                # 基础查询条件：
-                # 1. 是普法文章 (fx_education_articles.type_class = '1')
-                # 2. 在指定时间范围内
-                # 3. 有有效的文章URL
-                base_conditions = """
-                WHERE ea.type_class = '1'
-                  AND ar.publish_time >= %s
-                  AND ar.publish_time <= %s
-                  AND ar.article_url IS NOT NULL 
-                  AND ar.article_url != ''
-                """
-                
-                # 如果只获取阅读量为空的文章，添加额外条件
-                if only_empty:
-                    base_conditions += """
-                  AND (ar.view_count IS NULL 
-                       OR ar.likes IS NULL 
-                       OR ar.thumbs_count IS NULL)
-                    """
-                
-                sql = f"""
-                SELECT 
-                    ar.id,
-                    ar.article_id,
-                    ar.article_title,
-                    ar.article_url,
-                    ar.publish_time,
-                    ar.unit_name,
-                    ar.view_count,
-                    ar.likes,
-                    ar.thumbs_count,
-                    ea.type_class
-                FROM fx_article_records ar
-                INNER JOIN fx_education_articles ea ON ar.article_id = ea.article_id
-                {base_conditions}
-                ORDER BY ar.publish_time DESC
-                """
-                
-                cursor.execute(sql, (start_date, end_date))
-                articles = cursor.fetchall()
-                
-                article_type = "阅读量为空的" if only_empty else ""
-                logger.info(f"查询到 {len(articles)} 篇需要更新{article_type}普法文章 "
-                           f"(时间范围: {start_date.strftime('%Y-%m-%d')} 到 {end_date.strftime('%Y-%m-%d')})")
-                
-                return articles
-                
-        except Exception as e:
-            logger.error(f"查询需要更新的文章时出错: {e}")
-            return []
+        Yields:
+            Dict: 该日期发布的文章
+        """
+        # 计算当天的开始和结束时间
+        day_start = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        day_end = target_date.replace(hour=23, minute=59, second=59, microsecond=999999)
+        
+        # 跳过近期已经获取过阅读数据的文章
+        now = datetime.now()
+        fresh_since = get_fresh_since(self.config, f"day_{(now.date() - target_date.date()).days}", now)
+        fresh_conditions, fresh_params = freshness_condition(fresh_since)
+        
+        # 排除永久不可用的文章（被删除、链接有误等）
+        available_conditions, available_params = unavailable_condition(self.config, now)
+        
+        # 在刷新之前统计跳过的文章（本次刷新过的文章随后也会变成"新鲜"的）
+        self._count_fresh_skipped(day_start, day_end, fresh_since, available_conditions, available_params)
+        
+        count = 0
+        for article in iter_pufa_articles(self.db, day_start, day_end, fresh_conditions + available_conditions,
+                                          fresh_params + available_params, page_size=self.page_size):
+            count += 1
+            yield article
+        
+        logger.info(f"查询到 {count} 篇需要更新的普法文章 "
+                   f"(发布日期: {target_date.strftime('%Y-%m-%d')})")
+    
+    def _count_fresh_skipped(self, start_date: datetime, end_date: datetime, fresh_since: Optional[datetime],
+                             conditions: List[str] = None, params: List = None):
+        """
+        统计并记录因近期已刷新而跳过的文章数量（在开始刷新之前调用）
+        
+        Args:
+            start_date: 发布时间下界
+            end_date: 发布时间上界
+            fresh_since: 新鲜度截止时间，为空时不统计
+            conditions: 规则本身的查询条件（含排除不可用文章的条件）
+            params: 查询条件的参数
+        """
+        skipped = count_fresh_articles(self.db, start_date, end_date, fresh_since, conditions or [], params or [])
+        if skipped:
+            self.fresh_skipped += skipped
+            logger.info(f"跳过 {skipped} 篇 {fresh_since.strftime('%Y-%m-%d %H:%M')} 之后已刷新的文章")
+    
+    def iter_work_set(self, rules: List[Dict]) -> Iterator[Dict]:
+        """
+        按刷新规则逐页获取去重后的待刷新文章
+        
+        各规则合并为一条 OR 查询，时间范围取所有规则的并集，
+        每篇文章只返回一次，命中的规则名称放在 article['rules'] 中
+        
+        Args:
+            rules: 规则列表（RefreshSchedule.build_rules 生成）
+            
+        Yields:
+            Dict: 待刷新的文章
+        """
+        if not rules:
+            return
+        
+        condition, params = self.schedule.rules_condition(rules)
+        available_conditions, available_params = unavailable_condition(self.config)
+        start_time, end_time = self.schedule.window(rules)
+        
+        for article in iter_pufa_articles(self.db, start_time, end_time,
+                                          [condition] + available_conditions, params + available_params,
+                                          extra_columns=[LAST_FETCHED_COLUMN],
+                                          page_size=self.page_size):
+            article['rules'] = self.schedule.match_rules(article, rules)
+            yield article
+    
+    def count_fresh_skipped(self, rules: List[Dict]) -> int:
+        """
+        统计因新鲜度被跳过的文章数量（命中某条规则的时间和数据条件，但不满足任何一条完整规则）
+        
+        Args:
+            rules: 规则列表
+            
+        Returns:
+            int: 跳过的文章数量（去重）
+        """
+        if not any(rule.get('fresh_since') for rule in rules):
+            return 0
+        
+        base_condition, base_params = self.schedule.rules_condition(rules, with_freshness=False)
+        full_condition, full_params = self.schedule.rules_condition(rules)
+        available_conditions, available_params = unavailable_condition(self.config)
+        start_time, end_time = self.schedule.window(rules)
+        return count_pufa_articles(
+            self.db, start_time, end_time,
+            [base_condition, f"NOT {full_condition}"] + available_conditions,
+            base_params + full_params + available_params
+        )
     
     def get_articles_for_specific_day(self, target_date: datetime) -> List[Dict]:
         """
-        获取指定日期发布的普法文章
+        获取指定日期发布的普法文章（一次性返回列表，供预览使用）
         
         Args:
             target_date: 目标日期
@@ -183,68 +294,21 @@ class ArticleReadingUpdater:
         Returns:
             List[Dict]: 该日期发布的文章列表
         """
-        # 确保数据库连接有效
-        if not self.db.ensure_connection():
-            logger.error("数据库连接失败，无法查询文章")
-            return []
-            
-        try:
-            with self.db.connection.cursor() as cursor:
-                # 计算当天的开始和结束时间
-                day_start = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
-                day_end = target_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-                
-                # 查询条件：
-                # 1. 是普法文章 (fx_education_articles.type_class = '1')
-                # 2. 发布时间在目标日期当天
-                # 3. 有有效的文章URL
-                sql = """
-                SELECT 
-                    ar.id,
-                    ar.article_id,
-                    ar.article_title,
-                    ar.article_url,
-                    ar.publish_time,
-                    ar.unit_name,
-                    ar.view_count,
-                    ar.likes,
-                    ar.thumbs_count,
-                    ea.type_class
-                FROM fx_article_records ar
-                INNER JOIN fx_education_articles ea ON ar.article_id = ea.article_id
-                WHERE ea.type_class = '1'
-                  AND ar.publish_time >= %s
-                  AND ar.publish_time <= %s
-                  AND ar.article_url IS NOT NULL 
-                  AND ar.article_url != ''
-                ORDER BY ar.publish_time DESC
-                """
-                
-                cursor.execute(sql, (day_start, day_end))
-                articles = cursor.fetchall()
-                
-                logger.info(f"查询到 {len(articles)} 篇需要更新的普法文章 "
-                           f"(发布日期: {target_date.strftime('%Y-%m-%d')})")
-                
-                return articles
-                
-        except Exception as e:
-            logger.error(f"查询指定日期文章时出错: {e}")
-            return []
+        return list(self.iter_articles_for_specific_day(target_date))
     
-    def update_article_reading_data(self, article: Dict) -> bool:
+    def update_article_reading_data(self, article: Dict, writer: ReadingStatsWriter = None) -> bool:
         """
         更新单篇文章的阅读量数据
         
         Args:
             article: 文章信息字典
+            writer: 批量写入器，为空时立即写入这一篇
             
         Returns:
-            bool: 更新成功返回True
+            bool: 获取数据成功返回True（数值无变化时不写入数据库）
         """
         try:
             article_url = article['article_url']
-            article_id = article['article_id']
             article_title = article.get('article_title', '无标题')
             
             logger.info(f"更新文章阅读数据: {article_title[:50]}...")
@@ -256,82 +320,80 @@ class ArticleReadingUpdater:
                 logger.warning(f"获取文章数据失败: {error}")
                 return False
             
-            # 确保数据库连接有效
-            if not self.db.ensure_connection():
-                logger.error("数据库连接失败，无法更新文章数据")
-                return False
+            # 交给写入器批量写入（阅读量 -> view_count，在看量 -> likes，点赞量 -> thumbs_count）
+            single_writer = writer is None
+            if single_writer:
+                writer = self._create_writer()
             
-            # 更新数据库
-            with self.db.connection.cursor() as cursor:
-                sql = """
-                UPDATE fx_article_records 
-                SET view_count = %s,
-                    likes = %s,
-                    thumbs_count = %s,
-                    update_time = %s
-                WHERE article_id = %s
-                """
-                
-                current_time = datetime.now()
-                values = (
-                    stats['read'],      # 阅读量 -> view_count
-                    stats['looking'],   # 在看量 -> likes
-                    stats['zan'],       # 点赞量 -> thumbs_count
-                    current_time,       # 更新时间
-                    article_id          # 文章ID
-                )
-                
-                cursor.execute(sql, values)
-                self.db.connection.commit()
-                
-                logger.success(f"文章数据更新成功: {article_title[:50]} - "
-                             f"阅读:{stats['read']} 在看:{stats['looking']} 点赞:{stats['zan']}")
-                
-                return True
+            writer.add(article, stats)
+            
+            if single_writer:
+                counts = writer.finish()
+                if counts['failed']:
+                    return False
+            
+            logger.success(f"文章数据获取成功: {article_title[:50]} - "
+                         f"阅读:{stats['read']} 在看:{stats['looking']} 点赞:{stats['zan']}")
+            return True
                 
         except Exception as e:
             logger.error(f"更新文章数据时出错: {e}")
-            if self.db.connection:
-                self.db.connection.rollback()
             return False
     
-    def batch_update_articles(self, articles: List[Dict]) -> Tuple[int, int]:
+    def _create_writer(self) -> ReadingStatsWriter:
+        """创建阅读数据批量写入器"""
+        return ReadingStatsWriter(
+            self.db,
+            chunk_size=self.batch_size,
+            summary_max_age_minutes=self.config.get('summary_max_age_minutes', 60)
+        )
+    
+    def _create_retry_queue(self) -> RetryQueue:
+        """创建失败重试队列"""
+        return RetryQueue(self.db, self.max_retries, self.config.get('retry_backoff_seconds'))
+    
+    def _create_budget(self, source: str = 'article') -> RefreshBudget:
+        """创建刷新预算（配置项 budget，未配置时只记录消费），source 为消费记录的来源"""
+        return RefreshBudget(self.db, self.api_client, self.config.get('budget'), source)
+    
+    def _lease_lost(self) -> Optional[str]:
+        """刷新租约已丢失时返回停止原因 lease_lost（被其他节点接管时停止发起新请求）"""
+        return 'lease_lost' if self.lease is not None and self.lease.lost else None
+    
+    def batch_update_articles(self, articles: Iterable[Dict]) -> Tuple[int, int]:
         """
         批量更新文章阅读量数据
         
+        并发调用API（共用QPS令牌桶），结果按到达顺序批量写入数据库；
+        临时性错误加入重试队列，处理完后重试已到期的条目
+        
         Args:
-            articles: 文章列表
+            articles: 文章列表或逐页产生文章的生成器
             
         Returns:
             Tuple[int, int]: (成功数量, 总数量)
         """
-        if not articles:
-            logger.info("没有需要更新的文章")
-            return 0, 0
+        logger.info(f"开始批量更新文章的阅读量 (并发数: {self.concurrency})...")
         
-        total_count = len(articles)
-        success_count = 0
+        from refresh_pipeline import RefreshPipeline
+        pipeline = RefreshPipeline(self.api_client, self._create_writer(), self.concurrency,
+                                   self._create_retry_queue(), UnavailableCache(self.db),
+                                   should_stop=self._lease_lost, history=self.history,
+                                   budget=self._create_budget())
+        result = pipeline.run(articles)
         
-        logger.info(f"开始批量更新 {total_count} 篇文章的阅读量...")
+        if result['aborted']:
+            logger.error(f"批量更新因API致命错误中止: {result['aborted']}")
         
-        for i, article in enumerate(articles, 1):
-            try:
-                logger.info(f"处理进度: {i}/{total_count}")
-                
-                # 更新文章数据
-                if self.update_article_reading_data(article):
-                    success_count += 1
-                
-                # 进度提示
-                if i % 10 == 0:
-                    logger.info(f"已处理 {i}/{total_count} 篇，成功 {success_count} 篇")
-                
-            except Exception as e:
-                logger.error(f"处理第 {i} 篇文章时出错: {e}")
-                continue
+        if result['total'] == 0 and result['retried'] == 0:
+            logger.info("没有需要更新的文章")
+            return 0, 0
         
-        logger.info(f"批量更新完成: 成功 {success_count}/{total_count} 篇")
-        return success_count, total_count
+        logger.info(f"批量更新完成: 成功 {result['success']}/{result['total']} 篇 "
+                   f"(写入 {result['written']} 篇，数值无变化跳过 {result['unchanged']} 篇，"
+                   f"加入重试队列 {result['queued']} 篇，重试成功 {result['retry_success']}/{result['retried']} 篇，"
+                   f"新发现不可用 {result['unavailable']} 篇)")
+        return result['success'], result['total']
     
     def run_update(self) -> bool:
         """
@@ -340,15 +402,26 @@ class ArticleReadingUpdater:
         Returns:
             bool: 任务执行成功返回True
         """
+        exporter = None
         try:
             # 检查配置
             if not self.config.get('enabled', True):
                 logger.info("更新任务已禁用，跳过执行")
                 return True
             
-            if not self.config.get('api', {}).get('key'):
+            if not (self.config.get('api', {}).get('key') or self.config.get('api', {}).get('keys')):
                 logger.error("API密钥未配置，无法执行更新任务")
                 return False
+
+            # 上次运行的致命错误（余额不足、key错误）可能已经处理，重新允许请求
+            self.api_client.reset()
+            
+            # 同一时间只允许一个进程刷新阅读数据（多个入口、多个节点共用QPS上限）
+            self.lease = JobLease.from_config(self.db, self.config, REFRESH_LEASE)
+            if self.lease and not self.lease.acquire():
+                logger.warning("其他进程正在刷新阅读数据，本次跳过")
+                self.lease = None
+                return False
             
             # 连接数据库
             if not self.db.connect():
@@ -356,53 +429,56 @@ class ArticleReadingUpdater:
                 return False
             
             start_time = datetime.now()
+            self.history = RunRecorder('article')
+            exporter = start_exporter(self.config, 'article')  # 运行指标（配置项 metrics）
             logger.info("="*60)
             logger.info("🚀 开始执行文章阅读量更新任务")
             logger.info("="*60)
             logger.info(f"任务开始时间: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
             logger.info(f"检查范围: 近 {self.days_to_check} 天的普法文章")
             
-            # 第一步：获取近7天内阅读量为空的文章（只填充）
-            logger.info("\n" + "="*60)
-            logger.info("📝 第一步：填充近7天内阅读量为空的文章")
-            logger.info("="*60)
-            empty_articles = self.get_articles_need_update(only_empty=True)
+            # 按刷新时间表生成规则：近N天阅读量为空（填充）+ 发布后第1/3/6天（更新）
+            # 所有规则合并为一条逐页查询，拿到第一页就开始调用API
+            rules = self.schedule.build_rules(start_time)
+            rule_counts = {rule['name']: 0 for rule in rules}
             
-            # 第二步：获取往前推6天那一天的所有文章（强制更新）
-            six_days_ago = datetime.now() - timedelta(days=6)
-            logger.info("\n" + "="*60)
-            logger.info(f"📅 第二步：更新往前推6天的文章 (发布日期: {six_days_ago.strftime('%Y-%m-%d')})")
-            logger.info("="*60)
-            six_days_ago_articles = self.get_articles_for_specific_day(six_days_ago)
+            for rule in rules:
+                logger.info(f"刷新规则: {rule['label']}")
             
-            # 合并文章列表，去重（基于article_id）
-            all_articles = empty_articles.copy() if empty_articles else []
-            existing_article_ids = {article['article_id'] for article in all_articles}
+            # 处理之前统计，否则本次刚刷新的文章也会被算作"近期已刷新"
+            self.fresh_skipped = self.count_fresh_skipped(rules)
             
-            # 添加前6天的文章（去重）
-            additional_count = 0
-            for article in six_days_ago_articles:
-                if article['article_id'] not in existing_article_ids:
-                    all_articles.append(article)
-                    existing_article_ids.add(article['article_id'])
-                    additional_count += 1
+            def iter_all_articles():
+                for article in self.iter_work_set(rules):
+                    for name in article['rules']:
+                        rule_counts[name] += 1
+                    yield article
             
-            if not all_articles:
-                logger.info("没有需要处理的文章，任务完成")
-                return True
+            # 批量更新
+            success_count, total_count = self.batch_update_articles(iter_all_articles())
             
             logger.info("\n" + "="*60)
             logger.info("📊 任务汇总")
             logger.info("="*60)
-            logger.info(f"近{self.days_to_check}天阅读量为空的文章(填充): {len(empty_articles)} 篇")
-            logger.info(f"往前推6天({six_days_ago.strftime('%Y-%m-%d')})的文章(更新): {len(six_days_ago_articles)} 篇")
-            logger.info(f"去重后实际需要处理: {len(all_articles)} 篇")
-            logger.info(f"  - 其中需要填充: {len(empty_articles)} 篇")
-            logger.info(f"  - 其中需要更新: {additional_count} 篇")
+            for rule in rules:
+                logger.info(f"{rule['label']}: {rule_counts[rule['name']]} 篇")
+            logger.info(f"去重后实际处理: {total_count} 篇")
+            if self.fresh_skipped:
+                saved_money = self.api_client.estimate_cost(self.fresh_skipped, self.config.get('api', {}).get('cost_per_call'))
+                saved_text = f"约 {saved_money} 元" if saved_money is not None else "金额未知"
+                logger.info(f"近期已刷新跳过: {self.fresh_skipped} 篇 (节省API调用 {self.fresh_skipped} 次，{saved_text})")
             logger.info("")
             
-            # 批量更新
-            success_count, total_count = self.batch_update_articles(all_articles)
+            if self._lease_lost():
+                # 不记录断点，下次运行按刷新时间表重新选出未刷新的文章
+                logger.error("❌ 刷新租约已丢失，本次运行提前停止")
+                self.history.status = 'interrupted'
+                return False
+            
+            if total_count == 0:
+                logger.info("没有需要处理的文章，任务完成")
+                self.history.status = 'success'
+                return True
             
             # 统计结果
             end_time = datetime.now()
@@ -422,6 +498,12 @@ class ArticleReadingUpdater:
                 failed_count = total_count - success_count
                 logger.warning(f"⚠️  有 {failed_count} 篇文章处理失败")
             
+            # 致命错误（key错误、余额不足）中止了本次运行
+            if self.api_client.fatal:
+                self.history.status = 'aborted'
+                return False
+            
+            self.history.status = 'success'
             return True
             
         except Exception as e:
@@ -429,13 +511,24 @@ class ArticleReadingUpdater:
             return False
             
         finally:
+            if self.history:
+                self.history.save(self.db)
+                self.history = None
+            if exporter:
+                exporter.stop()
             # 关闭数据库连接
             self.db.disconnect()
+            if self.lease:
+                self.lease.release()
+                self.lease = None
     
     def get_update_statistics(self, days: int = 7) -> Dict:
         """
         获取更新统计信息
         
+        优先读取 fx_reading_daily_summary 日汇总表（按发布日期统计），
+        汇总表不可用时回退为直接统计文章表
+        
         Args:
             days: 统计的天数
             
@@ -448,65 +541,78 @@ class ArticleReadingUpdater:
                 logger.error("数据库连接失败，无法获取统计信息")
                 return {}
             
-            with self.db.connection.cursor() as cursor:
-                end_date = datetime.now()
-                start_date = end_date - timedelta(days=days)
-                
-                # 统计普法文章总数
-                sql_total = """
-                SELECT COUNT(*) as total_count
-                FROM fx_article_records ar
-                INNER JOIN fx_education_articles ea ON ar.article_id = ea.article_id
-                WHERE ea.type_class = '1'
-                  AND ar.publish_time >= %s
-                  AND ar.publish_time <= %s
-                """
-                cursor.execute(sql_total, (start_date, end_date))
-                total_result = cursor.fetchone()
-                total_count = total_result['total_count'] if total_result else 0
-                
-                # 统计已有阅读量数据的文章数
-                sql_updated = """
-                SELECT COUNT(*) as updated_count
-                FROM fx_article_records ar
-                INNER JOIN fx_education_articles ea ON ar.article_id = ea.article_id
-                WHERE ea.type_class = '1'
-                  AND ar.publish_time >= %s
-                  AND ar.publish_time <= %s
-                  AND ar.view_count IS NOT NULL
-                  AND ar.likes IS NOT NULL
-                  AND ar.thumbs_count IS NOT NULL
-                """
-                cursor.execute(sql_updated, (start_date, end_date))
-                updated_result = cursor.fetchone()
-                updated_count = updated_result['updated_count'] if updated_result else 0
-                
-                # 计算需要更新的数量
-                need_update_count = total_count - updated_count
-                completion_rate = (updated_count / total_count * 100) if total_count > 0 else 0
-                
-                stats = {
-                    'total_articles': total_count,
-                    'updated_articles': updated_count,
-                    'need_update_articles': need_update_count,
-                    'completion_rate': round(completion_rate, 2),
-                    'date_range': {
-                        'start_date': start_date.strftime('%Y-%m-%d'),
-                        'end_date': end_date.strftime('%Y-%m-%d')
-                    }
+            end_date = datetime.now()
+            start_date = end_date - timedelta(days=days)
+            
+            summary = ReadingSummary(self.db, self.config.get('summary_max_age_minutes', 60))
+            counts = summary.get_window_stats(start_date, end_date)
+            if counts is None:
+                logger.warning("阅读数据日汇总不可用，直接统计文章表")
+                counts = self._count_reading_coverage(start_date, end_date)
+            
+            total_count = counts['total_articles']
+            updated_count = counts['updated_articles']
+            
+            # 计算需要更新的数量
+            need_update_count = total_count - updated_count
+            completion_rate = (updated_count / total_count * 100) if total_count > 0 else 0
+            
+            stats = {
+                'total_articles': total_count,
+                'updated_articles': updated_count,
+                'need_update_articles': need_update_count,
+                'completion_rate': round(completion_rate, 2),
+                'date_range': {
+                    'start_date': start_date.strftime('%Y-%m-%d'),
+                    'end_date': end_date.strftime('%Y-%m-%d')
                 }
-                
-                logger.info(f"统计信息 ({days}天): 总数{total_count} 已更新{updated_count} "
-                           f"待更新{need_update_count} 完成率{completion_rate:.1f}%")
-                
-                return stats
+            }
+            
+            logger.info(f"统计信息 ({days}天): 总数{total_count} 已更新{updated_count} "
+                       f"待更新{need_update_count} 完成率{completion_rate:.1f}%")
+            
+            return stats
                 
         except Exception as e:
             logger.error(f"获取统计信息时出错: {e}")
             return {}
         finally:
             self.db.disconnect()
-
+    
+    def _count_reading_coverage(self, start_date: datetime, end_date: datetime) -> Dict[str, int]:
+        """
+        直接统计文章表中普法文章总数和阅读数据完整的文章数（日汇总不可用时使用）
+        
+        Args:
+            start_date: 开始日期（按天，包含当天）
+            end_date: 结束日期（按天，包含当天）
+            
+        Returns:
+            Dict[str, int]: {'total_articles': int, 'updated_articles': int}
+        """
+        day_start = datetime.combine(start_date.date(), datetime.min.time())
+        day_end = datetime.combine(end_date.date() + timedelta(days=1), datetime.min.time())
+        
+        with self.db.connection.cursor() as cursor:
+            sql = """
+            SELECT
+                COUNT(*) as total_count,
+                COALESCE(SUM(ar.view_count IS NOT NULL
+                             AND ar.likes IS NOT NULL
+                             AND ar.thumbs_count IS NOT NULL), 0) as updated_count
+            FROM fx_article_records ar
+            INNER JOIN fx_education_articles ea ON ar.article_id = ea.article_id
+            WHERE ea.type_class = '1'
+              AND ar.publish_time >= %s
+              AND ar.publish_time < %s
+            """
+            cursor.execute(sql, (day_start, day_end))
+            result = cursor.fetchone() or {}
+        
+        return {
+            'total_articles': int(result.get('total_count') or 0),
+            'updated_articles': int(result.get('updated_count') or 0)
+        }
 
 def main():
     """主函数"""
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+普法文章分页查询
+=============
+
+按 (publish_time, id) 做键集分页（keyset pagination），以生成器形式逐页返回普法文章。
+每页是一次独立的小查询，调用方可以在拿到第一页后立即开始调用API，
+内存中只保留一页数据，和时间范围的大小无关；同一连接上也可以穿插执行写入语句。
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from spider.log.utils import logger
+
+# 更新器实际用到的列
+ARTICLE_COLUMNS = [
+    "ar.id",
+    "ar.article_id",
+    "ar.article_title",
+    "ar.article_url",
+    "ar.publish_time",
+    "ar.unit_name",
+    "ar.view_count",
+    "ar.likes",
+    "ar.thumbs_count",
+]
+
+# 普法文章、发布时间范围、有文章链接（参数依次为开始时间、结束时间）
+BASE_CONDITIONS = [
+    "ea.type_class = '1'",
+    "ar.publish_time >= %s",
+    "ar.publish_time <= %s",
+    "ar.article_url IS NOT NULL",
+    "ar.article_url != ''",
+]
+
+# 阅读数据不完整
+EMPTY_STATS_CONDITION = "(ar.view_count IS NULL OR ar.likes IS NULL OR ar.thumbs_count IS NULL)"
+
+DEFAULT_PAGE_SIZE = 500
+
+# 最近一次获取到阅读数据的时间（快照表主键 (article_id, fetched_at) 上的范围查询）
+LAST_FETCHED_COLUMN = (
+    "(SELECT MAX(s.fetched_at) FROM fx_article_reading_snapshot s "
+    "WHERE s.article_id = ar.article_id) AS last_fetched_at"
+)
+
+# 指定时间之后获取过阅读数据
+FRESH_CONDITION = (
+    "EXISTS (SELECT 1 FROM fx_article_reading_snapshot s "
+    "WHERE s.article_id = ar.article_id AND s.fetched_at >= %s)"
+)
+NOT_FRESH_CONDITION = "NOT " + FRESH_CONDITION
+
+
+def get_fresh_since(config: Dict, rule_name: str, now: datetime = None) -> Optional[datetime]:
+    """
+    根据配置计算规则的新鲜度截止时间
+
+    配置项 freshness_hours 为 {规则名称: 小时数}，未配置的规则使用 default；
+    在截止时间之后已经获取过阅读数据的文章视为"新鲜"，本次不再调用API
+
+    Args:
+        config: 更新器配置
+        rule_name: 规则名称（empty / day_6 / theme 等）
+        now: 当前时间，默认 datetime.now()
+
+    Returns:
+        Optional[datetime]: 截止时间，小时数为0或未配置时返回None（不跳过）
+    """
+    freshness = config.get('freshness_hours', {})
+    hours = freshness.get(rule_name, freshness.get('default', 0))
+    if not hours:
+        return None
+    return (now or datetime.now()) - timedelta(hours=hours)
+
+
+def freshness_condition(fresh_since: Optional[datetime]) -> Tuple[List[str], List]:
+    """
+    生成跳过新鲜文章的查询条件
+
+    Args:
+        fresh_since: 新鲜度截止时间，为空表示不跳过
+
+    Returns:
+        Tuple[List[str], List]: (条件列表, 参数列表)
+    """
+    if fresh_since is None:
+        return [], []
+    return [NOT_FRESH_CONDITION], [fresh_since]
+
+
+def count_fresh_articles(db, start_time: datetime, end_time: datetime, fresh_since: Optional[datetime],
+                         conditions: Sequence[str] = (), params: Sequence = ()) -> int:
+    """
+    统计因新鲜度被跳过的文章数量
+
+    Args:
+        db: DatabaseManager 实例（由调用方负责连接）
+        start_time: 发布时间下界（包含）
+        end_time: 发布时间上界（包含）
+        fresh_since: 新鲜度截止时间，为空时返回0
+        conditions: 规则本身的 WHERE 条件
+        params: 规则条件的参数
+
+    Returns:
+        int: 截止时间之后已获取过阅读数据的文章数量
+    """
+    if fresh_since is None:
+        return 0
+    return count_pufa_articles(db, start_time, end_time,
+                               list(conditions) + [FRESH_CONDITION], list(params) + [fresh_since])
+
+
+def count_pufa_articles(db, start_time: datetime, end_time: datetime,
+                        conditions: Sequence[str] = (), params: Sequence = ()) -> int:
+    """
+    统计时间范围内满足条件的普法文章数量（不加载文章数据）
+
+    Args:
+        db: DatabaseManager 实例（由调用方负责连接）
+        start_time: 发布时间下界（包含）
+        end_time: 发布时间上界（包含）
+        conditions: 额外的 WHERE 条件
+        params: 额外条件的参数
+
+    Returns:
+        int: 文章数量，查询失败返回0
+    """
+    where = BASE_CONDITIONS + list(conditions)
+
+    if not db.ensure_connection():
+        return 0
+
+    try:
+        with db.connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT COUNT(*) AS cnt
+                FROM fx_article_records ar
+                INNER JOIN fx_education_articles ea ON ar.article_id = ea.article_id
+                WHERE {' AND '.join(where)}
+                """,
+                [start_time, end_time] + list(params)
+            )
+            return int(cursor.fetchone()['cnt'] or 0)
+    except Exception as e:
+        logger.error(f"统计普法文章数量时出错: {e}")
+        return 0
+
+
+def iter_pufa_articles(db, start_time: datetime, end_time: datetime,
+                       conditions: Sequence[str] = (), params: Sequence = (),
+                       extra_columns: Sequence[str] = (),
+                       page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict]:
+    """
+    按发布时间倒序分页查询时间范围内有链接的普法文章
+
+    Args:
+        db: DatabaseManager 实例（由调用方负责连接）
+        start_time: 发布时间下界（包含）
+        end_time: 发布时间上界（包含）
+        conditions: 额外的 WHERE 条件（可引用 ar/ea 别名）
+        params: 额外条件的参数（按 conditions 中占位符的顺序）
+        extra_columns: 额外查询的列或表达式（需带别名）
+        page_size: 每页行数
+
+    Yields:
+        Dict: 文章信息
+    """
+    columns = ",\n        ".join(list(ARTICLE_COLUMNS) + list(extra_columns))
+    base_conditions = BASE_CONDITIONS + list(conditions)
+
+    last_key = None  # 上一页最后一行的 (publish_time, id)
+
+    while True:
+        where = list(base_conditions)
+        query_params = [start_time, end_time] + list(params)
+        if last_key is not None:
+            where.append("(ar.publish_time < %s OR (ar.publish_time = %s AND ar.id < %s))")
+            query_params += [last_key[0], last_key[0], last_key[1]]
+
+        sql = f"""
+        SELECT
+        {columns}
+        FROM fx_article_records ar
+        INNER JOIN fx_education_articles ea ON ar.article_id = ea.article_id
+        WHERE {' AND '.join(where)}
+        ORDER BY ar.publish_time DESC, ar.id DESC
+        LIMIT %s
+        """
+        query_params.append(page_size)
+
+        if not db.ensure_connection():
+            logger.error("数据库连接失败，无法查询文章")
+            return
+
+        try:
+            with db.connection.cursor() as cursor:
+                cursor.execute(sql, query_params)
+                rows: List[Dict] = list(cursor.fetchall())
+        except Exception as e:
+            logger.error(f"分页查询普法文章时出错: {e}")
+            return
+
+        for row in rows:
+            yield row
+
+        if len(rows) < page_size:
+            return
+
+        last_key = (rows[-1]['publish_time'], rows[-1]['id'])
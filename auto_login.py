@@ -8,13 +8,11 @@
 整合login.py的功能，自动更新wechat_crawler_config.json
 """
 
-import json
 import os
+from crawler_config import CONFIG_FILE, CrawlerConfig
 from login import WeChatSpiderLogin
 from spider.log.utils import logger
 
-CONFIG_FILE = 'wechat_crawler_config.json'
-
 class AutoLogin:
     """自动登录管理器"""
     
@@ -22,31 +20,15 @@ class AutoLogin:
         """初始化自动登录管理器"""
         self.login_manager = WeChatSpiderLogin()
         self.config_file = CONFIG_FILE
+        self.config = CrawlerConfig(self.config_file)  # 进程内缓存的配置，文件修改后自动重新加载
         
     def load_config(self):
-        """加载配置文件"""
-        if os.path.exists(self.config_file):
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        else:
-            # 创建默认配置
-            default_config = {
-                'token': '',
-                'cookie': '',
-                'last_update': {},
-                'max_articles_per_account': 50,
-                'accounts': [],
-                'crawl_days': 7,  # 爬取多少天内的文章
-                'article_interval': [2, 5],  # 文章间隔时间[最小秒数, 最大秒数]
-                'account_interval': [10, 20]  # 公众号间隔时间[最小秒数, 最大秒数]
-            }
-            self.save_config(default_config)
-            return default_config
+        """加载配置（返回副本，文件未修改时不重新读取）"""
+        return dict(self.config.data)
     
     def save_config(self, config):
-        """保存配置文件"""
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(config, f, ensure_ascii=False, indent=2)
+        """保存配置文件（原子写入）"""
+        self.config.save(config)
         logger.info(f"配置已保存到 {self.config_file}")
     
     def update_login_info(self, token, cookie_string):
@@ -57,24 +39,22 @@ class AutoLogin:
             token: 登录token
             cookie_string: cookie字符串
         """
-        config = self.load_config()
-        config['token'] = token
-        config['cookie'] = cookie_string
-        self.save_config(config)
-        logger.success(f"登录信息已更新到 {self.config_file}")
+        if self.config.update(token=token, cookie=cookie_string):
+            logger.success(f"登录信息已更新到 {self.config_file}")
     
-    def ensure_login(self, max_retries=3):
+    def ensure_login(self, max_retries=3, force=False):
         """
         确保登录状态有效，支持自动重试
         
         Args:
             max_retries: 最大重试次数
+            force: 不使用缓存的登录信息，直接扫码登录（登录即将到期时）
             
         Returns:
             tuple: (token, cookie_string, headers) 如果登录成功，否则返回 (None, None, None)
         """
         # 首先检查是否已登录
-        if self.login_manager.is_logged_in():
+        if not force and self.login_manager.is_logged_in():
             logger.success("使用缓存的登录信息")
             token = self.login_manager.get_token()
             cookie_string = self.login_manager.get_cookie_string()
@@ -158,10 +138,7 @@ class AutoLogin:
     def update_accounts_in_config(self):
         """更新配置文件中的公众号列表"""
         accounts = self.get_accounts_from_file()
-        if accounts:
-            config = self.load_config()
-            config['accounts'] = accounts
-            self.save_config(config)
+        if accounts and self.config.update(accounts=accounts):
             logger.success(f"已更新配置文件中的公众号列表，共 {len(accounts)} 个")
         return accounts
 
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+阅读数据刷新预算
+=============
+
+read_zan 接口按次计费。配置了每日预算（金额或调用次数）或余额下限时，
+刷新前先对候选文章按预期价值排序，只刷新预算内价值最高的部分：
+
+    价值 = 年龄系数 × 单位系数 × 主题系数 × 空数据系数
+
+- 年龄系数：1 / (1 + 发布天数)，新文章的阅读量变化最大
+- 单位系数：该单位近30天文章的日均阅读增长 / 各单位平均值（来自 fx_article_reading_snapshot，
+  限制在 0.2 ~ 5 之间；没有快照数据的单位为 1.0）
+- 主题系数：发布时间落在当前进行中的法律主题月期间时乘以 weights.theme
+- 空数据系数：阅读数据为空时乘以 weights.empty
+
+刷新过程中达到预算或账户余额低于 min_remain_money 时停止提交新的请求
+（已经在途的请求仍会完成），每次运行的实际消费按来源（统一刷新、更新器、各工作进程）记录到 fx_refresh_spend。
+预算由刷新流水线（refresh_pipeline.py）应用，所有刷新入口共用同一份每日预算。
+
+按价值选择需要先看完全部候选文章才能确定前 N 篇：配置了预算时，
+第一个API请求要等候选查询全部读完才发出（候选仍逐页读取，内存只保留预算内的 N 篇）；
+未配置预算或调用次数上限未知时不排序，保持逐页流式处理。
+"""
+
+import heapq
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from reading_snapshots import ReadingSnapshotStore
+from spider.log.utils import logger
+
+# 单位系数统计的快照天数
+UNIT_GROWTH_DAYS = 30
+
+DEFAULT_WEIGHTS = {
+    'empty': 3.0,
+    'theme': 2.0
+}
+
+
+class RefreshBudget:
+    """阅读数据刷新预算"""
+
+    def __init__(self, db, api_client, budget_config: Dict = None, source: str = 'refresh'):
+        """
+        初始化预算
+
+        Args:
+            db: DatabaseManager 实例（由调用方负责连接）
+            api_client: 第三方API客户端（读取消费统计）
+            budget_config: 预算配置 {
+                'daily_money': 每日金额预算（元），
+                'daily_calls': 每日调用次数预算，
+                'min_remain_money': 账户余额下限（元），
+                'unit_cost': 单次调用价格（元，用于把金额预算换算为调用次数），
+                'weights': {'empty': 空数据系数, 'theme': 主题系数}
+            }
+            source: 消费来源（refresh 统一刷新、article、theme、worker:工作进程ID）
+        """
+        budget_config = budget_config or {}
+        self.db = db
+        self.api_client = api_client
+        self.source = source
+        self.daily_money = budget_config.get('daily_money')
+        self.daily_calls = budget_config.get('daily_calls')
+        self.min_remain_money = budget_config.get('min_remain_money')
+        self.unit_cost = budget_config.get('unit_cost')
+        self.weights = dict(DEFAULT_WEIGHTS)
+        self.weights.update(budget_config.get('weights', {}))
+
+        # 本次运行的起点：客户端的统计从进程启动开始累计（调度器在多次运行中共用一个客户端），
+        # 未配置预算时 record_run 同样只记录本次运行的消费
+        self.start_calls = api_client.total_calls
+        self.start_paid_calls = api_client.paid_calls
+        self.start_cost_money = api_client.total_cost_money
+
+        # 本次运行的预算（start 时计算）
+        self.budget_calls: Optional[int] = None
+        self.budget_money: Optional[float] = None
+        self.candidates = 0
+        self.selected = 0
+        self.stopped_reason: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        """是否配置了任何预算限制"""
+        return any(value is not None for value in (self.daily_money, self.daily_calls, self.min_remain_money))
+
+    def get_spent_today(self) -> Dict:
+        """
+        获取今天已经记录的消费
+
+        Returns:
+            Dict: {'paid_calls': int, 'cost_money': float}
+        """
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT COALESCE(SUM(paid_calls), 0) AS paid_calls,
+                           COALESCE(SUM(cost_money), 0) AS cost_money
+                    FROM fx_refresh_spend
+                    WHERE started_at >= %s
+                    """,
+                    (today,)
+                )
+                row = cursor.fetchone()
+                return {'paid_calls': int(row['paid_calls']), 'cost_money': float(row['cost_money'])}
+        except Exception as e:
+            logger.warning(f"查询今日消费记录时出错: {e}")
+            return {'paid_calls': 0, 'cost_money': 0.0}
+
+    def start(self):
+        """
+        计算本次运行可用的预算（每日预算减去今天已消费的部分）
+        """
+        self.stopped_reason = None
+
+        spent = self.get_spent_today()
+        if self.daily_calls is not None:
+            self.budget_calls = max(0, int(self.daily_calls) - spent['paid_calls'])
+        if self.daily_money is not None:
+            self.budget_money = max(0.0, float(self.daily_money) - spent['cost_money'])
+
+        logger.info(f"💰 刷新预算: 今日已调用 {spent['paid_calls']} 次、消费 {round(spent['cost_money'], 4)} 元；"
+                    f"本次可用 调用次数 {self.budget_calls if self.budget_calls is not None else '不限'}，"
+                    f"金额 {round(self.budget_money, 4) if self.budget_money is not None else '不限'} 元，"
+                    f"余额下限 {self.min_remain_money if self.min_remain_money is not None else '无'} 元")
+
+    def get_call_limit(self) -> Optional[int]:
+        """
+        本次最多可以调用的次数（金额预算按单价换算）
+
+        Returns:
+            Optional[int]: 调用次数上限，不限时返回None
+        """
+        limits = []
+        if self.budget_calls is not None:
+            limits.append(self.budget_calls)
+
+        unit_cost = self.api_client.last_cost_money or self.unit_cost
+        if self.budget_money is not None and unit_cost:
+            limits.append(int(self.budget_money / float(unit_cost) + 1e-9))
+
+        remain_money = self.api_client.remain_money
+        if self.min_remain_money is not None and remain_money is not None and unit_cost:
+            limits.append(max(0, int((float(remain_money) - float(self.min_remain_money)) / float(unit_cost) + 1e-9)))
+
+        return min(limits) if limits else None
+
+    def _get_unit_factors(self) -> Dict[str, float]:
+        """各单位近期日均阅读增长相对各单位平均值的系数（阅读还在增长的单位刷新价值更高）"""
+        since = datetime.now() - timedelta(days=UNIT_GROWTH_DAYS)
+        growth = ReadingSnapshotStore(self.db).get_unit_growth(since)
+        overall = sum(growth.values()) / len(growth) if growth else 0
+        if not overall:
+            return {}
+        return {unit: min(5.0, max(0.2, value / overall)) for unit, value in growth.items()}
+
+    def _get_active_themes(self) -> List[Dict]:
+        """当前进行中的法律主题月"""
+        today = datetime.now().date()
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT start_date, end_date FROM fx_theme "
+                    "WHERE status = 1 AND start_date <= %s AND end_date >= %s",
+                    (today, today)
+                )
+                return list(cursor.fetchall())
+        except Exception as e:
+            logger.warning(f"查询进行中的法律主题时出错: {e}")
+            return []
+
+    def score(self, article: Dict, now: datetime, unit_factors: Dict[str, float], themes: List[Dict]) -> float:
+        """
+        计算文章的预期价值
+
+        Args:
+            article: 文章信息字典
+            now: 当前时间
+            unit_factors: 单位系数
+            themes: 进行中的法律主题
+
+        Returns:
+            float: 预期价值
+        """
+        publish_time = article.get('publish_time') or now
+        age_days = max(0.0, (now - publish_time).total_seconds() / 86400)
+        value = 1.0 / (1.0 + age_days)
+        value *= unit_factors.get(article.get('unit_name'), 1.0)
+
+        publish_date = publish_time.date()
+        if any(theme['start_date'] <= publish_date <= theme['end_date'] for theme in themes):
+            value *= self.weights['theme']
+
+        if article.get('view_count') is None or article.get('likes') is None or article.get('thumbs_count') is None:
+            value *= self.weights['empty']
+
+        return value
+
+    def select(self, candidates: Iterable[Dict]) -> Iterable[Dict]:
+        """
+        按预期价值选出预算内的文章
+
+        调用次数上限未知（不限，或还不知道单价）时原样逐条返回；
+        否则读完全部候选、只保留价值最高的 N 篇（堆大小为 N，内存与预算成正比），按价值从高到低返回。
+        排序需要看完全部候选，因此这种情况下失去了流式处理：第一个请求要等候选查询读完才发出
+
+        Args:
+            candidates: 候选文章（可以是生成器）
+
+        Returns:
+            Iterable[Dict]: 选中的文章
+        """
+        limit = self.get_call_limit()
+        if limit is None:
+            return self._count_all(candidates)
+
+        now = datetime.now()
+        unit_factors = self._get_unit_factors()
+        themes = self._get_active_themes()
+
+        heap = []
+        self.candidates = 0
+        for i, article in enumerate(candidates):
+            self.candidates += 1
+            if limit <= 0:
+                continue
+            item = (self.score(article, now, unit_factors, themes), i, article)
+            if len(heap) < limit:
+                heapq.heappush(heap, item)
+            elif item[0] > heap[0][0]:
+                heapq.heapreplace(heap, item)
+
+        selected = [article for _, _, article in sorted(heap, key=lambda item: (-item[0], item[1]))]
+        self.selected = len(selected)
+        logger.info(f"💰 按预期价值从 {self.candidates} 篇候选文章中选出 {self.selected} 篇 (调用次数上限 {limit})")
+        return selected
+
+    def _count_all(self, candidates: Iterable[Dict]) -> Iterable[Dict]:
+        """不限调用次数时原样逐条返回，只做计数"""
+        self.candidates = 0
+        self.selected = 0
+        for article in candidates:
+            self.candidates += 1
+            self.selected += 1
+            yield article
+
+    def should_stop(self) -> Optional[str]:
+        """
+        检查是否应停止提交新的请求
+
+        Returns:
+            Optional[str]: 达到预算或余额下限时返回停止原因（call_budget、money_budget、remain_money），否则返回None
+        """
+        if self.stopped_reason:
+            return self.stopped_reason
+
+        if self.budget_calls is not None and self.api_client.paid_calls - self.start_paid_calls >= self.budget_calls:
+            self.stopped_reason = 'call_budget'
+        elif (self.budget_money is not None
+              and self.api_client.total_cost_money - self.start_cost_money >= self.budget_money):
+            self.stopped_reason = 'money_budget'
+        elif (self.min_remain_money is not None and self.api_client.remain_money is not None
+              and float(self.api_client.remain_money) <= float(self.min_remain_money)):
+            self.stopped_reason = 'remain_money'
+
+        if self.stopped_reason:
+            logger.warning(f"💰 已达到刷新预算 ({self.stopped_reason})，停止提交新的请求")
+        return self.stopped_reason
+
+    def record_run(self, started_at: datetime) -> Dict:
+        """
+        记录本次运行的实际消费
+
+        Args:
+            started_at: 运行开始时间
+
+        Returns:
+            Dict: 本次消费 {'api_calls', 'paid_calls', 'cost_money', 'remain_money'}
+        """
+        spend = {
+            'api_calls': self.api_client.total_calls - self.start_calls,
+            'paid_calls': self.api_client.paid_calls - self.start_paid_calls,
+            'cost_money': round(self.api_client.total_cost_money - self.start_cost_money, 4),
+            'remain_money': self.api_client.remain_money
+        }
+
+        # 没有候选也没有调用API（如工作进程轮询到空队列）时不记录
+        if not spend['api_calls'] and not self.candidates:
+            return spend
+
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO fx_refresh_spend
+                        (source, started_at, finished_at, candidates, selected, api_calls, paid_calls,
+                         cost_money, remain_money, budget_money, budget_calls, stopped_reason)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    """,
+                    (self.source, started_at, datetime.now(), self.candidates, self.selected,
+                     spend['api_calls'], spend['paid_calls'], spend['cost_money'], spend['remain_money'],
+                     self.budget_money, self.budget_calls, self.stopped_reason)
+                )
+            self.db.connection.commit()
+        except Exception as e:
+            logger.error(f"记录刷新消费时出错: {e}")
+            try:
+                self.db.connection.rollback()
+            except Exception:
+                pass
+
+        logger.info(f"💰 本次消费: 调用 {spend['api_calls']} 次 (计费 {spend['paid_calls']} 次)，"
+                    f"{spend['cost_money']} 元，余额 {spend['remain_money']} 元")
+        return spend
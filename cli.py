@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+统一命令行入口
+============
+
+所有功能的子命令集中在一个入口，执行哪个子命令才导入对应的模块，
+统计、检查、状态等查询命令不加载 Playwright、requests、schedule、bs4，启动时间在几百毫秒以内。
+子命令的参数与对应脚本相同（子命令后面的参数原样传给该脚本）。
+
+importtime 子命令用 python -X importtime 测量各子命令的导入耗时，作为启动速度的回归检查：
+查询命令导入了重量级模块或超过预算时返回非零退出码。
+
+使用示例：
+    python cli.py stats --days 14
+    python cli.py check-theme
+    python cli.py refresh --dry-run
+    python cli.py worker --keys 0,1
+    python cli.py crawl
+    python cli.py importtime
+    python cli.py importtime stats jobs --budget-ms 300
+"""
+
+import sys
+import argparse
+import importlib
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+# 子命令: (模块, 固定参数, 说明, 是否为查询命令)
+COMMANDS: Dict[str, Tuple[str, List[str], str, bool]] = {
+    'crawl': ('main', ['crawl'], '爬取所有公众号的文章', False),
+    'crawl-test': ('main', ['test'], '测试爬取单个公众号（--account 名称）', False),
+    'login': ('main', ['login'], '扫码登录公众号平台', False),
+    'db-test': ('main', ['db-test'], '测试数据库连接', False),
+    'update': ('start_reading_updater', ['--now'], '立即执行阅读量更新', False),
+    'stats': ('start_reading_updater', ['--stats'], '显示阅读量统计信息', True),
+    'dry-run': ('start_reading_updater', ['--dry-run'], '试运行（只查询待更新文章）', True),
+    'test-api': ('start_reading_updater', ['--test-api'], '测试第三方API连接', False),
+    'check-theme': ('theme_reading_updater', ['--check'], '检查明天是否有法律主题结束', True),
+    'list-themes': ('theme_reading_updater', ['--list'], '列出活动中的法律主题', True),
+    'theme-update': ('theme_reading_updater', ['--run'], '执行法律主题阅读量更新', False),
+    'refresh': ('refresh_planner', [], '统一刷新阅读数据', False),
+    'enqueue': ('refresh_planner', ['--enqueue'], '把待刷新文章写入任务队列', False),
+    'worker': ('refresh_worker', [], '运行刷新任务队列的工作进程', False),
+    'queue-status': ('refresh_worker', ['--status'], '显示刷新任务队列状态', True),
+    'scheduler': ('job_scheduler', [], '运行统一任务调度器', False),
+    'jobs': ('job_scheduler', ['--status'], '显示调度任务状态', True),
+    'history': ('run_history', [], '查看运行耗时记录', True),
+}
+
+# 子命令运行时才导入的模块（对应脚本在函数内导入），导入耗时检查一并测量
+DEFERRED_IMPORTS: Dict[str, List[str]] = {
+    'stats': ['article_reading_updater'],
+    'dry-run': ['article_reading_updater'],
+}
+
+# 查询命令不应导入的重量级模块
+HEAVY_MODULES = ('playwright', 'requests', 'schedule', 'bs4')
+
+# 查询命令的导入耗时预算（毫秒）
+IMPORT_BUDGET_MS = 500
+
+
+def load_command(name: str):
+    """
+    导入子命令对应的模块
+
+    Args:
+        name: 子命令名称
+
+    Returns:
+        module: 子命令的模块（提供 main()）
+    """
+    return importlib.import_module(COMMANDS[name][0])
+
+
+def run_command(name: str, args: List[str]) -> int:
+    """
+    执行子命令（以对应脚本的命令行参数调用其 main()）
+
+    Args:
+        name: 子命令名称
+        args: 传给脚本的其余参数
+
+    Returns:
+        int: 退出码
+    """
+    module_name, fixed_args, _, _ = COMMANDS[name]
+    module = load_command(name)
+    sys.argv = [f"{module_name}.py"] + fixed_args + args
+    result = module.main()
+    return result if isinstance(result, int) else 0
+
+
+def measure_import(name: str) -> Tuple[float, List[str]]:
+    """
+    在子进程中用 -X importtime 测量子命令的导入耗时（含运行时才导入的模块，不含解释器启动时的导入）
+
+    Args:
+        name: 子命令名称
+
+    Returns:
+        Tuple[float, List[str]]: (导入耗时毫秒数, 导入的模块列表)
+
+    Raises:
+        RuntimeError: 子进程导入失败
+    """
+    import subprocess
+
+    # 用 import 语句导入（-X importtime 不记录 importlib.import_module 导入的模块本身）
+    imports = [COMMANDS[name][0]] + DEFERRED_IMPORTS.get(name, [])
+    code = '; '.join(['import cli'] + [f"import {module}" for module in imports])
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=str(project_root), capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"退出码 {process.returncode}")
+
+    total_us = 0
+    modules = []
+    started = False
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module_column = line[len('import time:'):].split('|')
+        module = module_column.strip()
+        top_level = len(module_column) - len(module_column.lstrip()) == 1
+        if top_level and module == 'cli':
+            started = True
+        if not started:
+            continue
+        modules.append(module)
+        if top_level:
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def check_import_time(names: List[str] = None, budget_ms: float = IMPORT_BUDGET_MS) -> int:
+    """
+    测量子命令的导入耗时，检查查询命令是否变慢
+
+    Args:
+        names: 子命令列表，为空时测量所有查询命令
+        budget_ms: 查询命令的导入耗时预算（毫秒）
+
+    Returns:
+        int: 查询命令都在预算内且没有导入重量级模块时返回0，否则返回1
+    """
+    names = names or [name for name, command in COMMANDS.items() if command[3]]
+    failed = False
+
+    print("\n" + "=" * 70)
+    print(f"⏱️ 子命令导入耗时（查询命令预算 {budget_ms:.0f} ms）")
+    print("=" * 70)
+    for name in names:
+        try:
+            elapsed_ms, modules = measure_import(name)
+        except RuntimeError as e:
+            print(f"{name:<14} 导入失败: {e}")
+            failed = True
+            continue
+
+        heavy = sorted({module.split('.')[0] for module in modules} & set(HEAVY_MODULES))
+        status = ''
+        if COMMANDS[name][3]:
+            if heavy or elapsed_ms > budget_ms:
+                status = '❌'
+                failed = True
+            else:
+                status = '✅'
+        heavy_text = f"  重量级模块: {', '.join(heavy)}" if heavy else ''
+        print(f"{name:<14} {elapsed_ms:8.1f} ms  {len(modules):4d} 个模块 {status}{heavy_text}")
+    print("=" * 70)
+    return 1 if failed else 0
+
+
+def main():
+    """主函数"""
+    commands_help = '\n'.join(f"  {name:<14} {command[2]}" for name, command in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        description="微信公众号爬虫与阅读量更新系统",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"子命令：\n{commands_help}\n  {'importtime':<14} 检查各子命令的导入耗时\n\n"
+               f"使用示例：{__doc__.split('使用示例：')[1]}"
+    )
+    parser.add_argument("command", choices=list(COMMANDS) + ['importtime'], metavar="command",
+                        help="子命令（见下方列表）")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="传给子命令的参数")
+    args = parser.parse_args()
+
+    if args.command == 'importtime':
+        check_parser = argparse.ArgumentParser(prog=f"{parser.prog} importtime")
+        check_parser.add_argument("names", nargs='*', metavar="command", help="要测量的子命令，默认全部查询命令")
+        check_parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS, help="查询命令的导入耗时预算（毫秒）")
+        check_args = check_parser.parse_args(args.args)
+        unknown = [name for name in check_args.names if name not in COMMANDS]
+        if unknown:
+            check_parser.error(f"未知的子命令: {', '.join(unknown)}")
+        return check_import_time(check_args.names, check_args.budget_ms)
+
+    return run_command(args.command, args.args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
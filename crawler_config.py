@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+爬虫配置
+=======
+
+wechat_crawler_config.json 在进程内只解析一次，之后按文件修改时间判断是否需要重新读取
+（最多每 RELOAD_CHECK_SECONDS 秒检查一次），爬取循环中读取配置不再打开和解析文件。
+写入时先写临时文件再替换，写到一半被中断不会损坏配置文件；内容没有变化时不写入。
+"""
+
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from spider.log.utils import logger
+
+CONFIG_FILE = 'wechat_crawler_config.json'
+
+# 检查配置文件修改时间的最小间隔（秒）
+RELOAD_CHECK_SECONDS = 5
+
+DEFAULT_CONFIG = {
+    'token': '',
+    'cookie': '',
+    'last_update': {},
+    'max_articles_per_account': 50,
+    'accounts': [],
+    'crawl_days': 7,  # 爬取多少天内的文章
+    'article_interval': [2, 5],  # 文章间隔时间[最小秒数, 最大秒数]
+    'account_interval': [10, 20]  # 公众号间隔时间[最小秒数, 最大秒数]
+}
+
+
+class CrawlerConfig:
+    """爬虫配置（按修改时间重新加载，原子写入）"""
+
+    def __init__(self, config_file: str = CONFIG_FILE):
+        """
+        初始化配置
+
+        Args:
+            config_file: 配置文件路径，不存在时第一次读取配置时创建默认配置
+        """
+        self.config_file = Path(config_file)
+        self.lock = threading.RLock()
+        self._data: Optional[Dict] = None
+        self._mtime: Optional[int] = None
+        self._checked_at = 0.0
+
+    def _file_mtime(self) -> Optional[int]:
+        try:
+            return self.config_file.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    @property
+    def data(self) -> Dict:
+        """当前配置（调用方不要修改，修改配置使用 update）"""
+        now = time.monotonic()
+        if self._data is not None and now - self._checked_at < RELOAD_CHECK_SECONDS:
+            return self._data
+
+        with self.lock:
+            self._checked_at = now
+            mtime = self._file_mtime()
+            if self._data is None or mtime != self._mtime:
+                self._reload(mtime)
+            return self._data
+
+    def _reload(self, mtime: Optional[int]):
+        """重新读取配置文件（调用方持有 self.lock）"""
+        if mtime is None:
+            if self._data is None:
+                logger.info(f"配置文件 {self.config_file} 不存在，创建默认配置")
+                self._write(dict(DEFAULT_CONFIG))
+            return
+
+        try:
+            data = json.loads(self.config_file.read_text(encoding='utf-8'))
+        except (OSError, json.JSONDecodeError) as e:
+            if self._data is None:
+                logger.error(f"读取配置文件 {self.config_file} 出错: {e}，使用默认配置")
+                self._data = dict(DEFAULT_CONFIG)
+            else:
+                logger.warning(f"读取配置文件 {self.config_file} 出错: {e}，继续使用上次的配置")
+            self._mtime = mtime
+            return
+
+        if self._data is not None:
+            logger.info(f"配置文件 {self.config_file} 已修改，重新加载")
+        self._data = data
+        self._mtime = mtime
+
+    def _write(self, data: Dict):
+        """写入配置（先写临时文件再替换，调用方持有 self.lock）"""
+        temp_file = self.config_file.with_suffix(self.config_file.suffix + '.tmp')
+        temp_file.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+        os.replace(temp_file, self.config_file)
+        self._data = data
+        self._mtime = self._file_mtime()
+
+    def save(self, data: Dict):
+        """
+        写入完整配置
+
+        Args:
+            data: 配置内容
+        """
+        with self.lock:
+            self._write(dict(data))
+
+    def update(self, **fields) -> bool:
+        """
+        修改部分配置项（内容没有变化时不写入）
+
+        Returns:
+            bool: 是否写入了配置文件
+        """
+        with self.lock:
+            data = dict(self.data)
+            if all(data.get(key) == value for key, value in fields.items()):
+                return False
+            data.update(fields)
+            self._write(data)
+            return True
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """读取配置项"""
+        return self.data.get(key, default)
+
+    @property
+    def token(self) -> str:
+        return self.get('token', '')
+
+    @property
+    def cookie(self) -> str:
+        return self.get('cookie', '')
+
+    @property
+    def accounts(self) -> List[str]:
+        return list(self.get('accounts', []))
+
+    @property
+    def max_articles_per_account(self) -> int:
+        return int(self.get('max_articles_per_account', 50))
+
+    @property
+    def crawl_days(self) -> int:
+        """包含今天至当前时刻 + 前 N 个完整自然日"""
+        return int(self.get('crawl_days', 7))
+
+    @property
+    def article_interval(self) -> Tuple[float, float]:
+        """文章间隔时间（最小秒数, 最大秒数）"""
+        low, high = self.get('article_interval', [2, 5])
+        return float(low), float(high)
+
+    @property
+    def account_interval(self) -> Tuple[float, float]:
+        """公众号间隔时间（最小秒数, 最大秒数）"""
+        low, high = self.get('account_interval', [10, 20])
+        return float(low), float(high)
+
+    @property
+    def login_cache_hours(self) -> float:
+        """登录后多少小时重新登录"""
+        return float(self.get('login_cache_hours', 89))
@@ -13,6 +13,7 @@ import json
 import random
 from datetime import datetime
 from spider.log.utils import logger
+from reading_summary import ReadingSummary
 from typing import Dict, List, Optional
 
 class DatabaseManager:
@@ -330,6 +331,9 @@ class DatabaseManager:
                 cursor.execute(sql, values)
                 self.connection.commit()
                 
+                # 标记该发布日期的阅读数据日汇总需要重新汇总
+                ReadingSummary(self).mark_stale(publish_time)
+                
                 logger.success(f"文章已保存到数据库: {article_data.get('title', '无标题')} (ID: {article_id})")
                 return True
                 
@@ -11,14 +11,210 @@
 import requests
 import time
 import json
-from typing import Dict, Optional, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+from metrics import DSF_COST_MONEY, DSF_REMAIN_MONEY, DSF_REQUESTS
 from spider.log.utils import logger
 
+# 错误码分类（请求本身失败时的伪错误码见 fetch_article_stats）
+FATAL_ERROR_CODES = {'10002', '20001'}              # key错误、余额不足：整次运行都不会成功
+TRANSIENT_ERROR_CODES = {'-1', '107', '50000', 'timeout', 'network', 'invalid_json'}  # 稍后重试可能成功
+
+
+def classify_error(code) -> str:
+    """
+    错误码分类
+    
+    Args:
+        code: API状态码或伪错误码
+        
+    Returns:
+        str: 'fatal'（致命，应中止运行）、'transient'（临时性，可重试）、'article'（单篇文章的问题）
+    """
+    code = str(code)
+    if code in FATAL_ERROR_CODES:
+        return 'fatal'
+    if code in TRANSIENT_ERROR_CODES:
+        return 'transient'
+    return 'article'
+
+
+class DSFFatalError(Exception):
+    """致命错误（key错误、余额不足），继续请求没有意义"""
+    
+    def __init__(self, code, message: str):
+        super().__init__(f"{message} (错误码 {code})")
+        self.code = code
+        self.message = message
+
+
+class CircuitBreaker:
+    """
+    熔断器
+    
+    - 致命错误：立即熔断，之后的请求都抛出 DSFFatalError，只告警一次；
+      下一次运行开始时 reset()（充值或更换密钥后不需要重启进程）
+    - 连续 failure_threshold 次临时性错误：断开 cooldown_seconds 秒，期间请求等待
+    - 冷却结束后进入半开状态，只放行一个探测请求：成功则恢复，失败则重新断开
+    - 单篇文章的错误（文章被删除、链接有误等）说明接口本身正常，不计入失败
+    - 断开期间到达的响应来自断开前发出的在途请求，不会提前恢复，只有探测请求的结果决定是否恢复
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold: int = 5, cooldown_seconds: float = 30, on_fatal: Callable = None):
+        """
+        初始化熔断器
+        
+        Args:
+            failure_threshold: 连续临时性错误达到多少次后断开
+            cooldown_seconds: 断开后的冷却时间（秒）
+            on_fatal: 发生致命错误时的告警回调 on_fatal(code, message)，只调用一次
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self.on_fatal = on_fatal
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.fatal = None  # (错误码, 错误信息)
+        self.lock = threading.Lock()
+    
+    def reset(self):
+        """清除致命错误和失败计数，恢复正常（每次运行开始时调用）"""
+        with self.lock:
+            if self.fatal:
+                logger.info(f"清除上次运行的API致命错误: {self.fatal[1]} (错误码 {self.fatal[0]})")
+            self.fatal = None
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probe_in_flight = False
+    
+    def before_request(self):
+        """
+        请求前检查，断开期间阻塞等待，致命错误时抛出 DSFFatalError
+        """
+        while True:
+            with self.lock:
+                if self.fatal:
+                    raise DSFFatalError(*self.fatal)
+                
+                if self.state == self.CLOSED:
+                    return
+                
+                now = time.monotonic()
+                if self.state == self.OPEN and now - self.opened_at >= self.cooldown_seconds:
+                    self.state = self.HALF_OPEN
+                    self.probe_in_flight = False
+                    logger.info("API熔断冷却结束，发送探测请求")
+                
+                if self.state == self.HALF_OPEN and not self.probe_in_flight:
+                    self.probe_in_flight = True
+                    return
+                
+                if self.state == self.OPEN:
+                    wait_time = max(0.1, self.cooldown_seconds - (now - self.opened_at))
+                else:
+                    wait_time = 0.1
+            
+            time.sleep(wait_time)
+    
+    def _close(self):
+        """恢复正常（调用方持有锁）"""
+        if self.state != self.CLOSED:
+            logger.success("API熔断恢复，继续请求")
+        self.state = self.CLOSED
+        self.failures = 0
+        self.probe_in_flight = False
+    
+    def _open(self):
+        """断开（调用方持有锁）"""
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+        logger.warning(f"API连续 {self.failures} 次临时性错误，暂停请求 {self.cooldown_seconds} 秒")
+    
+    def record_success(self):
+        """记录一次成功的请求（断开期间到达的是断开前发出的请求，不提前结束冷却）"""
+        with self.lock:
+            if self.state != self.OPEN:
+                self._close()
+    
+    def record_failure(self, code, message: str = None):
+        """
+        记录一次失败的请求
+        
+        Args:
+            code: 错误码
+            message: 错误信息
+        """
+        kind = classify_error(code)
+        newly_fatal = False
+        
+        with self.lock:
+            if kind == 'fatal':
+                if not self.fatal:
+                    self.fatal = (code, message or '')
+                    newly_fatal = True
+            elif kind == 'transient':
+                self.failures += 1
+                if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                    self._open()
+            elif self.state != self.OPEN:
+                self._close()
+        
+        if newly_fatal:
+            logger.critical(f"🚨 阅读数据API致命错误: {message} (错误码 {code})，该密钥停止后续请求，请检查API密钥或账户余额")
+            if self.on_fatal:
+                try:
+                    self.on_fatal(code, message)
+                except Exception as e:
+                    logger.error(f"发送致命错误告警时出错: {e}")
+
+
+class TokenBucket:
+    """线程安全的令牌桶限流器"""
+    
+    def __init__(self, rate: float, capacity: float = 1):
+        """
+        初始化令牌桶
+        
+        Args:
+            rate: 每秒生成的令牌数（即QPS上限）
+            capacity: 桶容量（允许的突发请求数），为1时请求严格均匀间隔
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """获取一个令牌，令牌不足时阻塞等待"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                wait_time = (1 - self.tokens) / self.rate
+            
+            time.sleep(wait_time)
+
 
 class DSFApiClient:
     """第三方API客户端"""
     
-    def __init__(self, api_key: str, verify_code: str = "", base_url: str = "https://www.dajiala.com"):
+    def __init__(self, api_key: str, verify_code: str = "", base_url: str = "https://www.dajiala.com",
+                 qps: float = 5, breaker: CircuitBreaker = None):
         """
         初始化API客户端
         
@@ -26,33 +222,58 @@ class DSFApiClient:
             api_key: API密钥
             verify_code: 附加码（如果设置了附加码则必须提供）
             base_url: API基础URL
+            qps: 每秒请求数上限（接口要求不得高于5次/秒）
+            breaker: 熔断器，默认使用默认参数的熔断器
         """
         self.api_key = api_key
         self.verify_code = verify_code
         self.base_url = base_url
         self.api_endpoint = f"{base_url}/fbmain/monitor/v3/read_zan"
-        self.session = requests.Session()
         
-        # 设置请求头
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        # requests.Session 不保证线程安全，每个线程使用自己的会话
+        self._local = threading.local()
         
-        # QPS限制：不得高于5次/秒
-        self.last_request_time = 0
-        self.min_request_interval = 0.2  # 200ms间隔，确保不超过5次/秒
+        # QPS限制：不得高于5次/秒，所有线程共用一个令牌桶
+        self.rate_limiter = TokenBucket(qps)
         
-    def _wait_for_rate_limit(self):
-        """等待满足QPS限制"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
+        # 熔断：致命错误中止运行，连续临时性错误暂停一段时间
+        self.breaker = breaker or CircuitBreaker()
         
-        if time_since_last < self.min_request_interval:
-            wait_time = self.min_request_interval - time_since_last
-            time.sleep(wait_time)
+        # 调用和消费统计（成功调用才计费）
+        self._stats_lock = threading.Lock()
+        self.total_calls = 0
+        self.paid_calls = 0
+        self.total_cost_money = 0.0
+        self.last_cost_money = None
+        self.remain_money = None
+    
+    @property
+    def session(self) -> requests.Session:
+        """当前线程的HTTP会话"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            
+            # 设置请求头
+            session.headers.update({
+                'Content-Type': 'application/json',
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            })
+            self._local.session = session
+        return session
+    
+    @property
+    def fatal(self) -> Optional[Tuple]:
+        """发生过致命错误时返回 (错误码, 错误信息)，否则返回None"""
+        return self.breaker.fatal
         
-        self.last_request_time = time.time()
+    def reset(self):
+        """新一次运行开始时重置熔断器（上次运行的致命错误不再阻止请求）"""
+        self.breaker.reset()
+        
+    def _wait_for_rate_limit(self):
+        """等待满足QPS限制"""
+        self.rate_limiter.acquire()
     
     def get_article_stats(self, article_url: str) -> Tuple[bool, Optional[Dict], Optional[str]]:
         """
@@ -66,9 +287,53 @@ class DSFApiClient:
                 (成功标志, 数据字典, 错误信息)
                 数据字典包含: {'read': int, 'zan': int, 'looking': int}
         """
+        try:
+            result = self.fetch_article_stats(article_url)
+        except DSFFatalError as e:
+            return False, None, str(e)
+        return result['success'], result['stats'], result['error']
+    
+    def fetch_article_stats(self, article_url: str) -> Dict:
+        """
+        获取文章阅读量、点赞量、在看量（带错误码，经过熔断器）
+        
+        Args:
+            article_url: 微信文章链接
+            
+        Returns:
+            Dict: {'success': bool, 'stats': 数据字典或None, 'error': 错误信息或None, 'code': 错误码或None,
+                'elapsed': 请求耗时（秒，不含等待限流的时间）}
+                code 为API返回的状态码；请求本身失败时为
+                'timeout'（超时）、'network'（网络异常）、'invalid_json'（响应无法解析）、'unknown'
+                
+        Raises:
+            DSFFatalError: 此前已经发生过致命错误（key错误、余额不足）
+        """
+        self.breaker.before_request()
+        
+        result = self._request_article_stats(article_url)
+        DSF_REQUESTS.inc(code=str(result['code']))
+        if result['success']:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure(result['code'], result['error'])
+        return result
+    
+    def _request_article_stats(self, article_url: str) -> Dict:
+        """发送一次 read_zan 请求，返回格式同 fetch_article_stats"""
+        started = time.perf_counter()
+        
+        def failure(code, error_msg):
+            return {'success': False, 'stats': None, 'error': error_msg, 'code': code,
+                    'elapsed': time.perf_counter() - started}
+        
         try:
             # 等待满足QPS限制
             self._wait_for_rate_limit()
+            started = time.perf_counter()
+            
+            with self._stats_lock:
+                self.total_calls += 1
             
             # 准备请求数据
             request_data = {
@@ -112,37 +377,76 @@ class DSFApiClient:
                 
                 cost_money = result.get('cost_money', 0)
                 remain_money = result.get('remain_money', 0)
+                self._record_cost(cost_money, remain_money)
                 
                 logger.success(f"获取文章数据成功 - 阅读:{stats['read']} 点赞:{stats['zan']} 在看:{stats['looking']} "
                              f"消费:{cost_money}元 余额:{remain_money}元")
                 
-                return True, stats, None
+                return {'success': True, 'stats': stats, 'error': None, 'code': 0,
+                        'elapsed': time.perf_counter() - started}
                 
             else:
                 # API返回错误
                 error_msg = self._get_error_message(code, msg)
                 logger.warning(f"API返回错误 - 状态码:{code} 消息:{msg} 说明:{error_msg}")
-                return False, None, error_msg
+                return failure(code, error_msg)
                 
         except requests.exceptions.Timeout:
             error_msg = "请求超时"
             logger.error(f"API请求超时: {article_url}")
-            return False, None, error_msg
-            
-        except requests.exceptions.RequestException as e:
-            error_msg = f"网络请求异常: {str(e)}"
-            logger.error(f"API请求异常: {error_msg}")
-            return False, None, error_msg
+            return failure('timeout', error_msg)
             
         except json.JSONDecodeError as e:
             error_msg = f"响应JSON解析失败: {str(e)}"
             logger.error(f"API响应解析失败: {error_msg}")
-            return False, None, error_msg
+            return failure('invalid_json', error_msg)
+            
+        except requests.exceptions.RequestException as e:
+            error_msg = f"网络请求异常: {str(e)}"
+            logger.error(f"API请求异常: {error_msg}")
+            return failure('network', error_msg)
             
         except Exception as e:
             error_msg = f"未知错误: {str(e)}"
             logger.error(f"获取文章数据时发生未知错误: {error_msg}")
-            return False, None, error_msg
+            return failure('unknown', error_msg)
+    
+    def _record_cost(self, cost_money, remain_money):
+        """记录一次成功调用的消费金额和余额"""
+        try:
+            cost_money = float(cost_money or 0)
+        except (TypeError, ValueError):
+            cost_money = 0.0
+        
+        with self._stats_lock:
+            self.paid_calls += 1
+            self.total_cost_money += cost_money
+            self.last_cost_money = cost_money
+            self.remain_money = remain_money
+        
+        DSF_COST_MONEY.inc(cost_money)
+        try:
+            DSF_REMAIN_MONEY.set(float(remain_money), key=f"{self.api_key[:6]}***")
+        except (TypeError, ValueError):
+            pass
+    
+    def estimate_cost(self, calls: int, default_unit_cost: float = None) -> Optional[float]:
+        """
+        估算若干次调用的费用
+        
+        单价优先使用最近一次成功调用返回的 cost_money，没有时使用 default_unit_cost
+        
+        Args:
+            calls: 调用次数
+            default_unit_cost: 默认单价（元/次）
+            
+        Returns:
+            Optional[float]: 估算金额（元），单价未知时返回None
+        """
+        unit_cost = self.last_cost_money if self.last_cost_money is not None else default_unit_cost
+        if unit_cost is None:
+            return None
+        return round(calls * float(unit_cost), 4)
     
     def _get_error_message(self, code: int, msg: str) -> str:
         """
@@ -175,6 +479,54 @@ class DSFApiClient:
         else:
             return f"未知错误码: {code}"
     
+    def iter_article_stats(self, items: Iterable, url_getter: Callable = None,
+                           max_workers: int = 5) -> Iterator[Tuple[object, Dict]]:
+        """
+        并发获取多篇文章的数据，按完成顺序逐条返回
+        
+        多个请求同时在途，共用令牌桶，吞吐量接近QPS上限而不会超过；
+        items 只在调用方线程中被迭代（可以是逐页查询数据库的生成器），
+        同时在途的请求数不超过 max_workers 的两倍，不会一次性读完 items
+        
+        Args:
+            items: 文章列表（或生成器）
+            url_getter: 从元素中取出文章URL的函数，默认元素本身就是URL
+            max_workers: 并发线程数
+            
+        Yields:
+            Tuple: (元素, fetch_article_stats 的返回结果)
+            
+        Raises:
+            DSFFatalError: 发生致命错误，剩余的元素不再请求
+        """
+        if url_getter is None:
+            url_getter = lambda item: item
+        
+        max_workers = max(1, max_workers)
+        items = iter(items)
+        exhausted = False
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dsf") as executor:
+            in_flight = {}
+            
+            while True:
+                # 补充在途请求
+                while not exhausted and len(in_flight) < max_workers * 2:
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    in_flight[executor.submit(self.fetch_article_stats, url_getter(item))] = item
+                
+                if not in_flight:
+                    return
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = in_flight.pop(future)
+                    yield item, future.result()
+    
     def batch_get_article_stats(self, article_urls: list, max_retries: int = 3) -> Dict[str, Dict]:
         """
         批量获取多篇文章的数据
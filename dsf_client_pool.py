@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+第三方API多密钥客户端池
+====================
+
+read_zan 接口的QPS上限（5次/秒）是按API密钥计算的，配置多个密钥可以成倍提高吞吐量：
+
+    "api": {
+        "base_url": "https://www.dajiala.com",
+        "qps": 5,
+        "keys": [
+            {"key": "JZL...", "verify_code": ""},
+            {"key": "JZL...", "verify_code": "", "qps": 5}
+        ]
+    }
+
+每个密钥是一个独立的 DSFApiClient（各自的令牌桶、熔断器和余额统计），
+请求分派给在途请求数相对QPS最少的可用密钥；
+密钥发生致命错误（key错误、余额不足）或余额不高于 min_remain_money 时自动退出，
+该文章换一个密钥重新请求，全部密钥都不可用时抛出 DSFFatalError 中止运行。
+并发线程数（concurrency）应按所有密钥的QPS之和相应调大。
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+from dsf_api_client import CircuitBreaker, DSFApiClient, DSFFatalError, classify_error
+from spider.log.utils import logger
+
+
+def fatal_alert(api_key: str):
+    """
+    密钥发生致命错误时的告警回调（通过 notify.py 发送邮件）
+
+    Args:
+        api_key: API密钥
+
+    Returns:
+        Callable: on_fatal(code, message)
+    """
+    def on_fatal(code, message):
+        from notify import send_api_fatal_notification  # 只在告警时导入
+        send_api_fatal_notification(code, message, DSFApiClientPool._mask(api_key))
+
+    return on_fatal
+
+
+def create_api_client(api_config: Dict):
+    """
+    按配置创建API客户端
+
+    配置了 keys 时返回多密钥客户端池，否则返回使用 key 的单个客户端；
+    密钥发生致命错误时通过邮件告警（每个密钥每次运行一次）
+
+    Args:
+        api_config: 配置中的 api 部分
+
+    Returns:
+        DSFApiClient 或 DSFApiClientPool
+    """
+    base_url = api_config.get('base_url', 'https://www.dajiala.com')
+    breaker_config = api_config.get('breaker', {})
+
+    def build(key_config: Dict) -> DSFApiClient:
+        return DSFApiClient(
+            api_key=key_config.get('key', ''),
+            verify_code=key_config.get('verify_code', ''),
+            base_url=base_url,
+            qps=key_config.get('qps', api_config.get('qps', 5)),
+            breaker=CircuitBreaker(on_fatal=fatal_alert(key_config.get('key', '')), **breaker_config)
+        )
+
+    keys = api_config.get('keys') or []
+    if not keys:
+        return build(api_config)
+
+    return DSFApiClientPool([build(key_config) for key_config in keys], api_config.get('min_remain_money', 0))
+
+
+class DSFApiClientPool:
+    """第三方API多密钥客户端池（接口与 DSFApiClient 相同）"""
+
+    def __init__(self, clients: List[DSFApiClient], min_remain_money: float = 0):
+        """
+        初始化客户端池
+
+        Args:
+            clients: 每个密钥一个客户端
+            min_remain_money: 密钥余额不高于该值时退出（元），为None时只在余额不足错误时退出
+        """
+        self.clients = list(clients)
+        self.min_remain_money = min_remain_money
+        self.in_flight = [0] * len(self.clients)
+        self.dropped = set()  # 已退出的密钥序号
+        self.lock = threading.Lock()
+
+        logger.info(f"API客户端池: {len(self.clients)} 个密钥，"
+                    f"总QPS {sum(client.rate_limiter.rate for client in self.clients)}")
+
+    # 与单个客户端共用的方法（只依赖 fetch_article_stats 和统计属性）
+    get_article_stats = DSFApiClient.get_article_stats
+    iter_article_stats = DSFApiClient.iter_article_stats
+    estimate_cost = DSFApiClient.estimate_cost
+
+    @staticmethod
+    def _mask(api_key: str) -> str:
+        """日志中隐藏密钥中间部分"""
+        return f"{api_key[:6]}***" if api_key else '(空)'
+
+    def _drop_reason(self, client: DSFApiClient) -> Optional[Tuple]:
+        """密钥不可用的原因 (错误码, 说明)，可用时返回None"""
+        if client.breaker.fatal:
+            return client.breaker.fatal
+        if (self.min_remain_money is not None and client.remain_money is not None
+                and float(client.remain_money) <= float(self.min_remain_money)):
+            return '20001', f"余额 {client.remain_money} 元，不高于下限 {self.min_remain_money} 元"
+        return None
+
+    def _acquire(self, exclude: set) -> Optional[int]:
+        """
+        选出在途请求数相对QPS最少的可用密钥（熔断暂停中的密钥排在后面）
+
+        Args:
+            exclude: 本篇文章已经失败过的密钥序号
+
+        Returns:
+            Optional[int]: 密钥序号，没有可用密钥时返回None
+        """
+        with self.lock:
+            candidates = []
+            for index, client in enumerate(self.clients):
+                if index in self.dropped:
+                    continue
+                reason = self._drop_reason(client)
+                if reason:
+                    self.dropped.add(index)
+                    logger.warning(f"API密钥 {self._mask(client.api_key)} 退出客户端池: {reason[1]} (错误码 {reason[0]})，"
+                                   f"剩余 {len(self.clients) - len(self.dropped)} 个可用密钥")
+                    continue
+                if index not in exclude:
+                    candidates.append(index)
+
+            if not candidates:
+                return None
+
+            index = min(candidates, key=lambda i: (self.clients[i].breaker.state != CircuitBreaker.CLOSED,
+                                                   self.in_flight[i] / self.clients[i].rate_limiter.rate))
+            self.in_flight[index] += 1
+            return index
+
+    def _release(self, index: int):
+        """请求结束，减少在途计数"""
+        with self.lock:
+            self.in_flight[index] -= 1
+
+    def reset(self):
+        """新一次运行开始时重置所有密钥的熔断器，已退出的密钥重新加入（余额在下一次成功请求后重新判断）"""
+        with self.lock:
+            for index, client in enumerate(self.clients):
+                client.reset()
+                if index in self.dropped:
+                    client.remain_money = None
+            if self.dropped:
+                logger.info(f"API客户端池: {len(self.dropped)} 个已退出的密钥重新加入")
+            self.dropped.clear()
+
+    @property
+    def fatal(self) -> Optional[Tuple]:
+        """全部密钥都不可用时返回 (错误码, 说明)，否则返回None"""
+        reasons = [self._drop_reason(client) for client in self.clients]
+        if all(reasons):
+            return reasons[0]
+        return None
+
+    def fetch_article_stats(self, article_url: str) -> Dict:
+        """
+        用一个可用密钥获取文章数据，密钥发生致命错误时换下一个密钥重试
+
+        Args:
+            article_url: 微信文章链接
+
+        Returns:
+            Dict: 同 DSFApiClient.fetch_article_stats
+
+        Raises:
+            DSFFatalError: 全部密钥都不可用
+        """
+        tried = set()
+        last_result = None
+
+        while True:
+            index = self._acquire(tried)
+            if index is None:
+                if last_result:
+                    return last_result
+                code, message = self.fatal or ('20001', "没有可用的API密钥")
+                raise DSFFatalError(code, f"全部API密钥都不可用: {message}")
+
+            try:
+                result = self.clients[index].fetch_article_stats(article_url)
+            except DSFFatalError:
+                tried.add(index)
+                continue
+            finally:
+                self._release(index)
+
+            if not result['success'] and classify_error(result['code']) == 'fatal':
+                tried.add(index)
+                last_result = result
+                continue
+
+            return result
+
+    @property
+    def total_calls(self) -> int:
+        return sum(client.total_calls for client in self.clients)
+
+    @property
+    def paid_calls(self) -> int:
+        return sum(client.paid_calls for client in self.clients)
+
+    @property
+    def total_cost_money(self) -> float:
+        return sum(client.total_cost_money for client in self.clients)
+
+    @property
+    def last_cost_money(self) -> Optional[float]:
+        costs = [client.last_cost_money for client in self.clients if client.last_cost_money is not None]
+        return max(costs) if costs else None
+
+    @property
+    def remain_money(self) -> Optional[float]:
+        """各密钥余额之和，都还不知道余额时返回None"""
+        balances = [float(client.remain_money) for client in self.clients if client.remain_money is not None]
+        return round(sum(balances), 4) if balances else None
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地模拟第三方阅读数据API
+=====================
+
+模拟 dajiala.com 的 /fbmain/monitor/v3/read_zan 接口，用于在不产生费用的情况下
+测试和压测阅读量更新器（DSFApiClient 的 base_url 指向本服务即可）：
+
+- 每个密钥不得高于 qps 次/秒，超过时返回 -1（与真实接口一致）
+- 每次请求注入 latency_ms 范围内的随机延迟
+- 按 error_rates 中的概率返回指定错误码（101、107、20001、50000 等）
+- 阅读量、在看量、点赞量由文章URL确定，同一篇文章多次请求结果相同
+- 每次成功调用扣除 cost_money，余额不足时返回 20001；配置了 keys 时其他密钥返回 10002
+
+使用示例：
+    python fake_dsf_server.py
+    python fake_dsf_server.py --port 8765 --qps 5 --latency 50-200
+    python fake_dsf_server.py --errors 101:0.02,107:0.03,50000:0.01 --seed 42
+"""
+
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from collections import deque
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from spider.log.utils import logger
+
+READ_ZAN_PATH = '/fbmain/monitor/v3/read_zan'
+
+ERROR_MESSAGES = {
+    -1: "QPS超过上限",
+    101: "文章被删除或违规或公众号已迁移",
+    107: "解析失败，请重试",
+    10002: "key或附加码不正确",
+    20001: "金额不足，请充值",
+    20002: "请输入正确的微信链接",
+    50000: "Internal Server Error"
+}
+
+
+def article_stats(url: str) -> Dict[str, int]:
+    """根据文章URL生成确定的阅读数据"""
+    digest = hashlib.md5(url.encode('utf-8')).digest()
+    read = int.from_bytes(digest[:4], 'big') % 50000
+    return {
+        'read': read,
+        'zan': read * (digest[4] % 20) // 1000,
+        'looking': read * (digest[5] % 10) // 1000
+    }
+
+
+class FakeDSFServer:
+    """本地模拟API服务"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, qps: float = 5,
+                 latency_ms: Tuple[int, int] = (0, 0), error_rates: Dict[int, float] = None,
+                 keys: List[str] = None, balance: float = 1000.0, cost_money: float = 0.01, seed: int = None):
+        """
+        初始化模拟服务
+
+        Args:
+            host: 监听地址
+            port: 监听端口，0 表示随机分配
+            qps: 每个密钥每秒请求数上限
+            latency_ms: 随机延迟范围（毫秒）
+            error_rates: 错误码 -> 返回概率
+            keys: 有效的密钥列表，为空时接受任何密钥
+            balance: 每个密钥的初始余额（元）
+            cost_money: 每次成功调用的价格（元）
+            seed: 随机数种子（延迟和错误注入可重复）
+        """
+        self.host = host
+        self.port = port
+        self.qps = qps
+        self.latency_ms = latency_ms
+        self.error_rates = error_rates or {}
+        self.keys = set(keys or [])
+        self.initial_balance = balance
+        self.cost_money = cost_money
+        self.random = random.Random(seed)
+
+        self.lock = threading.Lock()
+        self.request_times: Dict[str, deque] = {}  # 密钥 -> 最近1秒内的请求时间
+        self.balances: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}          # 返回码 -> 次数
+
+        self.httpd = None
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        """供 DSFApiClient 使用的 base_url"""
+        return f"http://{self.host}:{self.port}"
+
+    def _check_qps(self, key: str) -> bool:
+        """滑动窗口检查QPS，未超过上限时记录本次请求（调用方持有锁）"""
+        now = time.monotonic()
+        times = self.request_times.setdefault(key, deque())
+        while times and now - times[0] >= 1.0:
+            times.popleft()
+        if len(times) >= self.qps:
+            return False
+        times.append(now)
+        return True
+
+    def _pick_error(self):
+        """按概率抽取注入的错误码，不注入时返回None（调用方持有锁）"""
+        value = self.random.random()
+        for code, rate in self.error_rates.items():
+            if value < rate:
+                return code
+            value -= rate
+        return None
+
+    def handle(self, request: Dict) -> Dict:
+        """
+        处理一次 read_zan 请求
+
+        Args:
+            request: 请求体 {'url', 'key', 'verifycode'}
+
+        Returns:
+            Dict: 响应体
+        """
+        key = request.get('key', '')
+        url = request.get('url', '')
+
+        with self.lock:
+            delay = self.random.uniform(*self.latency_ms) / 1000 if self.latency_ms[1] else 0
+
+            if self.keys and key not in self.keys:
+                code = 10002
+            elif not self._check_qps(key):
+                code = -1
+            elif not url.startswith('http'):
+                code = 20002
+            else:
+                code = self._pick_error()
+                balance = self.balances.setdefault(key, self.initial_balance)
+                if code is None and balance < self.cost_money:
+                    code = 20001
+                if code is None:
+                    code = 0
+                    self.balances[key] = round(balance - self.cost_money, 4)
+            self.counts[str(code)] = self.counts.get(str(code), 0) + 1
+
+        if delay:
+            time.sleep(delay)
+
+        if code != 0:
+            return {'code': code, 'msg': ERROR_MESSAGES.get(code, '')}
+
+        return {
+            'code': 0,
+            'msg': '成功',
+            'data': article_stats(url),
+            'cost_money': self.cost_money,
+            'remain_money': self.balances[key]
+        }
+
+    def start(self) -> 'FakeDSFServer':
+        """在后台线程中启动服务"""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path != READ_ZAN_PATH:
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get('Content-Length', 0))
+                try:
+                    request = json.loads(self.rfile.read(length) or b'{}')
+                except json.JSONDecodeError:
+                    request = {}
+                body = json.dumps(server.handle(request), ensure_ascii=False).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="fake-dsf", daemon=True)
+        self.thread.start()
+        logger.info(f"模拟API已启动: {self.base_url}{READ_ZAN_PATH} (QPS {self.qps}，延迟 {self.latency_ms} ms，"
+                    f"错误注入 {self.error_rates or '无'})")
+        return self
+
+    def stop(self):
+        """停止服务"""
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+
+def parse_latency(text: str) -> Tuple[int, int]:
+    """解析延迟范围，如 '50-200' 或 '100'"""
+    low, _, high = text.partition('-')
+    return int(low), int(high or low)
+
+
+def parse_error_rates(text: str) -> Dict[int, float]:
+    """解析错误注入配置，如 '101:0.02,107:0.03'"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        code, _, rate = item.partition(':')
+        rates[int(code)] = float(rate)
+    return rates
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(
+        description="本地模拟第三方阅读数据API",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("使用示例：")[1]
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    parser.add_argument("--qps", type=float, default=5, help="每个密钥每秒请求数上限")
+    parser.add_argument("--latency", default="0", metavar="MIN-MAX", help="随机延迟范围（毫秒）")
+    parser.add_argument("--errors", default="", metavar="CODE:RATE,...", help="错误码及返回概率")
+    parser.add_argument("--keys", default="", help="有效密钥（逗号分隔），为空时接受任何密钥")
+    parser.add_argument("--balance", type=float, default=1000.0, help="每个密钥的初始余额（元）")
+    parser.add_argument("--cost", type=float, default=0.01, help="每次成功调用的价格（元）")
+    parser.add_argument("--seed", type=int, help="随机数种子")
+    args = parser.parse_args()
+
+    server = FakeDSFServer(
+        host=args.host,
+        port=args.port,
+        qps=args.qps,
+        latency_ms=parse_latency(args.latency),
+        error_rates=parse_error_rates(args.errors),
+        keys=[key for key in args.keys.split(',') if key],
+        balance=args.balance,
+        cost_money=args.cost,
+        seed=args.seed
+    ).start()
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        logger.info(f"模拟API已停止，返回码统计: {server.counts}")
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
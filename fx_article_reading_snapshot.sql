@@ -0,0 +1,33 @@
+/*
+ Navicat Premium Dump SQL
+
+ Source Server         : faxuan
+ Source Server Type    : MySQL
+ Source Server Version : 80043 (8.0.43)
+ Source Host           : localhost:3306
+ Source Schema         : faxuan
+
+ Target Server Type    : MySQL
+ Target Server Version : 80043 (8.0.43)
+ File Encoding         : 65001
+
+ Date: 19/10/2026 10:00:00
+*/
+
+SET NAMES utf8mb4;
+SET FOREIGN_KEY_CHECKS = 0;
+
+-- ----------------------------
+-- Table structure for fx_article_reading_snapshot
+-- ----------------------------
+DROP TABLE IF EXISTS `fx_article_reading_snapshot`;
+CREATE TABLE `fx_article_reading_snapshot`  (
+  `article_id` varchar(20) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL COMMENT '文章ID',
+  `fetched_at` datetime NOT NULL COMMENT '数据获取时间',
+  `read_count` int UNSIGNED NOT NULL COMMENT '阅读量',
+  `looking_count` int UNSIGNED NOT NULL COMMENT '在看量',
+  `zan_count` int UNSIGNED NOT NULL COMMENT '点赞量',
+  PRIMARY KEY (`article_id`, `fetched_at`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '文章阅读数据快照表（只追加）' ROW_FORMAT = COMPRESSED KEY_BLOCK_SIZE = 8;
+
+SET FOREIGN_KEY_CHECKS = 1;
@@ -40,7 +40,8 @@ CREATE TABLE `fx_article_records`  (
   `comments` varchar(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL COMMENT '评论量',
   `analysis` varchar(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL COMMENT '是否进行普法分析判断',
   PRIMARY KEY (`id`) USING BTREE,
-  INDEX `idx_article_url`(`article_url`(255) ASC) USING BTREE
+  INDEX `idx_article_url`(`article_url`(255) ASC) USING BTREE,
+  INDEX `idx_publish_time`(`publish_time` ASC) USING BTREE
 ) ENGINE = InnoDB AUTO_INCREMENT = 101174 CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '文章记录表' ROW_FORMAT = DYNAMIC;
 
 SET FOREIGN_KEY_CHECKS = 1;
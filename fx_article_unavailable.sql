@@ -0,0 +1,35 @@
+/*
+ Navicat Premium Dump SQL
+
+ Source Server         : faxuan
+ Source Server Type    : MySQL
+ Source Server Version : 80043 (8.0.43)
+ Source Host           : localhost:3306
+ Source Schema         : faxuan
+
+ Target Server Type    : MySQL
+ Target Server Version : 80043 (8.0.43)
+ File Encoding         : 65001
+
+ Date: 19/10/2026 10:00:00
+*/
+
+SET NAMES utf8mb4;
+SET FOREIGN_KEY_CHECKS = 0;
+
+-- ----------------------------
+-- Table structure for fx_article_unavailable
+-- ----------------------------
+DROP TABLE IF EXISTS `fx_article_unavailable`;
+CREATE TABLE `fx_article_unavailable`  (
+  `article_id` varchar(20) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL COMMENT '文章ID',
+  `error_code` varchar(20) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL COMMENT 'API错误码（101=文章被删除或违规或公众号已迁移，20002/20003=链接有误）',
+  `error_msg` varchar(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL COMMENT '错误信息',
+  `check_count` int UNSIGNED NOT NULL DEFAULT 1 COMMENT '确认不可用的次数',
+  `first_seen_at` datetime NOT NULL COMMENT '首次发现不可用的时间',
+  `last_checked_at` datetime NOT NULL COMMENT '最近一次确认不可用的时间',
+  PRIMARY KEY (`article_id`) USING BTREE,
+  INDEX `idx_last_checked_at`(`last_checked_at` ASC) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '永久不可用文章表（阅读数据刷新时排除）' ROW_FORMAT = DYNAMIC;
+
+SET FOREIGN_KEY_CHECKS = 1;
@@ -0,0 +1,35 @@
+/*
+ Navicat Premium Dump SQL
+
+ Source Server         : faxuan
+ Source Server Type    : MySQL
+ Source Server Version : 80043 (8.0.43)
+ Source Host           : localhost:3306
+ Source Schema         : faxuan
+
+ Target Server Type    : MySQL
+ Target Server Version : 80043 (8.0.43)
+ File Encoding         : 65001
+
+ Date: 19/10/2026 10:00:00
+*/
+
+SET NAMES utf8mb4;
+SET FOREIGN_KEY_CHECKS = 0;
+
+-- ----------------------------
+-- Table structure for fx_job_lease
+-- ----------------------------
+DROP TABLE IF EXISTS `fx_job_lease`;
+CREATE TABLE `fx_job_lease`  (
+  `name` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL COMMENT '租约名称（如 dsf_refresh、crawl、job:reading_refresh）',
+  `owner` varchar(200) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL COMMENT '持有者（主机名:进程号:随机串）',
+  `fence` bigint UNSIGNED NOT NULL DEFAULT 0 COMMENT '栅栏令牌（每次获取加1，续期和释放时校验）',
+  `acquired_at` datetime NULL DEFAULT NULL COMMENT '获取时间',
+  `renewed_at` datetime NULL DEFAULT NULL COMMENT '最近一次续期时间',
+  `expires_at` datetime NOT NULL COMMENT '过期时间（过期后其他节点可以接管）',
+  `finished_at` datetime NULL DEFAULT NULL COMMENT '最近一次正常完成的时间',
+  PRIMARY KEY (`name`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '任务租约表（多节点、多进程互斥）' ROW_FORMAT = DYNAMIC;
+
+SET FOREIGN_KEY_CHECKS = 1;
@@ -0,0 +1,37 @@
+/*
+ Navicat Premium Dump SQL
+
+ Source Server         : faxuan
+ Source Server Type    : MySQL
+ Source Server Version : 80043 (8.0.43)
+ Source Host           : localhost:3306
+ Source Schema         : faxuan
+
+ Target Server Type    : MySQL
+ Target Server Version : 80043 (8.0.43)
+ File Encoding         : 65001
+
+ Date: 19/10/2026 10:00:00
+*/
+
+SET NAMES utf8mb4;
+SET FOREIGN_KEY_CHECKS = 0;
+
+-- ----------------------------
+-- Table structure for fx_reading_daily_summary
+-- ----------------------------
+DROP TABLE IF EXISTS `fx_reading_daily_summary`;
+CREATE TABLE `fx_reading_daily_summary`  (
+  `stat_date` date NOT NULL COMMENT '文章发布日期',
+  `total_articles` int NOT NULL DEFAULT 0 COMMENT '当日发布的普法文章总数',
+  `updated_articles` int NOT NULL DEFAULT 0 COMMENT '当日发布且阅读数据完整的普法文章数',
+  `refresh_time` datetime NOT NULL COMMENT '汇总刷新时间（置为1970-01-01表示需要重新汇总）',
+  PRIMARY KEY (`stat_date`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '普法文章阅读数据日汇总表' ROW_FORMAT = DYNAMIC;
+
+-- ----------------------------
+-- 已有库升级：汇总按 publish_time 分日统计，需要发布时间索引
+-- ----------------------------
+-- ALTER TABLE `fx_article_records` ADD INDEX `idx_publish_time`(`publish_time` ASC);
+
+SET FOREIGN_KEY_CHECKS = 1;
@@ -0,0 +1,37 @@
+/*
+ Navicat Premium Dump SQL
+
+ Source Server         : faxuan
+ Source Server Type    : MySQL
+ Source Server Version : 80043 (8.0.43)
+ Source Host           : localhost:3306
+ Source Schema         : faxuan
+
+ Target Server Type    : MySQL
+ Target Server Version : 80043 (8.0.43)
+ File Encoding         : 65001
+
+ Date: 19/10/2026 10:00:00
+*/
+
+SET NAMES utf8mb4;
+SET FOREIGN_KEY_CHECKS = 0;
+
+-- ----------------------------
+-- Table structure for fx_reading_retry_queue
+-- ----------------------------
+DROP TABLE IF EXISTS `fx_reading_retry_queue`;
+CREATE TABLE `fx_reading_retry_queue`  (
+  `article_id` varchar(20) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL COMMENT '文章ID',
+  `error_code` varchar(20) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL COMMENT '最近一次失败的错误码（API状态码或 timeout/network/invalid_json）',
+  `error_msg` varchar(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL COMMENT '最近一次失败的错误信息',
+  `attempts` int UNSIGNED NOT NULL DEFAULT 1 COMMENT '已失败次数',
+  `status` varchar(10) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL DEFAULT 'pending' COMMENT 'pending=等待重试，exhausted=已达最大重试次数',
+  `next_retry_at` datetime NOT NULL COMMENT '下次重试时间',
+  `first_failed_at` datetime NOT NULL COMMENT '首次失败时间',
+  `last_failed_at` datetime NOT NULL COMMENT '最近一次失败时间',
+  PRIMARY KEY (`article_id`) USING BTREE,
+  INDEX `idx_status_next_retry`(`status` ASC, `next_retry_at` ASC) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '阅读数据获取失败重试队列' ROW_FORMAT = DYNAMIC;
+
+SET FOREIGN_KEY_CHECKS = 1;
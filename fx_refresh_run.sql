@@ -0,0 +1,52 @@
+/*
+ Navicat Premium Dump SQL
+
+ Source Server         : faxuan
+ Source Server Type    : MySQL
+ Source Server Version : 80043 (8.0.43)
+ Source Host           : localhost:3306
+ Source Schema         : faxuan
+
+ Target Server Type    : MySQL
+ Target Server Version : 80043 (8.0.43)
+ File Encoding         : 65001
+
+ Date: 19/10/2026 10:00:00
+*/
+
+SET NAMES utf8mb4;
+SET FOREIGN_KEY_CHECKS = 0;
+
+-- ----------------------------
+-- Table structure for fx_refresh_run
+-- ----------------------------
+DROP TABLE IF EXISTS `fx_refresh_run`;
+CREATE TABLE `fx_refresh_run`  (
+  `id` bigint NOT NULL AUTO_INCREMENT COMMENT '运行ID',
+  `kind` varchar(20) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL COMMENT '运行类型（planner 统一刷新、theme 法律主题更新）',
+  `status` varchar(20) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL COMMENT '状态（running 运行中、finished 已完成、aborted 致命错误中止、interrupted 提前停止、failed 无法续跑、superseded 已被新的运行取代）',
+  `params` varchar(1000) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL COMMENT '运行参数（JSON，如主题ID）',
+  `started_at` datetime NOT NULL COMMENT '首次开始时间（续跑时按该时间重建刷新规则）',
+  `updated_at` datetime NOT NULL COMMENT '最近一次进度更新时间',
+  `finished_at` datetime NULL DEFAULT NULL COMMENT '结束时间',
+  `resume_count` int UNSIGNED NOT NULL DEFAULT 0 COMMENT '续跑次数',
+  `total_items` int UNSIGNED NOT NULL DEFAULT 0 COMMENT '已登记的文章数',
+  `done_items` int UNSIGNED NOT NULL DEFAULT 0 COMMENT '获取成功的文章数',
+  `failed_items` int UNSIGNED NOT NULL DEFAULT 0 COMMENT '获取失败的文章数（已交给重试队列或不可用缓存）',
+  PRIMARY KEY (`id`) USING BTREE,
+  INDEX `idx_kind_status`(`kind` ASC, `status` ASC, `started_at` ASC) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '阅读数据刷新运行记录表' ROW_FORMAT = DYNAMIC;
+
+-- ----------------------------
+-- Table structure for fx_refresh_run_item
+-- ----------------------------
+DROP TABLE IF EXISTS `fx_refresh_run_item`;
+CREATE TABLE `fx_refresh_run_item`  (
+  `run_id` bigint NOT NULL COMMENT '运行ID',
+  `article_id` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL COMMENT '文章ID',
+  `status` varchar(10) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL DEFAULT 'pending' COMMENT '状态（pending 待处理、done 成功、failed 失败）',
+  `updated_at` datetime NOT NULL COMMENT '状态更新时间',
+  PRIMARY KEY (`run_id`, `article_id`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '阅读数据刷新运行文章进度表' ROW_FORMAT = DYNAMIC;
+
+SET FOREIGN_KEY_CHECKS = 1;
@@ -0,0 +1,42 @@
+/*
+ Navicat Premium Dump SQL
+
+ Source Server         : faxuan
+ Source Server Type    : MySQL
+ Source Server Version : 80043 (8.0.43)
+ Source Host           : localhost:3306
+ Source Schema         : faxuan
+
+ Target Server Type    : MySQL
+ Target Server Version : 80043 (8.0.43)
+ File Encoding         : 65001
+
+ Date: 19/10/2026 10:00:00
+*/
+
+SET NAMES utf8mb4;
+SET FOREIGN_KEY_CHECKS = 0;
+
+-- ----------------------------
+-- Table structure for fx_refresh_spend
+-- ----------------------------
+DROP TABLE IF EXISTS `fx_refresh_spend`;
+CREATE TABLE `fx_refresh_spend`  (
+  `id` bigint NOT NULL AUTO_INCREMENT COMMENT '自增主键',
+  `source` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL DEFAULT 'refresh' COMMENT '消费来源（refresh 统一刷新、article 文章更新、theme 法律主题更新、worker:主机名:进程号 工作进程）',
+  `started_at` datetime NOT NULL COMMENT '刷新开始时间',
+  `finished_at` datetime NOT NULL COMMENT '刷新结束时间',
+  `candidates` int UNSIGNED NOT NULL DEFAULT 0 COMMENT '候选文章数',
+  `selected` int UNSIGNED NOT NULL DEFAULT 0 COMMENT '预算内选中的文章数',
+  `api_calls` int UNSIGNED NOT NULL DEFAULT 0 COMMENT '实际调用API次数（含失败和重试）',
+  `paid_calls` int UNSIGNED NOT NULL DEFAULT 0 COMMENT '成功（计费）的调用次数',
+  `cost_money` decimal(10, 4) NOT NULL DEFAULT 0.0000 COMMENT '实际消费金额（元）',
+  `remain_money` decimal(12, 4) NULL DEFAULT NULL COMMENT '结束时账户余额（元）',
+  `budget_money` decimal(10, 4) NULL DEFAULT NULL COMMENT '本次可用金额预算（元）',
+  `budget_calls` int UNSIGNED NULL DEFAULT NULL COMMENT '本次可用调用次数预算',
+  `stopped_reason` varchar(50) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL COMMENT '提前停止原因（为空表示正常完成）',
+  PRIMARY KEY (`id`) USING BTREE,
+  INDEX `idx_started_at`(`started_at` ASC) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '阅读数据刷新消费记录表' ROW_FORMAT = DYNAMIC;
+
+SET FOREIGN_KEY_CHECKS = 1;
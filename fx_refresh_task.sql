@@ -0,0 +1,46 @@
+/*
+ Navicat Premium Dump SQL
+
+ Source Server         : faxuan
+ Source Server Type    : MySQL
+ Source Server Version : 80043 (8.0.43)
+ Source Host           : localhost:3306
+ Source Schema         : faxuan
+
+ Target Server Type    : MySQL
+ Target Server Version : 80043 (8.0.43)
+ File Encoding         : 65001
+
+ Date: 19/10/2026 10:00:00
+*/
+
+SET NAMES utf8mb4;
+SET FOREIGN_KEY_CHECKS = 0;
+
+-- ----------------------------
+-- Table structure for fx_refresh_task
+-- ----------------------------
+DROP TABLE IF EXISTS `fx_refresh_task`;
+CREATE TABLE `fx_refresh_task`  (
+  `article_id` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL COMMENT '文章ID',
+  `article_url` varchar(500) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL COMMENT '文章链接',
+  `article_title` varchar(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL COMMENT '文章标题',
+  `publish_time` datetime NULL DEFAULT NULL COMMENT '发布时间',
+  `view_count` int NULL DEFAULT NULL COMMENT '入队时的阅读量（用于跳过无变化的写入）',
+  `likes` int NULL DEFAULT NULL COMMENT '入队时的在看量',
+  `thumbs_count` varchar(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL COMMENT '入队时的点赞量',
+  `rules` varchar(200) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL COMMENT '命中的刷新规则（逗号分隔）',
+  `status` varchar(10) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL DEFAULT 'pending' COMMENT '状态（pending 待领取、claimed 已领取、done 成功、failed 失败）',
+  `worker` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL COMMENT '领取任务的工作进程',
+  `attempts` int UNSIGNED NOT NULL DEFAULT 0 COMMENT '领取次数',
+  `enqueued_at` datetime NOT NULL COMMENT '入队时间',
+  `claimed_until` datetime NULL DEFAULT NULL COMMENT '领取到期时间（到期未完成时重新入队）',
+  `finished_at` datetime NULL DEFAULT NULL COMMENT '完成时间',
+  `error` varchar(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL COMMENT '失败原因',
+  PRIMARY KEY (`article_id`) USING BTREE,
+  INDEX `idx_status_enqueued`(`status` ASC, `enqueued_at` ASC) USING BTREE,
+  INDEX `idx_status_claimed`(`status` ASC, `claimed_until` ASC) USING BTREE,
+  INDEX `idx_worker`(`worker` ASC, `status` ASC) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '阅读数据刷新任务队列表' ROW_FORMAT = DYNAMIC;
+
+SET FOREIGN_KEY_CHECKS = 1;
@@ -0,0 +1,42 @@
+/*
+ Navicat Premium Dump SQL
+
+ Source Server         : faxuan
+ Source Server Type    : MySQL
+ Source Server Version : 80043 (8.0.43)
+ Source Host           : localhost:3306
+ Source Schema         : faxuan
+
+ Target Server Type    : MySQL
+ Target Server Version : 80043 (8.0.43)
+ File Encoding         : 65001
+
+ Date: 19/10/2026 10:00:00
+*/
+
+SET NAMES utf8mb4;
+SET FOREIGN_KEY_CHECKS = 0;
+
+-- ----------------------------
+-- Table structure for fx_run_history
+-- ----------------------------
+DROP TABLE IF EXISTS `fx_run_history`;
+CREATE TABLE `fx_run_history`  (
+  `id` bigint NOT NULL AUTO_INCREMENT COMMENT '运行ID',
+  `kind` varchar(20) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL COMMENT '运行类型（crawl 爬虫、refresh 统一刷新、article 常规更新、theme 主题更新、worker 刷新工作进程）',
+  `host` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL COMMENT '运行的机器',
+  `status` varchar(20) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NOT NULL COMMENT '结果（success 成功、failed 失败、aborted 致命错误中止、interrupted 被中断）',
+  `started_at` datetime NOT NULL COMMENT '开始时间',
+  `finished_at` datetime NOT NULL COMMENT '结束时间',
+  `duration_seconds` decimal(12, 2) NOT NULL DEFAULT 0.00 COMMENT '总耗时（秒）',
+  `items` int UNSIGNED NOT NULL DEFAULT 0 COMMENT '处理数量（爬虫为保存的文章数，刷新为调用API的文章数）',
+  `rate` decimal(12, 3) NOT NULL DEFAULT 0.000 COMMENT '有效速率（处理数量/总耗时，个/秒）',
+  `stages` text CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL COMMENT '分阶段耗时（JSON，阶段 -> {seconds, count, bytes}）',
+  `counts` text CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL COMMENT '计数（JSON）',
+  `error_codes` text CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL COMMENT '错误码分布（JSON，错误码 -> 次数）',
+  PRIMARY KEY (`id`) USING BTREE,
+  INDEX `idx_kind_started`(`kind` ASC, `started_at` ASC) USING BTREE,
+  INDEX `idx_started_at`(`started_at` ASC) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci COMMENT = '爬取和刷新运行耗时历史表' ROW_FORMAT = DYNAMIC;
+
+SET FOREIGN_KEY_CHECKS = 1;
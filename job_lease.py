@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+任务租约（多节点、多进程互斥）
+=========================
+
+同一时间只允许一个进程做同一件事：阅读数据刷新（各入口共用 dsf_refresh，合计不超过QPS上限）、
+爬虫（crawl）、调度器中的各个任务（job:任务名，可以部署多个调度节点做冗余）。
+
+- 租约记录在 fx_job_lease 中，带过期时间；持有者每 ttl/3 秒续期一次，
+  进程崩溃或断网后租约自然过期，其他节点可以接管
+- 检查并获取租约在 GET_LOCK 互斥区内完成，多个节点同时获取时只有一个成功
+- 所有时间都使用数据库的 NOW()，不受各节点时钟偏差影响
+- 每次获取都会递增栅栏令牌（fence），续期和释放时校验，接管后旧持有者的续期会失败，
+  lost 变为True，调用方应尽快停止
+- 租约使用独立的数据库连接，续期线程不会与业务查询共用连接
+"""
+
+import os
+import uuid
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+import pymysql
+from spider.log.utils import logger
+
+# 阅读数据刷新（统一刷新、常规更新、主题更新、手动更新）共用的租约
+REFRESH_LEASE = 'dsf_refresh'
+
+# 爬虫租约
+CRAWL_LEASE = 'crawl'
+
+DEFAULT_TTL_SECONDS = 120
+
+
+class JobLease:
+    """任务租约"""
+
+    def __init__(self, db, name: str, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        """
+        初始化租约
+
+        Args:
+            db: DatabaseManager 实例（只使用其连接参数，租约自己建立连接）
+            name: 租约名称
+            ttl_seconds: 租约有效期（秒），持有者每 ttl/3 秒续期
+        """
+        self.db_params = {
+            'host': db.host,
+            'port': db.port,
+            'user': db.user,
+            'password': db.password,
+            'database': db.database
+        }
+        self.name = name
+        self.ttl_seconds = max(3, int(ttl_seconds))
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.fence: Optional[int] = None
+        self.lost = False
+
+        self.connection = None
+        self.lock = threading.Lock()  # 续期线程与调用方线程共用连接
+        self._stop_renewal = threading.Event()
+        self._renewal_thread = None
+
+    @classmethod
+    def from_config(cls, db, config: Dict, name: str) -> Optional['JobLease']:
+        """
+        按配置创建租约
+
+        配置项 lease: {'enabled': 是否启用（默认启用）, 'ttl_seconds': 有效期}
+
+        Returns:
+            Optional[JobLease]: 未启用时返回None
+        """
+        lease_config = config.get('lease', {})
+        if not lease_config.get('enabled', True):
+            return None
+        return cls(db, name, lease_config.get('ttl_seconds', DEFAULT_TTL_SECONDS))
+
+    @property
+    def acquired(self) -> bool:
+        """当前是否持有租约"""
+        return self.fence is not None and not self.lost
+
+    def _connect(self):
+        """建立（或重建）租约使用的数据库连接"""
+        if self.connection is not None:
+            try:
+                self.connection.ping(reconnect=True)
+                return
+            except Exception:
+                self.connection = None
+
+        self.connection = pymysql.connect(
+            charset='utf8mb4',
+            cursorclass=pymysql.cursors.DictCursor,
+            autocommit=True,
+            connect_timeout=10,
+            read_timeout=30,
+            write_timeout=30,
+            **self.db_params
+        )
+
+    def _close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+    def _try_acquire(self) -> bool:
+        """在 GET_LOCK 互斥区内检查并获取租约（调用方持有 self.lock）"""
+        mutex = f"fx_job_lease:{self.name}"
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT GET_LOCK(%s, 10) AS locked", (mutex,))
+            if not cursor.fetchone()['locked']:
+                return False
+
+            try:
+                cursor.execute(
+                    "SELECT owner, fence, expires_at, expires_at > NOW() AS active "
+                    "FROM fx_job_lease WHERE name = %s",
+                    (self.name,)
+                )
+                row = cursor.fetchone()
+
+                if row and row['active'] and row['owner'] != self.owner:
+                    logger.info(f"租约 {self.name} 由 {row['owner']} 持有，到期时间 {row['expires_at']}")
+                    return False
+
+                fence = (row['fence'] if row else 0) + 1
+                cursor.execute(
+                    """
+                    INSERT INTO fx_job_lease (name, owner, fence, acquired_at, renewed_at, expires_at)
+                    VALUES (%s, %s, %s, NOW(), NOW(), NOW() + INTERVAL %s SECOND)
+                    ON DUPLICATE KEY UPDATE
+                        owner = VALUES(owner),
+                        fence = VALUES(fence),
+                        acquired_at = VALUES(acquired_at),
+                        renewed_at = VALUES(renewed_at),
+                        expires_at = VALUES(expires_at)
+                    """,
+                    (self.name, self.owner, fence, self.ttl_seconds)
+                )
+                self.fence = fence
+                return True
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (mutex,))
+
+    def acquire(self, wait_seconds: float = 0) -> bool:
+        """
+        获取租约，成功后启动续期线程
+
+        Args:
+            wait_seconds: 被其他进程持有时最多等待的秒数，0 表示不等待
+
+        Returns:
+            bool: 获取成功返回True
+        """
+        deadline = time.monotonic() + wait_seconds
+        while True:
+            try:
+                with self.lock:
+                    self._connect()
+                    acquired = self._try_acquire()
+            except Exception as e:
+                logger.error(f"获取租约 {self.name} 时出错: {e}")
+                acquired = False
+
+            if acquired:
+                self.lost = False
+                self._stop_renewal.clear()
+                self._renewal_thread = threading.Thread(target=self._renew_loop, name=f"lease-{self.name}",
+                                                        daemon=True)
+                self._renewal_thread.start()
+                logger.info(f"🔒 已获取租约 {self.name} (持有者 {self.owner}，令牌 {self.fence})")
+                return True
+
+            if time.monotonic() >= deadline:
+                self._close()
+                return False
+            time.sleep(min(5.0, max(0.5, deadline - time.monotonic())))
+
+    def renew(self) -> bool:
+        """
+        续期（只有持有者和令牌都匹配时才会成功，被接管后令牌已经改变）
+
+        Returns:
+            bool: 续期成功返回True
+        """
+        try:
+            with self.lock:
+                self._connect()
+                with self.connection.cursor() as cursor:
+                    renewed = cursor.execute(
+                        "UPDATE fx_job_lease SET renewed_at = NOW(), expires_at = NOW() + INTERVAL %s SECOND "
+                        "WHERE name = %s AND owner = %s AND fence = %s",
+                        (self.ttl_seconds, self.name, self.owner, self.fence)
+                    )
+            return bool(renewed)
+        except Exception as e:
+            logger.warning(f"续期租约 {self.name} 时出错: {e}")
+            return False
+
+    def _renew_loop(self):
+        """每 ttl/3 秒续期一次，连续失败到租约过期时标记为丢失"""
+        interval = self.ttl_seconds / 3
+        last_renewed = time.monotonic()
+        while not self._stop_renewal.wait(interval):
+            if self.renew():
+                last_renewed = time.monotonic()
+                continue
+            if time.monotonic() - last_renewed >= self.ttl_seconds or self._held_by_other():
+                self.lost = True
+                logger.error(f"⚠️ 租约 {self.name} 已丢失（过期或被其他节点接管），应停止当前任务")
+                return
+
+    def _held_by_other(self) -> bool:
+        """租约是否已经被其他持有者接管"""
+        try:
+            with self.lock:
+                with self.connection.cursor() as cursor:
+                    cursor.execute("SELECT owner, fence FROM fx_job_lease WHERE name = %s", (self.name,))
+                    row = cursor.fetchone()
+            return not row or row['owner'] != self.owner or row['fence'] != self.fence
+        except Exception:
+            return False
+
+    def release(self, finished: bool = True):
+        """
+        释放租约
+
+        Args:
+            finished: 任务正常完成时记录完成时间（供 finished_since 判断其他节点是否已经做过）
+        """
+        self._stop_renewal.set()
+        if self._renewal_thread:
+            self._renewal_thread.join(timeout=5)
+            self._renewal_thread = None
+
+        if self.fence is None:
+            self._close()
+            return
+
+        try:
+            with self.lock:
+                self._connect()
+                with self.connection.cursor() as cursor:
+                    cursor.execute(
+                        "UPDATE fx_job_lease SET expires_at = NOW(), "
+                        "finished_at = IF(%s, NOW(), finished_at) "
+                        "WHERE name = %s AND owner = %s AND fence = %s",
+                        (finished, self.name, self.owner, self.fence)
+                    )
+            logger.info(f"🔓 已释放租约 {self.name}")
+        except Exception as e:
+            logger.warning(f"释放租约 {self.name} 时出错: {e}（租约将在 {self.ttl_seconds} 秒内过期）")
+        finally:
+            self.fence = None
+            self._close()
+
+    def finished_since(self, moment: datetime) -> bool:
+        """
+        任务是否已在 moment 之后正常完成过（任意节点）
+
+        Args:
+            moment: 时间点
+
+        Returns:
+            bool: 已完成返回True，查询失败时返回False
+        """
+        try:
+            with self.lock:
+                self._connect()
+                with self.connection.cursor() as cursor:
+                    cursor.execute("SELECT finished_at FROM fx_job_lease WHERE name = %s", (self.name,))
+                    row = cursor.fetchone()
+            return bool(row and row['finished_at'] and row['finished_at'] >= moment)
+        except Exception as e:
+            logger.warning(f"查询租约 {self.name} 完成时间时出错: {e}")
+            return False
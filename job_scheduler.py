@@ -0,0 +1,622 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+统一任务调度器
+===========
+
+用一个常驻进程代替 start.py、scheduled_task.py、reading_update_scheduler.py 和各个 .bat 定时脚本，
+爬虫、阅读数据刷新、法律主题更新、Token监控作为任务统一调度：
+
+- cron 触发：每个任务用5段 cron 表达式（分 时 日 月 周）指定执行时间
+- 依赖：after 中的任务本轮未完成（或正在运行）时等待，最多等待 max_wait_hours 小时，
+  如阅读数据刷新在当天的爬虫完成后执行
+- 互斥：exclusive 任务（默认）同一时间只运行一个，爬虫和刷新不会同时争用API和数据库
+- 状态持久化：每个任务最近一次完成的触发时间、结果和耗时保存在 state_file 中
+- 补跑：停机期间错过的触发在启动后补跑一次（多次错过只补最近一次），
+  超过 catch_up_hours 小时的不再补跑；运行中被中断的任务同样会补跑
+- 失败重试：执行失败的触发不算完成，retry_minutes 分钟（默认30）后重试，直到超过 catch_up_hours；
+  重试期间依赖它的任务继续等待（最多 max_wait_hours）
+- 多节点：启用 lease 后每个任务执行前获取数据库租约（job:任务名，见 job_lease.py），
+  可以在多台机器上部署调度器做冗余，同一轮触发只有一个节点执行，其他节点看到已完成后跳过
+
+配置示例（job_scheduler_config.json）：
+    {
+        "state_file": "job_scheduler_state.json",
+        "poll_seconds": 30,
+        "catch_up_hours": 24,
+        "lease": {"enabled": false, "ttl_seconds": 120},
+        "jobs": {
+            "crawl": {"cron": "0 1 * * *"},
+            "reading_refresh": {"cron": "0 6 * * *", "after": ["crawl"], "max_wait_hours": 6},
+            "theme_refresh": {"cron": "30 6 * * *", "after": ["reading_refresh"], "enabled": false},
+            "token_monitor": {"cron": "0 */3 * * *", "exclusive": false}
+        }
+    }
+
+使用示例：
+    python job_scheduler.py
+    python job_scheduler.py --status
+    python job_scheduler.py --run reading_refresh
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from spider.log.utils import logger
+
+READING_CONFIG_FILE = "reading_updater_config.json"
+
+DEFAULT_CONFIG = {
+    "state_file": "job_scheduler_state.json",
+    "poll_seconds": 30,
+    "catch_up_hours": 24,
+    "lease": {"enabled": False, "ttl_seconds": 120},
+    "jobs": {
+        "crawl": {"cron": "0 1 * * *"},
+        "reading_refresh": {"cron": "0 6 * * *", "after": ["crawl"], "max_wait_hours": 6},
+        "theme_refresh": {"cron": "30 6 * * *", "after": ["reading_refresh"], "enabled": False},
+        "token_monitor": {"cron": "0 */3 * * *", "exclusive": False}
+    }
+}
+
+
+class CronExpression:
+    """5段 cron 表达式（分 时 日 月 周），支持 *、*/n、a-b、a-b/n 和逗号列表，周日为0或7"""
+
+    FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression: str):
+        """
+        解析 cron 表达式
+
+        Args:
+            expression: 如 "0 6 * * *"、"0 */3 * * *"、"30 1 * * 1-5"
+
+        Raises:
+            ValueError: 表达式格式错误
+        """
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 表达式需要5段: {expression}")
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            self._parse_field(field, low, high) for field, (low, high) in zip(fields, self.FIELD_RANGES)
+        ]
+        self.weekdays = {day % 7 for day in weekdays}
+        # 日和周都有限制时满足其一即可（与标准 cron 一致）
+        self.day_restricted = fields[2] != '*'
+        self.weekday_restricted = fields[4] != '*'
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        """解析一段"""
+        values = set()
+        for part in field.split(','):
+            value_range, _, step = part.partition('/')
+            if value_range == '*':
+                start, end = low, high
+            elif '-' in value_range:
+                start, end = (int(value) for value in value_range.split('-', 1))
+            else:
+                start = end = int(value_range)
+                if step:
+                    end = high
+            if start < low or end > high or start > end:
+                raise ValueError(f"cron 字段超出范围: {field}")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return values
+
+    def _day_matches(self, day: datetime) -> bool:
+        """日期是否满足 日、月、周 三段"""
+        if day.month not in self.months:
+            return False
+        day_ok = day.day in self.days
+        weekday_ok = (day.weekday() + 1) % 7 in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def latest_before(self, moment: datetime) -> Optional[datetime]:
+        """
+        不晚于 moment 的最近一次触发时间（向前最多查找一年）
+
+        Args:
+            moment: 时间点
+
+        Returns:
+            Optional[datetime]: 触发时间，一年内没有时返回None
+        """
+        moment = moment.replace(second=0, microsecond=0)
+        for offset in range(367):
+            day = moment - timedelta(days=offset)
+            if not self._day_matches(day):
+                continue
+            for hour in sorted(self.hours, reverse=True):
+                if offset == 0 and hour > moment.hour:
+                    continue
+                for minute in sorted(self.minutes, reverse=True):
+                    if offset == 0 and hour == moment.hour and minute > moment.minute:
+                        continue
+                    return day.replace(hour=hour, minute=minute)
+        return None
+
+    def next_after(self, moment: datetime) -> Optional[datetime]:
+        """
+        晚于 moment 的下一次触发时间（向后最多查找一年）
+
+        Args:
+            moment: 时间点
+
+        Returns:
+            Optional[datetime]: 触发时间，一年内没有时返回None
+        """
+        moment = moment.replace(second=0, microsecond=0)
+        for offset in range(367):
+            day = moment + timedelta(days=offset)
+            if not self._day_matches(day):
+                continue
+            for hour in sorted(self.hours):
+                if offset == 0 and hour < moment.hour:
+                    continue
+                for minute in sorted(self.minutes):
+                    if offset == 0 and hour == moment.hour and minute <= moment.minute:
+                        continue
+                    return day.replace(hour=hour, minute=minute)
+        return None
+
+
+def run_crawl() -> bool:
+    """爬取所有公众号的新文章"""
+    from wechat_crawler_auto import WeChatCrawlerAuto
+    return WeChatCrawlerAuto().run()
+
+
+def run_reading_refresh() -> bool:
+    """阅读数据统一刷新（先续跑被中断的运行）"""
+    from refresh_planner import RefreshPlanner
+    planner = RefreshPlanner(READING_CONFIG_FILE)
+    interrupted = planner.find_interrupted_run()
+    if interrupted:
+        logger.info(f"📌 先续跑未完成的刷新运行 {interrupted['id']}")
+        planner.run(resume_run_id=interrupted['id'])
+    return planner.run()
+
+
+def run_theme_refresh() -> bool:
+    """法律主题月阅读量更新（统一刷新已包含主题规则，单独启用时使用；先续跑被中断的运行）"""
+    from theme_reading_updater import ThemeReadingUpdater
+    updater = ThemeReadingUpdater(READING_CONFIG_FILE)
+    interrupted = updater.find_interrupted_run()
+    if interrupted:
+        logger.info(f"📌 先续跑未完成的法律主题更新运行 {interrupted['id']}")
+        updater.run_theme_update(resume_run_id=interrupted['id'])
+    return updater.run_theme_update()
+
+
+def run_token_monitor() -> bool:
+    """检查Token有效期并在需要时发送提醒"""
+    from auto_token_monitor import run_auto_check
+    return run_auto_check()['check_successful']
+
+
+JOB_RUNNERS: Dict[str, Callable[[], bool]] = {
+    'crawl': run_crawl,
+    'reading_refresh': run_reading_refresh,
+    'theme_refresh': run_theme_refresh,
+    'token_monitor': run_token_monitor
+}
+
+
+class Job:
+    """调度任务"""
+
+    def __init__(self, name: str, job_config: Dict, runner: Callable[[], bool]):
+        """
+        初始化任务
+
+        Args:
+            name: 任务名称
+            job_config: 任务配置 {'cron', 'after', 'max_wait_hours', 'retry_minutes', 'exclusive', 'enabled'}
+            runner: 执行函数，返回False表示失败
+        """
+        self.name = name
+        self.cron = CronExpression(job_config['cron'])
+        self.after: List[str] = list(job_config.get('after', []))
+        self.max_wait_hours = job_config.get('max_wait_hours', 6)
+        self.retry_minutes = job_config.get('retry_minutes', 30)
+        self.exclusive = job_config.get('exclusive', True)
+        self.enabled = job_config.get('enabled', True)
+        self.runner = runner
+        self.running = False
+
+
+class JobScheduler:
+    """统一任务调度器"""
+
+    def __init__(self, config_file: str = "job_scheduler_config.json"):
+        """
+        初始化调度器
+
+        Args:
+            config_file: 配置文件路径（不存在时使用默认配置）
+        """
+        self.config = self._load_config(config_file)
+        self.state_file = Path(self.config.get('state_file', 'job_scheduler_state.json'))
+        self.poll_seconds = self.config.get('poll_seconds', 30)
+        self.catch_up_hours = self.config.get('catch_up_hours', 24)
+
+        self.jobs: Dict[str, Job] = {}
+        for name, job_config in self.config.get('jobs', {}).items():
+            if name not in JOB_RUNNERS:
+                logger.warning(f"未知的任务 {name}，已忽略")
+                continue
+            self.jobs[name] = Job(name, job_config, JOB_RUNNERS[name])
+
+        for job in self.jobs.values():
+            for dependency in job.after:
+                if dependency not in self.jobs:
+                    raise ValueError(f"任务 {job.name} 依赖的任务 {dependency} 未配置")
+        self._check_cycles()
+
+        self.lock = threading.Lock()
+        self.exclusive_lock = threading.Lock()
+        self.threads: Dict[str, threading.Thread] = {}
+        self.state = self._load_state()
+        self.running = False
+
+    @staticmethod
+    def _load_config(config_file: str) -> Dict:
+        """加载配置文件"""
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            logger.info(f"成功加载调度配置: {config_file}")
+            return config
+        except FileNotFoundError:
+            logger.warning(f"调度配置 {config_file} 不存在，使用默认配置")
+            return json.loads(json.dumps(DEFAULT_CONFIG))
+
+    def _check_cycles(self):
+        """检查依赖中是否有环"""
+        visiting, visited = set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"任务依赖存在环: {name}")
+            visiting.add(name)
+            for dependency in self.jobs[name].after:
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.jobs:
+            visit(name)
+
+    def _load_state(self) -> Dict[str, Dict]:
+        """加载任务状态，上次运行中被中断的任务标记为 interrupted"""
+        state = {}
+        if self.state_file.exists():
+            try:
+                state = json.loads(self.state_file.read_text(encoding='utf-8'))
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"读取任务状态 {self.state_file} 出错: {e}，重新开始记录")
+
+        for name, job_state in state.items():
+            if job_state.get('status') == 'running':
+                job_state['status'] = 'interrupted'
+                logger.warning(f"任务 {name} 上次运行中被中断（开始于 {job_state.get('started_at')}），将补跑")
+        return state
+
+    def _save_state(self):
+        """写入任务状态（先写临时文件再替换，避免写到一半被中断）"""
+        temp_file = self.state_file.with_suffix(self.state_file.suffix + '.tmp')
+        try:
+            temp_file.write_text(json.dumps(self.state, ensure_ascii=False, indent=2), encoding='utf-8')
+            os.replace(temp_file, self.state_file)
+        except OSError as e:
+            logger.error(f"保存任务状态时出错: {e}")
+
+    @staticmethod
+    def _parse_time(value: Optional[str]) -> Optional[datetime]:
+        return datetime.fromisoformat(value) if value else None
+
+    def _due_slot(self, job: Job, now: datetime, respect_retry_delay: bool = True) -> Optional[datetime]:
+        """
+        任务当前待执行的触发时间
+
+        Args:
+            job: 任务
+            now: 当前时间
+            respect_retry_delay: 上次执行失败、还没到重试时间时是否返回None（判断依赖时为False）
+
+        Returns:
+            Optional[datetime]: 最近一次触发时间尚未完成时返回该时间，否则返回None
+        """
+        slot = job.cron.latest_before(now)
+        if slot is None:
+            return None
+
+        job_state = self.state.setdefault(job.name, {})
+        last_slot = self._parse_time(job_state.get('last_slot'))
+
+        if last_slot is None and 'status' not in job_state:
+            # 第一次运行调度器：从下一次触发开始，不立即执行所有任务
+            job_state['last_slot'] = slot.isoformat()
+            self._save_state()
+            return None
+
+        if last_slot is not None and last_slot >= slot:
+            return None
+
+        if now - slot > timedelta(hours=self.catch_up_hours):
+            logger.warning(f"任务 {job.name} 错过了 {slot} 的触发，已超过 {self.catch_up_hours} 小时，不再补跑")
+            job_state.update({'last_slot': slot.isoformat(), 'status': 'missed'})
+            job_state.pop('retry_at', None)
+            self._save_state()
+            return None
+
+        retry_at = self._parse_time(job_state.get('retry_at'))
+        if respect_retry_delay and retry_at and now < retry_at:
+            return None
+
+        return slot
+
+    def _dependencies_ready(self, job: Job, slot: datetime, now: datetime) -> bool:
+        """依赖的任务都已成功完成本轮（不在运行、没有待执行或等待重试的触发，禁用的依赖忽略）"""
+        waiting = [dependency for dependency in job.after
+                   if self.jobs[dependency].enabled
+                   and (self.jobs[dependency].running
+                        or self._due_slot(self.jobs[dependency], now, respect_retry_delay=False))]
+        if not waiting:
+            return True
+
+        if now - slot > timedelta(hours=job.max_wait_hours):
+            if not job.running:
+                logger.warning(f"任务 {job.name} 等待依赖 {waiting} 已超过 {job.max_wait_hours} 小时，不再等待")
+            return True
+        return False
+
+    def _job_lease(self, job: Job):
+        """
+        创建任务租约（连接阅读数据刷新配置中的数据库）
+
+        Returns:
+            Optional[JobLease]: 未启用 lease 时返回None
+        """
+        lease_config = self.config.get('lease', {})
+        if not lease_config.get('enabled', False):
+            return None
+
+        from database import DatabaseManager
+        from job_lease import DEFAULT_TTL_SECONDS, JobLease
+
+        try:
+            with open(READING_CONFIG_FILE, 'r', encoding='utf-8') as f:
+                db_config = json.load(f).get('database', {})
+        except FileNotFoundError:
+            db_config = {}
+
+        db = DatabaseManager(
+            host=db_config.get('host', '127.0.0.1'),
+            port=db_config.get('port', 3306),
+            user=db_config.get('user', 'root'),
+            password=db_config.get('password', '123456'),
+            database=db_config.get('database', 'faxuan')
+        )
+        return JobLease(db, f"job:{job.name}", lease_config.get('ttl_seconds', DEFAULT_TTL_SECONDS))
+
+    def _execute(self, job: Job, slot: Optional[datetime]) -> bool:
+        """在当前线程中执行任务并记录状态，返回是否执行成功"""
+        job_state = self.state.setdefault(job.name, {})
+
+        # 多节点部署：本轮已由其他节点完成时跳过，其他节点正在执行时等下一次检查
+        lease = self._job_lease(job)
+        if lease:
+            if slot and lease.finished_since(slot):
+                lease.release(finished=False)
+                logger.info(f"任务 {job.name} 本轮（触发时间 {slot}）已由其他节点完成，跳过")
+                with self.lock:
+                    job_state.update({'status': 'skipped', 'last_slot': slot.isoformat()})
+                    job_state.pop('retry_at', None)
+                    self._save_state()
+                    job.running = False
+                return True
+            if not lease.acquire():
+                logger.info(f"任务 {job.name} 正由其他节点执行，稍后再检查")
+                with self.lock:
+                    job.running = False
+                return False
+
+        started_at = datetime.now()
+
+        with self.lock:
+            job_state.update({'status': 'running', 'started_at': started_at.isoformat(timespec='seconds')})
+            self._save_state()
+
+        logger.info(f"▶ 开始执行任务 {job.name}" + (f"（触发时间 {slot}）" if slot else "（手动）"))
+        success = False
+        try:
+            if job.exclusive:
+                with self.exclusive_lock:
+                    success = job.runner() is not False
+            else:
+                success = job.runner() is not False
+            error = None
+        except Exception as e:
+            success = False
+            error = str(e)
+            logger.error(f"任务 {job.name} 执行时发生异常: {e}")
+        finally:
+            if lease:
+                lease.release(finished=success)
+
+        finished_at = datetime.now()
+        duration = (finished_at - started_at).total_seconds()
+
+        with self.lock:
+            job_state.update({
+                'status': 'success' if success else 'failed',
+                'finished_at': finished_at.isoformat(timespec='seconds'),
+                'duration_seconds': round(duration, 1),
+                'error': error
+            })
+            if slot and success:
+                job_state['last_slot'] = slot.isoformat()
+                job_state.pop('retry_at', None)
+            elif slot:
+                # 失败的触发不算完成，稍后重试（超过 catch_up_hours 后由 _due_slot 标记为 missed）
+                job_state['retry_at'] = (finished_at + timedelta(minutes=job.retry_minutes)).isoformat(timespec='seconds')
+            self._save_state()
+            job.running = False
+
+        if success:
+            logger.success(f"✅ 任务 {job.name} 执行成功，耗时 {timedelta(seconds=int(duration))}")
+        else:
+            logger.error(f"❌ 任务 {job.name} 执行失败，耗时 {timedelta(seconds=int(duration))}"
+                         + (f"，{job.retry_minutes} 分钟后重试" if slot else ""))
+        return success
+
+    def tick(self, now: datetime = None):
+        """
+        检查一次所有任务，启动到期且依赖就绪的任务
+
+        exclusive 任务在其他 exclusive 任务运行时不会启动，按配置顺序等待下一次检查
+
+        Args:
+            now: 当前时间，默认 datetime.now()
+        """
+        now = now or datetime.now()
+
+        for job in self.jobs.values():
+            if not job.enabled or job.running:
+                continue
+
+            slot = self._due_slot(job, now)
+            if slot is None or not self._dependencies_ready(job, slot, now):
+                continue
+
+            if job.exclusive and any(other.running and other.exclusive for other in self.jobs.values()):
+                continue
+
+            job.running = True
+            thread = threading.Thread(target=self._execute, args=(job, slot), name=f"job-{job.name}", daemon=True)
+            self.threads[job.name] = thread
+            thread.start()
+
+    def run_job(self, name: str) -> bool:
+        """
+        立即执行一个任务（忽略触发时间和依赖）
+
+        Args:
+            name: 任务名称
+
+        Returns:
+            bool: 执行成功返回True
+        """
+        job = self.jobs.get(name)
+        if not job:
+            logger.error(f"任务 {name} 未配置，可选: {', '.join(self.jobs)}")
+            return False
+
+        job.running = True
+        return self._execute(job, None)
+
+    def show_status(self):
+        """显示各任务的状态和下次触发时间"""
+        now = datetime.now()
+        print("\n" + "=" * 100)
+        print("📋 统一任务调度状态")
+        print("=" * 100)
+        for job in self.jobs.values():
+            job_state = self.state.get(job.name, {})
+            next_time = job.cron.next_after(now)
+            print(f"{job.name:<16} {job.cron.expression:<14} {'启用' if job.enabled else '禁用'}  "
+                  f"依赖 {','.join(job.after) or '-':<16} 状态 {job_state.get('status', '-'):<12} "
+                  f"上次完成 {job_state.get('finished_at', '-'):<20} "
+                  f"下次 {next_time.strftime('%Y-%m-%d %H:%M') if next_time else '-'}")
+        print("=" * 100)
+
+    def _signal_handler(self, signum, frame):
+        """信号处理器"""
+        logger.info(f"接收到信号 {signum}，正在停止调度器...")
+        self.stop()
+        sys.exit(0)
+
+    def start(self):
+        """启动调度器主循环（阻塞）"""
+        signal.signal(signal.SIGINT, self._signal_handler)
+        signal.signal(signal.SIGTERM, self._signal_handler)
+
+        logger.info("=" * 60)
+        logger.info("🚀 统一任务调度器启动")
+        logger.info("=" * 60)
+        now = datetime.now()
+        for job in self.jobs.values():
+            next_time = job.cron.next_after(now)
+            logger.info(f"任务 {job.name}: {job.cron.expression}"
+                        + (f"，依赖 {job.after}" if job.after else "")
+                        + ("" if job.enabled else "（已禁用）")
+                        + (f"，下次 {next_time.strftime('%Y-%m-%d %H:%M')}" if job.enabled and next_time else ""))
+
+        self.running = True
+        while self.running:
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"调度检查时发生异常: {e}")
+            time.sleep(self.poll_seconds)
+
+    def stop(self):
+        """停止调度器，运行中的任务记为 interrupted（下次启动时补跑）"""
+        self.running = False
+        with self.lock:
+            for job in self.jobs.values():
+                if job.running:
+                    self.state.setdefault(job.name, {})['status'] = 'interrupted'
+                    logger.warning(f"任务 {job.name} 尚未完成，下次启动时补跑")
+            self._save_state()
+        logger.info("✅ 调度器已停止")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(
+        description="统一任务调度器（爬虫、阅读数据刷新、法律主题更新、Token监控）",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("使用示例：")[1]
+    )
+    parser.add_argument("--config", default="job_scheduler_config.json", help="调度配置文件路径")
+    parser.add_argument("--status", action="store_true", help="显示任务状态")
+    parser.add_argument("--run", metavar="JOB", help="立即执行一个任务")
+    args = parser.parse_args()
+
+    scheduler = JobScheduler(args.config)
+
+    if args.status:
+        scheduler.show_status()
+        return 0
+    if args.run:
+        return 0 if scheduler.run_job(args.run) else 1
+
+    scheduler.start()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
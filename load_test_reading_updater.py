@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+阅读量更新器压测工具
+=================
+
+在独立的测试库中生成模拟普法文章，把 DSFApiClient 指向本地模拟API（fake_dsf_server.py），
+完整跑一遍刷新流水线（选择查询 → 并发请求 → 重试队列/不可用缓存 → 批量写入），输出：
+
+- 端到端吞吐量（篇/秒）和API返回码分布
+- 获取成功、加入重试队列、永久不可用、写入数量
+- 批量写入的次数、总耗时和写入吞吐量
+- 写回数据与模拟API确定结果的一致性校验
+
+测试库每次运行前都会按项目中的 fx_*.sql 重建，不能与配置中的正式库同名。
+
+使用示例：
+    python load_test_reading_updater.py
+    python load_test_reading_updater.py --articles 2000 --latency 50-200 --concurrency 10
+    python load_test_reading_updater.py --errors 101:0.02,107:0.03,50000:0.01 --seed 42
+    python load_test_reading_updater.py --keys 3 --concurrency 15
+    python load_test_reading_updater.py --base-url http://127.0.0.1:8765
+"""
+
+import sys
+import json
+import time
+import tempfile
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+import pymysql
+from fake_dsf_server import FakeDSFServer, article_stats, parse_error_rates, parse_latency
+from spider.log.utils import logger
+
+ARTICLE_ID_PREFIX = 'lt'
+
+
+def split_sql(text: str):
+    """把 Navicat 导出的SQL文件拆成单条语句（去掉注释）"""
+    lines = [line for line in text.splitlines() if not line.strip().startswith('--')]
+    text = '\n'.join(lines)
+    while '/*' in text:
+        start = text.index('/*')
+        end = text.index('*/', start) + 2
+        text = text[:start] + text[end:]
+    return [statement.strip() for statement in text.split(';\n') if statement.strip().rstrip(';').strip()]
+
+
+def prepare_schema(db_config: dict, database: str, article_count: int):
+    """
+    重建测试库并生成模拟文章
+
+    文章发布时间均匀分布在近6天内、阅读数据为空，全部命中"近N天阅读量为空"规则
+
+    Args:
+        db_config: 配置中的 database 部分
+        database: 测试库名
+        article_count: 文章数量
+    """
+    connection = pymysql.connect(
+        host=db_config.get('host', '127.0.0.1'),
+        port=db_config.get('port', 3306),
+        user=db_config.get('user', 'root'),
+        password=db_config.get('password', '123456'),
+        charset='utf8mb4',
+        autocommit=True
+    )
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database}` DEFAULT CHARACTER SET utf8mb4")
+            cursor.execute(f"USE `{database}`")
+
+            for sql_file in sorted(project_root.glob('fx_*.sql')):
+                for statement in split_sql(sql_file.read_text(encoding='utf-8')):
+                    cursor.execute(statement)
+            logger.info(f"测试库 {database} 已重建")
+
+            now = datetime.now().replace(microsecond=0)
+            month = now.strftime('%Y-%m')
+            records = []
+            education = []
+            for i in range(article_count):
+                article_id = f"{ARTICLE_ID_PREFIX}{i:08d}"
+                publish_time = now - timedelta(seconds=int((i + 1) * 6 * 86400 / (article_count + 1)))
+                records.append((now, '微信公众号', f"压测文章{i}", publish_time,
+                                f"https://mp.weixin.qq.com/s/{article_id}", article_id, f"压测单位{i % 20}", '1'))
+                education.append((i + 1, article_id, f"压测单位{i % 20}", '市级单位', '司法行政系统', '测试区',
+                                  '1-50人', month, '1'))
+
+            for start in range(0, article_count, 1000):
+                cursor.executemany(
+                    "INSERT INTO fx_article_records (crawl_time, crawl_channel, article_title, publish_time, "
+                    "article_url, article_id, unit_name, analysis) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+                    records[start:start + 1000]
+                )
+                cursor.executemany(
+                    "INSERT INTO fx_education_articles (id, article_id, unit_name, unit_property, industry_system, "
+                    "unit_district, people_scale, month, type_class) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                    education[start:start + 1000]
+                )
+            logger.info(f"已生成 {article_count} 篇模拟普法文章")
+    finally:
+        connection.close()
+
+
+def verify_written(db) -> dict:
+    """
+    校验写回的阅读数据与模拟API的确定结果是否一致
+
+    Returns:
+        dict: {'filled': 已有数据的文章数, 'mismatched': 数据不一致的文章数}
+    """
+    filled = 0
+    mismatched = 0
+    with db.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT article_url, view_count, likes, thumbs_count FROM fx_article_records "
+            "WHERE article_id LIKE %s AND view_count IS NOT NULL",
+            (f"{ARTICLE_ID_PREFIX}%",)
+        )
+        for row in cursor.fetchall():
+            filled += 1
+            expected = article_stats(row['article_url'])
+            if (row['view_count'], row['likes'], str(row['thumbs_count'])) != \
+                    (expected['read'], expected['looking'], str(expected['zan'])):
+                mismatched += 1
+    return {'filled': filled, 'mismatched': mismatched}
+
+
+def run_load_test(args) -> int:
+    """
+    执行压测
+
+    Returns:
+        int: 退出码
+    """
+    from article_reading_updater import ArticleReadingUpdater
+    from refresh_pipeline import RefreshPipeline
+    from unavailable_cache import UnavailableCache
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    db_config = dict(config.get('database', {}))
+    database = args.database or f"{db_config.get('database', 'faxuan')}_loadtest"
+    if database == db_config.get('database', 'faxuan'):
+        logger.error(f"测试库不能与正式库同名: {database}")
+        return 1
+
+    prepare_schema(db_config, database, args.articles)
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = FakeDSFServer(
+            qps=args.qps,
+            latency_ms=parse_latency(args.latency),
+            error_rates=parse_error_rates(args.errors),
+            seed=args.seed
+        ).start()
+        base_url = server.base_url
+
+    # 测试配置：测试库、模拟API、不限预算
+    db_config['database'] = database
+    api_config = dict(config.get('api', {}))
+    api_config.update({'base_url': base_url, 'qps': args.qps, 'keys': []})
+    if args.keys > 1:
+        api_config['keys'] = [{'key': f"loadtest-key-{i}"} for i in range(args.keys)]
+    config.update({'database': db_config, 'api': api_config, 'concurrency': args.concurrency, 'budget': {}})
+
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.json', delete=False) as f:
+        json.dump(config, f, ensure_ascii=False)
+        test_config_file = f.name
+
+    try:
+        updater = ArticleReadingUpdater(test_config_file)
+        if not updater.db.connect():
+            logger.error("测试库连接失败")
+            return 1
+
+        # 统计批量写入的次数和耗时
+        writer = updater._create_writer()
+        flush = writer.flush
+        write_stats = {'flushes': 0, 'seconds': 0.0}
+
+        def timed_flush():
+            start = time.perf_counter()
+            try:
+                return flush()
+            finally:
+                write_stats['flushes'] += 1
+                write_stats['seconds'] += time.perf_counter() - start
+
+        writer.flush = timed_flush
+
+        rules = updater.schedule.build_rules()
+        pipeline = RefreshPipeline(updater.api_client, writer, updater.concurrency,
+                                   updater._create_retry_queue(), UnavailableCache(updater.db))
+
+        start = time.perf_counter()
+        result = pipeline.run(updater.iter_work_set(rules))
+        elapsed = time.perf_counter() - start
+
+        check = verify_written(updater.db)
+        updater.db.disconnect()
+    finally:
+        Path(test_config_file).unlink(missing_ok=True)
+        if server:
+            server.stop()
+
+    written = result['written']
+    print("\n" + "=" * 80)
+    print("📊 阅读量更新器压测结果")
+    print("=" * 80)
+    print(f"测试库: {database}    模拟文章: {args.articles} 篇    密钥: {max(1, args.keys)} 个 × {args.qps} QPS    "
+          f"并发: {args.concurrency}")
+    print(f"总耗时: {elapsed:.2f} 秒    端到端吞吐量: {result['total'] / elapsed if elapsed else 0:.2f} 篇/秒")
+    print(f"API调用: {updater.api_client.total_calls} 次"
+          + (f"    返回码分布: {dict(sorted(server.counts.items()))}" if server else ""))
+    print(f"处理 {result['total']} 篇: 成功 {result['success']}，加入重试队列 {result['queued']}，"
+          f"永久不可用 {result['unavailable']}，到期重试 {result['retried']} (成功 {result['retry_success']})"
+          + (f"，致命错误中止: {result['aborted']}" if result['aborted'] else ""))
+    print(f"写入: {written} 篇，无变化 {result['unchanged']} 篇，失败 {result['failed']} 篇；"
+          f"批量写入 {write_stats['flushes']} 次，耗时 {write_stats['seconds']:.2f} 秒，"
+          f"{written / write_stats['seconds'] if write_stats['seconds'] else 0:.0f} 篇/秒")
+    print(f"数据校验: 已有数据 {check['filled']} 篇，与模拟结果不一致 {check['mismatched']} 篇")
+    print("=" * 80)
+
+    return 0 if check['mismatched'] == 0 and not result['aborted'] else 1
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(
+        description="阅读量更新器压测工具（本地模拟API + 测试库）",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("使用示例：")[1]
+    )
+    parser.add_argument("--config", default="reading_updater_config.json", help="配置文件路径（读取数据库连接）")
+    parser.add_argument("--database", help="测试库名，默认为正式库名加 _loadtest")
+    parser.add_argument("--articles", type=int, default=1000, help="模拟文章数量")
+    parser.add_argument("--concurrency", type=int, default=5, help="并发请求线程数")
+    parser.add_argument("--qps", type=float, default=5, help="每个密钥每秒请求数上限")
+    parser.add_argument("--keys", type=int, default=1, help="模拟密钥数量（大于1时使用客户端池）")
+    parser.add_argument("--latency", default="50-200", metavar="MIN-MAX", help="模拟API延迟范围（毫秒）")
+    parser.add_argument("--errors", default="", metavar="CODE:RATE,...", help="模拟API错误码及返回概率")
+    parser.add_argument("--seed", type=int, help="随机数种子")
+    parser.add_argument("--base-url", help="使用已启动的模拟API，不在进程内启动")
+    args = parser.parse_args()
+
+    return run_load_test(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
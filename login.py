@@ -11,6 +11,7 @@
     1. 自动登录 - 启动浏览器并打开登录页面
     2. Token获取 - 提取访问token
     3. Cookie管理 - 获取和格式化cookie
+    4. 登录状态检查 - 根据最近一次成功请求的时间判断，必要时才发送验证请求
 
 版本: 2.0
 """
@@ -31,6 +32,10 @@ from spider.log.utils import logger
 CACHE_FILE = 'wechat_cache.json'
 # Token/Cookie 最大有效时长（小时）
 MAX_TOKEN_AGE_HOURS = 90
+# 最近一次成功请求后的这段时间内认为登录有效，不再发送验证请求（分钟）
+KNOWN_GOOD_WINDOW_MINUTES = 60
+# 更新最近成功时间的最小间隔（秒），避免每次请求都写缓存文件
+KNOWN_GOOD_WRITE_INTERVAL = 60
 
 
 class WeChatSpiderLogin:
@@ -48,6 +53,10 @@ class WeChatSpiderLogin:
         self.cache_file = cache_file
         # 缓存写入时间（时间戳，秒）
         self.cache_timestamp = None
+        # 最近一次使用该登录信息请求成功的时间（时间戳，秒）
+        self.last_good = None
+        # 登录信息是否已被接口拒绝（登录失效）
+        self.rejected = False
 
     def login(self):
         """
@@ -211,14 +220,19 @@ class WeChatSpiderLogin:
     def save_cache(self):
         """保存token和cookies到缓存文件"""
         if self.token and self.cookies:
+            now = datetime.now().timestamp()
+            # 刚登录成功的信息视为有效
             cache_data = {
                 'token': self.token,
                 'cookies': self.cookies,
-                'timestamp': datetime.now().timestamp()
+                'timestamp': now,
+                'last_good': now
             }
             try:
-                with open(self.cache_file, 'w', encoding='utf-8') as f:
-                    json.dump(cache_data, f, ensure_ascii=False, indent=2)
+                self._write_cache(cache_data)
+                self.cache_timestamp = now
+                self.last_good = now
+                self.rejected = False
                 logger.success(f"登录信息已保存到缓存文件 {self.cache_file}")
                 return True
             except Exception as e:
@@ -249,6 +263,8 @@ class WeChatSpiderLogin:
             
             self.token = cache_data['token']
             self.cookies = cache_data['cookies']
+            self.last_good = cache_data.get('last_good')
+            self.rejected = cache_data.get('rejected', False)
             logger.info(f"从缓存加载登录信息（{time_diff:.1f}小时前保存）")
             return True
             
@@ -256,8 +272,63 @@ class WeChatSpiderLogin:
             logger.error(f"读取缓存失败: {e}，需要重新登录")
             return False
 
+    def _update_cache(self, **fields):
+        """更新缓存文件中的部分字段（缓存文件不存在时忽略）"""
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache_data = json.load(f)
+            # 缓存已被其他进程的新登录覆盖时不再修改
+            if cache_data.get('token') != self.token:
+                return
+            cache_data.update(fields)
+            self._write_cache(cache_data)
+        except Exception as e:
+            logger.warning(f"更新缓存文件失败: {e}")
+
+    def _write_cache(self, cache_data):
+        """写入缓存文件（先写临时文件再替换，写到一半被中断不会损坏登录缓存）"""
+        temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(cache_data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, self.cache_file)
+
+    def mark_good(self):
+        """
+        记录一次使用当前登录信息的成功请求（如文章列表、公众号搜索）
+        
+        最近成功时间写入缓存文件，各入口启动时据此判断登录是否有效，
+        写入间隔不小于 KNOWN_GOOD_WRITE_INTERVAL 秒
+        """
+        now = datetime.now().timestamp()
+        if not self.rejected and self.last_good and now - self.last_good < KNOWN_GOOD_WRITE_INTERVAL:
+            return
+        self.last_good = now
+        self.rejected = False
+        self._update_cache(last_good=now, rejected=False)
+
+    def mark_rejected(self):
+        """
+        记录当前登录信息已被接口拒绝（ret=200003/200013）
+        
+        之后的登录检查直接返回未登录，不再发送验证请求，直到重新登录
+        """
+        self.last_good = None
+        self.rejected = True
+        self._update_cache(last_good=None, rejected=True)
+
+    def _recently_good(self):
+        """最近 KNOWN_GOOD_WINDOW_MINUTES 分钟内是否有成功的请求（且登录未超过最大有效时长）"""
+        if not self.last_good:
+            return False
+        now = datetime.now().timestamp()
+        if self.cache_timestamp and (now - self.cache_timestamp) / 3600 >= MAX_TOKEN_AGE_HOURS:
+            return False
+        return now - self.last_good < KNOWN_GOOD_WINDOW_MINUTES * 60
+
     def validate_cache(self):
-        """验证缓存的登录信息是否有效"""
+        """验证缓存的登录信息是否有效（发送一次搜索请求）"""
         if not self.token or not self.cookies:
             if not self.load_cache():
                 return False
@@ -317,8 +388,21 @@ class WeChatSpiderLogin:
             if not self.load_cache():
                 return False
         
+        if self.rejected:
+            logger.warning("缓存的登录信息已被接口拒绝，需要重新登录")
+            return False
+        
+        # 最近有成功的请求时直接认为有效，失效时由第一次请求的错误码发现
+        if self._recently_good():
+            minutes = (datetime.now().timestamp() - self.last_good) / 60
+            logger.info(f"登录信息 {minutes:.0f} 分钟前请求成功，跳过验证")
+            return True
+        
         # 验证缓存的有效性
-        return self.validate_cache()
+        if self.validate_cache():
+            self.mark_good()
+            return True
+        return False
 
     def check_login_status(self):
         """
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+重新登录协调器
+============
+
+扫码登录可能要等待很久（数小时），不能在爬取线程中直接调用 AutoLogin.ensure_login()：
+
+- 同一时间只进行一次登录（single-flight）：第一个发现登录失效的线程在后台线程中发起登录，
+  之后发现失效的线程等待同一次登录的结果，不会各自打开浏览器
+- 登录完成后所有等待的线程拿到新的 token/cookie/headers 继续爬取
+- 不需要登录的工作（文章正文获取、解析、写入数据库）不受影响；
+  登录即将到期时可以只发起登录而不等待（wait=False），旧的登录信息仍然可用时继续爬取
+- 其他线程已经换了新的登录信息时（stale_token 与当前 token 不同），直接返回新的登录信息
+- login_time 是登录信息的实际登录时间（沿用缓存时为缓存的写入时间），调用方按它判断是否即将到期；
+  即将到期时用 force=True 扫码登录，否则会拿回同一份缓存
+"""
+
+import threading
+from datetime import datetime
+from typing import Optional, Tuple
+from spider.log.utils import logger
+
+Credentials = Tuple[Optional[str], Optional[str], Optional[dict]]
+
+NO_CREDENTIALS: Credentials = (None, None, None)
+
+
+class LoginCoordinator:
+    """重新登录协调器"""
+
+    def __init__(self, auto_login):
+        """
+        初始化协调器
+
+        Args:
+            auto_login: AutoLogin 实例
+        """
+        self.auto_login = auto_login
+        self.credentials: Credentials = NO_CREDENTIALS  # (token, cookie_string, headers)
+        self.login_time: Optional[datetime] = None
+        self.generation = 0  # 每次登录成功加1，调用方据此判断登录信息是否已更换
+        self.lock = threading.Lock()
+        self._inflight: Optional[threading.Event] = None  # 正在进行的登录
+        self.last_failed = False  # 最近一次登录是否失败
+
+    @property
+    def logging_in(self) -> bool:
+        """是否有正在进行的登录"""
+        return self._inflight is not None
+
+    def _login(self, done: threading.Event, force: bool = False):
+        """在后台线程中登录，完成后唤醒等待的线程"""
+        try:
+            credentials = self.auto_login.ensure_login(force=force)
+        except Exception as e:
+            logger.error(f"登录过程中出错: {e}")
+            credentials = NO_CREDENTIALS
+
+        with self.lock:
+            if credentials[0]:
+                self.credentials = credentials
+                cache_timestamp = self.auto_login.login_manager.cache_timestamp
+                self.login_time = datetime.fromtimestamp(cache_timestamp) if cache_timestamp else datetime.now()
+                self.generation += 1
+                self.last_failed = False
+            else:
+                self.last_failed = True
+            self._inflight = None
+        done.set()
+
+    def refresh(self, stale_token: Optional[str] = None, wait: bool = True, rejected: bool = False,
+                force: bool = False) -> Credentials:
+        """
+        重新登录（同一时间只进行一次）
+
+        Args:
+            stale_token: 调用方当前使用的（已失效或即将到期的）token，
+                当前登录信息已经不是它时直接返回当前登录信息；为空时总是等待一次登录
+            wait: 是否等待登录完成；为False时只发起登录，返回当前的登录信息
+            rejected: stale_token 是否已被接口拒绝（登录失效），是则标记缓存失效，登录时不再信任缓存
+            force: 不使用缓存的登录信息，直接扫码登录（登录即将到期时）
+
+        Returns:
+            Credentials: (token, cookie_string, headers)，登录失败时为 (None, None, None)
+        """
+        with self.lock:
+            token = self.credentials[0]
+            if stale_token is not None and token and token != stale_token:
+                return self.credentials
+
+            if rejected and token == stale_token and not self.auto_login.login_manager.rejected:
+                self.auto_login.login_manager.mark_rejected()
+
+            done = self._inflight
+            if done is None:
+                done = self._inflight = threading.Event()
+                threading.Thread(target=self._login, args=(done, force), name="wechat-login", daemon=True).start()
+                logger.info("🔑 已发起重新登录")
+            else:
+                logger.info("🔑 其他线程正在重新登录，等待登录完成...")
+
+            if not wait:
+                return self.credentials
+
+        done.wait()
+        with self.lock:
+            credentials, failed = self.credentials, self.last_failed
+        if failed and credentials[0] in (None, stale_token):
+            return NO_CREDENTIALS
+        if rejected and credentials[0] == stale_token:
+            # 等待的是失效前发起的登录，沿用了被拒绝的登录信息，再登录一次
+            return self.refresh(stale_token, wait, rejected, force)
+        return credentials
+
+    def ensure(self) -> Credentials:
+        """
+        首次登录（已有登录信息时直接返回）
+
+        Returns:
+            Credentials: (token, cookie_string, headers)，登录失败时为 (None, None, None)
+        """
+        with self.lock:
+            if self.credentials[0]:
+                return self.credentials
+        return self.refresh()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+运行指标
+=======
+
+爬虫和阅读数据刷新在运行中累计计数器、直方图和仪表，以 Prometheus 文本格式导出，
+不用解析日志就可以画吞吐量曲线、对变慢和错误率告警：
+
+- textfile：每隔 interval_seconds 秒（以及运行结束时）写入 <textfile_dir>/<job>.prom，
+  由 node_exporter 的 textfile collector 采集；先写临时文件再替换，不会采集到写了一半的文件
+- HTTP：在本机 http_host:http_port 提供 /metrics，由 Prometheus 直接抓取
+
+每个样本都带 job 标签（crawl、refresh、article、theme、worker），多个进程写到同一目录互不冲突。
+进程内的指标从启动开始累计（计数器在进程重启后归零，Prometheus 的 rate/increase 会处理）。
+
+配置项 metrics（阅读数据刷新在 reading_updater_config.json，爬虫在 wechat_crawler_config.json；
+textfile_dir 和 http_port 都为空时不导出，指标仍在进程内累计）：
+    {"textfile_dir": "metrics", "http_port": null, "http_host": "127.0.0.1", "interval_seconds": 15}
+
+指标：
+    wechat_requests_total{endpoint, ret}          公众号平台请求数（searchbiz、appmsg、article，按返回码）
+    run_stage_seconds{kind, stage}                各阶段单次耗时（全文获取、正文提取、数据库语句、API调用等，
+                                                  阶段名称见 run_history.STAGE_LABELS）
+    run_stage_bytes_total{kind, stage}            各阶段下载的字节数
+    run_events_total{kind, name}                  运行计数（处理、保存、跳过的文章数等）
+    run_errors_total{kind, code}                  运行中的错误码
+    dsf_requests_total{code}                      第三方API调用数（按返回码，0 为成功）
+    dsf_cost_money_total                          第三方API累计消费（元）
+    dsf_remain_money{key}                         第三方API账户余额（元，按密钥）
+"""
+
+import os
+import time
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+from spider.log.utils import logger
+
+# 耗时直方图的默认分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 已定义的指标（按定义顺序导出）
+REGISTRY: List['Metric'] = []
+
+# 进程内正在运行的导出（调度器在同一进程中运行多个任务时只启动一个）
+_active_exporter: Optional['MetricsExporter'] = None
+_active_lock = threading.Lock()
+
+
+def _escape(value: str) -> str:
+    """转义标签值"""
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """指标基类（线程安全）"""
+
+    type_name = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        定义指标
+
+        Args:
+            name: 指标名称
+            documentation: 说明（导出为 HELP）
+            labelnames: 标签名称
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values: Dict[Tuple[str, ...], object] = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """
+        当前的样本
+
+        Returns:
+            List[Tuple[str, Dict[str, str], float]]: (指标名称, 标签, 值)
+        """
+        with self.lock:
+            return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in self.values.items()]
+
+
+class Counter(Metric):
+    """计数器（只增不减）"""
+
+    type_name = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels):
+        """增加计数"""
+        if amount < 0:
+            return
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """仪表（当前值）"""
+
+    type_name = 'gauge'
+
+    def set(self, value: float, **labels):
+        """设置当前值"""
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = float(value)
+
+
+class Histogram(Metric):
+    """直方图（分桶计数、总和、次数）"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value: float, **labels):
+        """记录一次观测值"""
+        key = self._key(labels)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['buckets'][i] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """计时一段代码（with 语句）"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        samples = []
+        with self.lock:
+            for key, state in self.values.items():
+                labels = dict(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, count in zip(self.buckets, state['buckets']):
+                    cumulative += count
+                    samples.append((f"{self.name}_bucket", dict(labels, le=_format_value(bound)), cumulative))
+                samples.append((f"{self.name}_sum", labels, state['sum']))
+                samples.append((f"{self.name}_count", labels, state['count']))
+        return samples
+
+
+WECHAT_REQUESTS = Counter('wechat_requests_total', '公众号平台请求数', ['endpoint', 'ret'])
+STAGE_SECONDS = Histogram('run_stage_seconds', '各阶段单次耗时（秒）', ['kind', 'stage'])
+STAGE_BYTES = Counter('run_stage_bytes_total', '各阶段下载的字节数', ['kind', 'stage'])
+RUN_EVENTS = Counter('run_events_total', '运行计数', ['kind', 'name'])
+RUN_ERRORS = Counter('run_errors_total', '运行中的错误码', ['kind', 'code'])
+DSF_REQUESTS = Counter('dsf_requests_total', '第三方API调用数', ['code'])
+DSF_COST_MONEY = Counter('dsf_cost_money_total', '第三方API累计消费（元）')
+DSF_REMAIN_MONEY = Gauge('dsf_remain_money', '第三方API账户余额（元）', ['key'])
+
+
+def render(job: str) -> str:
+    """
+    以 Prometheus 文本格式导出所有指标
+
+    Args:
+        job: 进程类型，作为每个样本的 job 标签
+
+    Returns:
+        str: 文本格式的指标
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type_name}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{_format_labels(dict(job=job, **labels))} {_format_value(value)}")
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsExporter:
+    """指标导出（textfile 和/或 本机HTTP）"""
+
+    def __init__(self, job: str, textfile_dir: str = None, http_port: int = None,
+                 http_host: str = '127.0.0.1', interval_seconds: float = 15):
+        """
+        初始化导出
+
+        Args:
+            job: 进程类型（crawl、refresh、article、theme、worker）
+            textfile_dir: textfile collector 目录，为空时不写文件
+            http_port: HTTP端口，为空时不提供HTTP
+            http_host: HTTP监听地址，默认只监听本机
+            interval_seconds: 写 textfile 的间隔（秒）
+        """
+        self.job = job
+        self.textfile = Path(textfile_dir) / f"{job}.prom" if textfile_dir else None
+        self.http_port = http_port
+        self.http_host = http_host
+        self.interval_seconds = max(1.0, float(interval_seconds))
+        self.server = None  # HTTP服务（ThreadingHTTPServer）
+        self._stop = threading.Event()
+        self._writer_thread = None
+
+    @classmethod
+    def from_config(cls, config: Dict, job: str) -> Optional['MetricsExporter']:
+        """
+        按配置创建导出（配置项 metrics）
+
+        Returns:
+            Optional[MetricsExporter]: 未配置 textfile_dir 和 http_port 时返回None
+        """
+        metrics_config = config.get('metrics', {})
+        if not metrics_config.get('textfile_dir') and not metrics_config.get('http_port'):
+            return None
+        return cls(job, metrics_config.get('textfile_dir'), metrics_config.get('http_port'),
+                   metrics_config.get('http_host', '127.0.0.1'), metrics_config.get('interval_seconds', 15))
+
+    def write_textfile(self):
+        """写入 textfile（先写临时文件再替换）"""
+        if not self.textfile:
+            return
+        try:
+            self.textfile.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.textfile.with_suffix(self.textfile.suffix + f'.{os.getpid()}.tmp')
+            temp_file.write_text(render(self.job), encoding='utf-8')
+            os.replace(temp_file, self.textfile)
+        except OSError as e:
+            logger.warning(f"写入指标文件 {self.textfile} 时出错: {e}")
+
+    def _write_loop(self):
+        while not self._stop.wait(self.interval_seconds):
+            self.write_textfile()
+
+    def _start_http(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        job = self.job
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = render(job).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self.server = ThreadingHTTPServer((self.http_host, int(self.http_port)), Handler)
+        except OSError as e:
+            logger.warning(f"指标HTTP端口 {self.http_host}:{self.http_port} 启动失败: {e}")
+            return
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info(f"📈 指标地址: http://{self.http_host}:{self.http_port}/metrics")
+
+    def start(self) -> 'MetricsExporter':
+        """开始导出"""
+        if self.http_port:
+            self._start_http()
+        if self.textfile:
+            self._stop.clear()
+            self._writer_thread = threading.Thread(target=self._write_loop, name="metrics-textfile", daemon=True)
+            self._writer_thread.start()
+            logger.info(f"📈 指标文件: {self.textfile}（每 {self.interval_seconds:.0f} 秒更新）")
+        return self
+
+    def stop(self):
+        """停止导出（最后写一次 textfile）"""
+        global _active_exporter
+        with _active_lock:
+            if _active_exporter is self:
+                _active_exporter = None
+        self._stop.set()
+        if self._writer_thread:
+            self._writer_thread.join(timeout=5)
+            self._writer_thread = None
+        self.write_textfile()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+def start_exporter(config: Dict, job: str) -> Optional[MetricsExporter]:
+    """
+    按配置开始导出指标（运行结束时调用返回值的 stop()）
+
+    Args:
+        config: 含 metrics 配置项的配置
+        job: 进程类型
+
+    Returns:
+        Optional[MetricsExporter]: 未配置导出或本进程已有正在运行的导出时返回None
+    """
+    global _active_exporter
+    exporter = MetricsExporter.from_config(config, job)
+    if not exporter:
+        return None
+    with _active_lock:
+        if _active_exporter is not None:
+            return None
+        _active_exporter = exporter
+    return exporter.start()
@@ -9,15 +9,18 @@ import hashlib
 import argparse
 import logging
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('token_monitor.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+
+def setup_logging():
+    """配置日志（直接运行本脚本时调用；被其他模块导入时不修改调用方的日志配置）"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('token_monitor.log', encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+
 
 def get_current_token_hash():
     """获取当前token的哈希值，用于检测token是否发生变化
@@ -469,6 +472,57 @@ def send_token_expiry_notification(hours_remaining, expiry_time, reminder_type):
     return success
 
 
+def send_api_fatal_notification(code, message, api_key=None):
+    """发送第三方阅读数据API致命错误（余额不足、key错误）的邮件告警
+
+    Args:
+        code: API错误码
+        message: 错误说明
+        api_key: 出错的密钥（已隐藏中间部分）
+
+    Returns:
+        bool: 邮件是否发送成功
+    """
+    email_config_file = 'email_config.json'
+    if not os.path.exists(email_config_file):
+        logging.warning("邮件配置文件不存在，无法发送API致命错误告警")
+        return False
+
+    with open(email_config_file, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    to_email = config.get('to_email')
+    if not to_email:
+        logging.warning("邮件配置中缺少收件人地址")
+        return False
+
+    action_text = "请为API账户充值" if str(code) == '20001' else "请检查配置中的API密钥"
+    subject = f"【紧急】阅读数据API已停止：{message}"
+    body = f"""
+    <html>
+    <body style="font-family: Arial, sans-serif;">
+        <h2>阅读数据API致命错误</h2>
+        <div style="background-color: #f8d7da; border: 2px solid #dc3545; border-radius: 5px; padding: 15px; margin: 20px 0;">
+            <p><strong>错误：</strong>{message}（错误码 {code}）</p>
+            <p><strong>密钥：</strong>{api_key or '-'}</p>
+            <p><strong>时间：</strong>{datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')}</p>
+        </div>
+        <p style="color: #dc3545; font-weight: bold;">{action_text}</p>
+        <p>本次阅读量刷新已停止使用该密钥，处理后下一次刷新会自动恢复，不需要重启进程。</p>
+        <hr>
+        <p style="color: #666; font-size: 0.9em;">此邮件由微信公众号爬虫系统自动发送，请勿回复。</p>
+    </body>
+    </html>
+    """
+
+    success = send_email_notification(subject, body, to_email)
+    if success:
+        logging.info(f"API致命错误告警邮件已发送至 {to_email}")
+    else:
+        logging.error("发送API致命错误告警邮件失败")
+    return success
+
+
 def main():
     """主函数：检查token过期并发送提醒
     支持命令行参数：
@@ -565,4 +619,5 @@ def main():
 
 # 支持直接运行此脚本进行测试
 if __name__ == "__main__":
+    setup_logging()
     main()
\ No newline at end of file
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文章记录表分区维护工具
+===================
+
+将 fx_article_records 改造为按 publish_time 的月度 RANGE COLUMNS 分区，
+并提供预建未来分区、归档/删除历史分区以及分区裁剪基准测试。
+
+分区方案：
+    - 分区键 publish_time（所有大查询都按发布时间过滤）
+    - 每月一个分区 pYYYYMM，最早月份之前的数据放在 p_history，最后保留 pmax 兜底
+    - MySQL 要求分区键包含在每个唯一索引中，因此主键改为 (id, publish_time)，
+      publish_time 改为 NOT NULL（原为空的用 crawl_time 补齐）
+
+默认只打印将要执行的SQL，加 --execute 才会真正执行。
+
+使用示例：
+    python partition_maintenance.py --status
+    python partition_maintenance.py --migrate --start-month 2025-01
+    python partition_maintenance.py --migrate --start-month 2025-01 --execute
+    python partition_maintenance.py --ensure-future 3 --execute
+    python partition_maintenance.py --archive-before 2025-06 --execute
+    python partition_maintenance.py --drop-before 2025-06 --execute
+    python partition_maintenance.py --benchmark
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+import pymysql
+from database import DatabaseManager
+from spider.log.utils import logger
+
+TABLE_NAME = 'fx_article_records'
+HISTORY_PARTITION = 'p_history'
+MAX_PARTITION = 'pmax'
+
+
+def _month_start(value: date) -> date:
+    """返回所在月份的第一天"""
+    return date(value.year, value.month, 1)
+
+
+def _next_month(value: date) -> date:
+    """返回下个月的第一天"""
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+def _parse_month(text: str) -> date:
+    """解析 YYYY-MM 格式的月份"""
+    return datetime.strptime(text, '%Y-%m').date()
+
+
+def _partition_name(month: date) -> str:
+    """月份分区名称，如 p202510"""
+    return f"p{month.strftime('%Y%m')}"
+
+
+def _partition_clause(month: date) -> str:
+    """单个月度分区定义"""
+    return f"PARTITION {_partition_name(month)} VALUES LESS THAN ('{_next_month(month).isoformat()} 00:00:00')"
+
+
+class PartitionManager:
+    """文章记录表分区管理器"""
+
+    def __init__(self, db: DatabaseManager, execute: bool = False):
+        """
+        初始化分区管理器
+
+        Args:
+            db: DatabaseManager 实例
+            execute: 是否真正执行SQL（否则只打印）
+        """
+        self.db = db
+        self.execute = execute
+
+    def _run(self, statements: List[str]) -> bool:
+        """打印或执行SQL语句"""
+        for sql in statements:
+            print(sql.strip() + ";\n")
+
+        if not self.execute:
+            logger.info("试运行模式：以上SQL未执行，加 --execute 参数执行")
+            return True
+
+        if not self.db.ensure_connection():
+            logger.error("数据库连接失败")
+            return False
+
+        try:
+            with self.db.connection.cursor() as cursor:
+                for sql in statements:
+                    start = time.time()
+                    cursor.execute(sql)
+                    logger.info(f"执行完成 ({time.time() - start:.1f}s): {sql.strip().splitlines()[0][:80]}")
+            return True
+        except Exception as e:
+            logger.error(f"执行分区维护SQL时出错: {e}")
+            return False
+
+    def get_partitions(self) -> List[Dict]:
+        """
+        获取当前分区列表
+
+        Returns:
+            List[Dict]: 分区信息（名称、上界、行数估计），未分区时返回空列表
+        """
+        if not self.db.ensure_connection():
+            return []
+
+        with self.db.connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT
+                    PARTITION_NAME AS name,
+                    PARTITION_DESCRIPTION AS upper_bound,
+                    TABLE_ROWS AS table_rows,
+                    PARTITION_ORDINAL_POSITION AS position
+                FROM information_schema.PARTITIONS
+                WHERE TABLE_SCHEMA = DATABASE()
+                  AND TABLE_NAME = %s
+                  AND PARTITION_NAME IS NOT NULL
+                ORDER BY PARTITION_ORDINAL_POSITION
+                """,
+                (TABLE_NAME,)
+            )
+            return list(cursor.fetchall())
+
+    def _get_month_partitions(self) -> List[date]:
+        """获取已存在的月度分区对应的月份"""
+        months = []
+        for partition in self.get_partitions():
+            name = partition['name']
+            if name.startswith('p') and name[1:].isdigit():
+                months.append(datetime.strptime(name[1:], '%Y%m').date())
+        return sorted(months)
+
+    def build_migration(self, start_month: date, months_ahead: int = 3) -> List[str]:
+        """
+        生成未分区表改造为月度分区表的SQL
+
+        Args:
+            start_month: 第一个月度分区的月份（更早的数据进入 p_history）
+            months_ahead: 从当前月份起预建的未来月份数
+
+        Returns:
+            List[str]: SQL语句列表
+        """
+        start_month = _month_start(start_month)
+        last_month = _month_start(date.today())
+        for _ in range(months_ahead):
+            last_month = _next_month(last_month)
+
+        partitions = [f"PARTITION {HISTORY_PARTITION} VALUES LESS THAN ('{start_month.isoformat()} 00:00:00')"]
+        month = start_month
+        while month <= last_month:
+            partitions.append(_partition_clause(month))
+            month = _next_month(month)
+        partitions.append(f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE)")
+
+        partition_sql = ",\n    ".join(partitions)
+
+        return [
+            f"UPDATE {TABLE_NAME} SET publish_time = crawl_time WHERE publish_time IS NULL",
+            f"""
+ALTER TABLE {TABLE_NAME}
+    MODIFY `publish_time` datetime NOT NULL COMMENT '文章发布时间',
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (`id`, `publish_time`)
+""",
+            f"""
+ALTER TABLE {TABLE_NAME}
+PARTITION BY RANGE COLUMNS(`publish_time`) (
+    {partition_sql}
+)
+"""
+        ]
+
+    def build_ensure_future(self, months_ahead: int = 3) -> List[str]:
+        """
+        生成预建未来月度分区的SQL（从 pmax 中拆分）
+
+        Args:
+            months_ahead: 从当前月份起需要存在的未来月份数
+
+        Returns:
+            List[str]: SQL语句列表，分区已足够时为空
+        """
+        existing = self._get_month_partitions()
+        if not existing:
+            logger.warning(f"{TABLE_NAME} 尚未分区，请先执行 --migrate")
+            return []
+
+        target = _month_start(date.today())
+        for _ in range(months_ahead):
+            target = _next_month(target)
+
+        new_months = []
+        month = _next_month(existing[-1])
+        while month <= target:
+            new_months.append(month)
+            month = _next_month(month)
+
+        if not new_months:
+            logger.info(f"未来 {months_ahead} 个月的分区已存在，无需新建")
+            return []
+
+        partitions = [_partition_clause(m) for m in new_months]
+        partitions.append(f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE)")
+        partition_sql = ",\n    ".join(partitions)
+
+        return [f"""
+ALTER TABLE {TABLE_NAME} REORGANIZE PARTITION {MAX_PARTITION} INTO (
+    {partition_sql}
+)
+"""]
+
+    def build_archive(self, before_month: date, drop_only: bool = False) -> List[str]:
+        """
+        生成归档或删除历史分区的SQL
+
+        归档方式：为每个分区创建同结构的普通表 fx_article_records_YYYYMM，
+        通过 EXCHANGE PARTITION 瞬间换出数据，再删除已清空的分区。
+
+        Args:
+            before_month: 早于该月份的月度分区会被处理（p_history 也包含在内）
+            drop_only: 只删除分区，不保留归档表
+
+        Returns:
+            List[str]: SQL语句列表
+        """
+        before_month = _month_start(before_month)
+        names = [HISTORY_PARTITION] if any(
+            p['name'] == HISTORY_PARTITION for p in self.get_partitions()
+        ) else []
+        names += [_partition_name(m) for m in self._get_month_partitions() if m < before_month]
+
+        if not names:
+            logger.info(f"没有早于 {before_month.strftime('%Y-%m')} 的分区")
+            return []
+
+        statements = []
+        for name in names:
+            if not drop_only:
+                archive_table = f"{TABLE_NAME}_{name[1:] if name != HISTORY_PARTITION else 'history'}"
+                statements += [
+                    f"CREATE TABLE {archive_table} LIKE {TABLE_NAME}",
+                    f"ALTER TABLE {archive_table} REMOVE PARTITIONING",
+                    f"ALTER TABLE {TABLE_NAME} EXCHANGE PARTITION {name} WITH TABLE {archive_table}",
+                ]
+            statements.append(f"ALTER TABLE {TABLE_NAME} DROP PARTITION {name}")
+
+        return statements
+
+    def migrate(self, start_month: date, months_ahead: int = 3) -> bool:
+        """改造为月度分区表"""
+        if self.get_partitions():
+            logger.warning(f"{TABLE_NAME} 已经是分区表，跳过改造")
+            return True
+        return self._run(self.build_migration(start_month, months_ahead))
+
+    def ensure_future(self, months_ahead: int = 3) -> bool:
+        """预建未来月度分区"""
+        return self._run(self.build_ensure_future(months_ahead))
+
+    def archive(self, before_month: date, drop_only: bool = False) -> bool:
+        """归档或删除历史分区"""
+        return self._run(self.build_archive(before_month, drop_only))
+
+    def show_status(self):
+        """显示分区状态"""
+        partitions = self.get_partitions()
+        print("\n" + "=" * 70)
+        if not partitions:
+            print(f"📋 {TABLE_NAME} 尚未分区")
+        else:
+            print(f"📋 {TABLE_NAME} 分区列表 (共 {len(partitions)} 个)")
+            print("-" * 70)
+            for p in partitions:
+                print(f"{p['name']:<12} < {str(p['upper_bound']):<30} 约 {p['table_rows']} 行")
+        print("=" * 70)
+
+
+class _CaptureCursor(pymysql.cursors.DictCursor):
+    """记录执行过的SELECT语句的游标（用于分区裁剪基准测试）"""
+
+    captured: List[str] = []
+
+    def execute(self, query, args=None):
+        if query.lstrip().upper().startswith('SELECT'):
+            _CaptureCursor.captured.append(self.mogrify(query, args))
+        return super().execute(query, args)
+
+
+def run_benchmark(config_file: str) -> int:
+    """
+    分区裁剪基准测试
+
+    以捕获游标执行更新器中的真实查询，对每条查询输出 EXPLAIN 的 partitions 列、
+    预估扫描行数和实际耗时，用于对比分区前后的效果。
+
+    Args:
+        config_file: 阅读量更新器配置文件
+
+    Returns:
+        int: 退出码
+    """
+    from article_reading_updater import ArticleReadingUpdater
+    from theme_reading_updater import ThemeReadingUpdater
+
+    updater = ArticleReadingUpdater(config_file)
+    theme_updater = ThemeReadingUpdater(config_file)
+
+    if not updater.db.connect():
+        logger.error("数据库连接失败")
+        return 1
+
+    # 两个更新器共用同一个捕获连接
+    updater.db.connection.cursorclass = _CaptureCursor
+    theme_updater.db = updater.db
+    _CaptureCursor.captured = []
+
+    cases = []
+
+    def capture(name, func):
+        start = len(_CaptureCursor.captured)
+        try:
+            func()
+        except Exception as e:
+            logger.warning(f"执行 {name} 时出错: {e}")
+        cases.extend((name, sql) for sql in _CaptureCursor.captured[start:])
+
+    now = datetime.now()
+    capture("近7天阅读量为空", lambda: list(updater.get_articles_need_update(only_empty=True)))
+    capture("刷新时间表", lambda: list(updater.iter_work_set(updater.schedule.build_rules(now))))
+    capture("近7天覆盖率统计", lambda: updater._count_reading_coverage(now - timedelta(days=7), now))
+    capture("近7天标题去重", lambda: updater.db.check_article_exists_by_title('__benchmark__', '__benchmark__'))
+
+    # 主题查询使用最近一个活动主题的时间范围
+    with updater.db.connection.cursor(pymysql.cursors.DictCursor) as cursor:
+        cursor.execute("SELECT start_date, end_date FROM fx_theme WHERE status = 1 ORDER BY end_date DESC LIMIT 1")
+        theme = cursor.fetchone()
+    if theme:
+        capture("主题期间文章", lambda: list(theme_updater.get_articles_in_theme_period(
+            theme['start_date'], theme['end_date'])))
+
+    print("\n" + "=" * 100)
+    print("📊 分区裁剪基准测试")
+    print("=" * 100)
+
+    with updater.db.connection.cursor(pymysql.cursors.DictCursor) as cursor:
+        for name, sql in cases:
+            cursor.execute(f"EXPLAIN {sql}")
+            plan = cursor.fetchall()
+
+            start = time.time()
+            cursor.execute(sql)
+            row_count = len(cursor.fetchall())
+            elapsed_ms = (time.time() - start) * 1000
+
+            print(f"\n▶ {name}  返回 {row_count} 行  耗时 {elapsed_ms:.1f} ms")
+            for row in plan:
+                print(f"    表 {str(row.get('table')):<6} 分区 {str(row.get('partitions')):<40} "
+                      f"访问 {str(row.get('type')):<8} 索引 {str(row.get('key')):<20} 预估行数 {row.get('rows')}")
+
+    print("\n" + "=" * 100)
+    updater.db.disconnect()
+    return 0
+
+
+def load_database(config_file: str) -> DatabaseManager:
+    """根据阅读量更新器配置创建数据库管理器"""
+    with open(config_file, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    db_config = config.get('database', {})
+    return DatabaseManager(
+        host=db_config.get('host', '127.0.0.1'),
+        port=db_config.get('port', 3306),
+        user=db_config.get('user', 'root'),
+        password=db_config.get('password', '123456'),
+        database=db_config.get('database', 'faxuan')
+    )
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(
+        description="文章记录表月度分区维护工具",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("使用示例：")[1]
+    )
+
+    mode_group = parser.add_mutually_exclusive_group(required=True)
+    mode_group.add_argument("--status", action="store_true", help="显示当前分区")
+    mode_group.add_argument("--migrate", action="store_true", help="改造为月度分区表")
+    mode_group.add_argument("--ensure-future", type=int, metavar="N", help="预建未来N个月的分区")
+    mode_group.add_argument("--archive-before", metavar="YYYY-MM", help="归档早于该月份的分区")
+    mode_group.add_argument("--drop-before", metavar="YYYY-MM", help="删除早于该月份的分区（不归档）")
+    mode_group.add_argument("--benchmark", action="store_true", help="分区裁剪基准测试")
+
+    parser.add_argument("--config", default="reading_updater_config.json", help="配置文件路径")
+    parser.add_argument("--start-month", metavar="YYYY-MM", help="第一个月度分区的月份（--migrate 使用）")
+    parser.add_argument("--months-ahead", type=int, default=3, help="预建的未来月份数（--migrate 使用）")
+    parser.add_argument("--execute", action="store_true", help="真正执行SQL（默认只打印）")
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        return run_benchmark(args.config)
+
+    db = load_database(args.config)
+    if not db.connect():
+        logger.error("数据库连接失败")
+        return 1
+
+    manager = PartitionManager(db, execute=args.execute)
+
+    try:
+        if args.status:
+            manager.show_status()
+            success = True
+        elif args.migrate:
+            if not args.start_month:
+                logger.error("--migrate 需要指定 --start-month")
+                return 1
+            success = manager.migrate(_parse_month(args.start_month), args.months_ahead)
+        elif args.ensure_future is not None:
+            success = manager.ensure_future(args.ensure_future)
+        elif args.archive_before:
+            success = manager.archive(_parse_month(args.archive_before))
+        else:
+            success = manager.archive(_parse_month(args.drop_before), drop_only=True)
+
+        return 0 if success else 1
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
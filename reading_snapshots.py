@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文章阅读数据快照
+=============
+
+fx_article_reading_snapshot 是只追加的时间序列表：每次调用API获取到阅读数据都会记录一行
+(article_id, fetched_at, 阅读, 在看, 点赞)，用于查看文章的增长曲线，
+也为刷新频率的调整提供真实数据。
+
+主键为 (article_id, fetched_at)，同一文章的快照在磁盘上连续存放，
+按文章查询最新值和区间增长都是主键范围扫描。
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from spider.log.utils import logger
+
+
+class ReadingSnapshotStore:
+    """文章阅读数据快照存储"""
+
+    def __init__(self, db):
+        """
+        初始化快照存储
+
+        Args:
+            db: DatabaseManager 实例（由调用方负责连接）
+        """
+        self.db = db
+        self.pending: List[tuple] = []
+
+    def add(self, article_id: str, stats: Dict, fetched_at: datetime = None):
+        """
+        添加一条快照到待写入队列
+
+        Args:
+            article_id: 文章ID
+            stats: API返回的数据 {'read': int, 'zan': int, 'looking': int}
+            fetched_at: 获取时间，默认当前时间
+        """
+        self.pending.append((
+            article_id,
+            (fetched_at or datetime.now()).replace(microsecond=0),
+            int(stats['read']),
+            int(stats['looking']),
+            int(stats['zan'])
+        ))
+
+    def flush(self) -> int:
+        """
+        批量写入待写入的快照（一条多行 INSERT）
+
+        同一文章同一秒内的重复快照会被忽略
+
+        Returns:
+            int: 写入的行数
+        """
+        if not self.pending:
+            return 0
+
+        rows, self.pending = self.pending, []
+
+        if not self.db.ensure_connection():
+            logger.error(f"数据库连接失败，{len(rows)} 条阅读数据快照未写入")
+            return 0
+
+        try:
+            with self.db.connection.cursor() as cursor:
+                # pymysql 会把 executemany 的 INSERT ... VALUES 合并为一条多行语句
+                affected = cursor.executemany(
+                    """
+                    INSERT IGNORE INTO fx_article_reading_snapshot
+                        (article_id, fetched_at, read_count, looking_count, zan_count)
+                    VALUES (%s, %s, %s, %s, %s)
+                    """,
+                    rows
+                )
+            self.db.connection.commit()
+            logger.debug(f"写入阅读数据快照 {affected} 条")
+            return affected or 0
+
+        except Exception as e:
+            logger.warning(f"写入阅读数据快照时出错: {e}")
+            try:
+                self.db.connection.rollback()
+            except Exception:
+                pass
+            return 0
+
+    def get_latest(self, article_ids: Iterable[str]) -> Dict[str, Dict]:
+        """
+        获取文章的最新快照
+
+        Args:
+            article_ids: 文章ID列表
+
+        Returns:
+            Dict[str, Dict]: 文章ID -> 最新快照
+        """
+        article_ids = list(dict.fromkeys(article_ids))
+        if not article_ids or not self.db.ensure_connection():
+            return {}
+
+        placeholders = ", ".join(["%s"] * len(article_ids))
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT s.article_id, s.fetched_at, s.read_count, s.looking_count, s.zan_count
+                    FROM fx_article_reading_snapshot s
+                    INNER JOIN (
+                        SELECT article_id, MAX(fetched_at) AS fetched_at
+                        FROM fx_article_reading_snapshot
+                        WHERE article_id IN ({placeholders})
+                        GROUP BY article_id
+                    ) latest ON s.article_id = latest.article_id AND s.fetched_at = latest.fetched_at
+                    """,
+                    article_ids
+                )
+                return {row['article_id']: row for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"查询最新阅读数据快照时出错: {e}")
+            return {}
+
+    def get_history(self, article_id: str, start_time: datetime = None, end_time: datetime = None) -> List[Dict]:
+        """
+        获取文章在时间范围内的全部快照（按时间升序）
+
+        Args:
+            article_id: 文章ID
+            start_time: 开始时间（包含），为空表示不限
+            end_time: 结束时间（包含），为空表示不限
+
+        Returns:
+            List[Dict]: 快照列表
+        """
+        if not self.db.ensure_connection():
+            return []
+
+        conditions = ["article_id = %s"]
+        params = [article_id]
+        if start_time:
+            conditions.append("fetched_at >= %s")
+            params.append(start_time)
+        if end_time:
+            conditions.append("fetched_at <= %s")
+            params.append(end_time)
+
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT fetched_at, read_count, looking_count, zan_count
+                    FROM fx_article_reading_snapshot
+                    WHERE {' AND '.join(conditions)}
+                    ORDER BY fetched_at
+                    """,
+                    params
+                )
+                return list(cursor.fetchall())
+        except Exception as e:
+            logger.error(f"查询阅读数据快照历史时出错: {e}")
+            return []
+
+    def _get_value_at(self, cursor, article_id: str, at_time: datetime) -> Optional[Dict]:
+        """获取某个时间点（含）之前的最后一条快照"""
+        cursor.execute(
+            """
+            SELECT fetched_at, read_count, looking_count, zan_count
+            FROM fx_article_reading_snapshot
+            WHERE article_id = %s AND fetched_at <= %s
+            ORDER BY fetched_at DESC
+            LIMIT 1
+            """,
+            (article_id, at_time)
+        )
+        return cursor.fetchone()
+
+    def get_growth(self, article_id: str, start_time: datetime, end_time: datetime) -> Optional[Dict]:
+        """
+        计算文章在两个时间点之间的增长
+
+        起点取 start_time 之前的最后一条快照（没有则取区间内的第一条），
+        终点取 end_time 之前的最后一条快照
+
+        Args:
+            article_id: 文章ID
+            start_time: 开始时间
+            end_time: 结束时间
+
+        Returns:
+            Optional[Dict]: 增长数据，包括各项增量和日均阅读增长；快照不足时返回None
+        """
+        if not self.db.ensure_connection():
+            return None
+
+        try:
+            with self.db.connection.cursor() as cursor:
+                start = self._get_value_at(cursor, article_id, start_time)
+                if start is None:
+                    cursor.execute(
+                        """
+                        SELECT fetched_at, read_count, looking_count, zan_count
+                        FROM fx_article_reading_snapshot
+                        WHERE article_id = %s AND fetched_at >= %s AND fetched_at <= %s
+                        ORDER BY fetched_at
+                        LIMIT 1
+                        """,
+                        (article_id, start_time, end_time)
+                    )
+                    start = cursor.fetchone()
+                end = self._get_value_at(cursor, article_id, end_time)
+        except Exception as e:
+            logger.error(f"计算阅读数据增长时出错: {e}")
+            return None
+
+        if not start or not end or end['fetched_at'] <= start['fetched_at']:
+            return None
+
+        days = (end['fetched_at'] - start['fetched_at']).total_seconds() / 86400
+        read_growth = end['read_count'] - start['read_count']
+
+        return {
+            'article_id': article_id,
+            'from_time': start['fetched_at'],
+            'to_time': end['fetched_at'],
+            'read_growth': read_growth,
+            'looking_growth': end['looking_count'] - start['looking_count'],
+            'zan_growth': end['zan_count'] - start['zan_count'],
+            'read_growth_per_day': round(read_growth / days, 2) if days > 0 else None
+        }
+
+    def get_unit_growth(self, since: datetime) -> Dict[str, float]:
+        """
+        统计各单位文章的日均阅读增长（与 get_growth 同口径，按文章计算后取单位平均）
+
+        只统计 since 之后发布、且 since 之后至少有两个时间点快照的文章，
+        阅读量只增不减，区间增长取快照的最大值减最小值
+
+        Args:
+            since: 开始时间（文章发布时间和快照时间的下限）
+
+        Returns:
+            Dict[str, float]: {单位名称: 日均阅读增长}，查询失败或没有快照时返回空字典
+        """
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT unit_name, AVG(read_growth_per_day) AS read_growth_per_day
+                    FROM (
+                        SELECT r.unit_name, s.article_id,
+                               (MAX(s.read_count) - MIN(s.read_count)) * 86400
+                                   / TIMESTAMPDIFF(SECOND, MIN(s.fetched_at), MAX(s.fetched_at)) AS read_growth_per_day
+                        FROM fx_article_records r
+                        INNER JOIN fx_article_reading_snapshot s ON s.article_id = r.article_id
+                        WHERE r.publish_time >= %s AND s.fetched_at >= %s
+                        GROUP BY r.unit_name, s.article_id
+                        HAVING MAX(s.fetched_at) > MIN(s.fetched_at)
+                    ) growth
+                    GROUP BY unit_name
+                    """,
+                    (since, since)
+                )
+                rows = cursor.fetchall()
+        except Exception as e:
+            logger.warning(f"统计单位阅读增长时出错: {e}")
+            return {}
+
+        return {row['unit_name']: float(row['read_growth_per_day'] or 0) for row in rows}
+
+
+def main():
+    """主函数"""
+    from database import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="文章阅读数据快照查询")
+    parser.add_argument("article_id", help="文章ID")
+    parser.add_argument("--config", default="reading_updater_config.json", help="配置文件路径")
+    parser.add_argument("--days", type=int, default=7, help="查看最近N天的增长")
+
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        db_config = json.load(f).get('database', {})
+
+    db = DatabaseManager(
+        host=db_config.get('host', '127.0.0.1'),
+        port=db_config.get('port', 3306),
+        user=db_config.get('user', 'root'),
+        password=db_config.get('password', '123456'),
+        database=db_config.get('database', 'faxuan')
+    )
+    if not db.connect():
+        logger.error("数据库连接失败")
+        return 1
+
+    try:
+        store = ReadingSnapshotStore(db)
+        end_time = datetime.now()
+        start_time = end_time - timedelta(days=args.days)
+
+        history = store.get_history(args.article_id, start_time, end_time)
+        print(f"\n📈 文章 {args.article_id} 近{args.days}天快照 (共 {len(history)} 条)")
+        for row in history:
+            print(f"  {row['fetched_at']}  阅读 {row['read_count']:>8}  在看 {row['looking_count']:>6}  点赞 {row['zan_count']:>6}")
+
+        growth = store.get_growth(args.article_id, start_time, end_time)
+        if growth:
+            print(f"\n增长: 阅读 +{growth['read_growth']}  在看 +{growth['looking_growth']}  "
+                  f"点赞 +{growth['zan_growth']}  日均阅读 +{growth['read_growth_per_day']}")
+        return 0
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+阅读数据批量写入器
+===============
+
+收集API返回的阅读量数据，按批次用一条 UPDATE ... JOIN 语句写回 fx_article_records。
+数值没有变化的文章直接跳过，不更新 update_time，也不产生写入。
+每次获取到的数据（包括无变化的）都会追加到 fx_article_reading_snapshot 快照表。
+"""
+
+from datetime import datetime
+from typing import Dict, List
+from reading_snapshots import ReadingSnapshotStore
+from reading_summary import ReadingSummary
+from spider.log.utils import logger
+
+
+class ReadingStatsWriter:
+    """阅读数据批量写入器"""
+
+    def __init__(self, db, chunk_size: int = 50, summary_max_age_minutes: int = 60):
+        """
+        初始化写入器
+
+        Args:
+            db: DatabaseManager 实例（由调用方负责连接）
+            chunk_size: 每批写入的文章数
+            summary_max_age_minutes: 阅读数据日汇总有效期（分钟）
+        """
+        self.db = db
+        self.chunk_size = max(1, chunk_size)
+        self.summary_max_age_minutes = summary_max_age_minutes
+        self.pending: List[Dict] = []
+        self.snapshots = ReadingSnapshotStore(db)
+        self.updated_days = set()  # 阅读数据有变化的发布日期，用于更新日汇总
+        self.history = None        # 运行耗时记录（由流水线设置），写入耗时计入 db_write 阶段
+        self.counts = {
+            'written': 0,      # 已写入（数值有变化）
+            'unchanged': 0,    # 数值无变化，跳过
+            'failed': 0        # 写入失败
+        }
+
+    @staticmethod
+    def is_unchanged(article: Dict, stats: Dict) -> bool:
+        """
+        判断API返回的数值与数据库中的是否一致
+
+        映射关系：read -> view_count，looking -> likes，zan -> thumbs_count
+
+        Args:
+            article: 文章信息字典（包含当前的 view_count/likes/thumbs_count）
+            stats: API返回的数据 {'read': int, 'zan': int, 'looking': int}
+
+        Returns:
+            bool: 三项数值都没有变化返回True
+        """
+        if article.get('view_count') is None or article.get('likes') is None or article.get('thumbs_count') is None:
+            return False
+        return (
+            int(article['view_count']) == int(stats['read'])
+            and int(article['likes']) == int(stats['looking'])
+            and str(article['thumbs_count']) == str(stats['zan'])
+        )
+
+    def add(self, article: Dict, stats: Dict) -> bool:
+        """
+        添加一篇文章的阅读数据，达到批次大小时自动写入
+
+        Args:
+            article: 文章信息字典
+            stats: API返回的数据 {'read': int, 'zan': int, 'looking': int}
+
+        Returns:
+            bool: 数值有变化并已加入待写入队列返回True，无变化返回False
+        """
+        self.snapshots.add(article['article_id'], stats)
+
+        if self.is_unchanged(article, stats):
+            self.counts['unchanged'] += 1
+            logger.debug(f"阅读数据无变化，跳过写入: {article.get('article_title', '无标题')[:50]}")
+            if len(self.snapshots.pending) >= self.chunk_size:
+                self.snapshots.flush()
+            return False
+
+        self.pending.append({
+            'article_id': article['article_id'],
+            'publish_time': article.get('publish_time'),
+            'view_count': stats['read'],
+            'likes': stats['looking'],
+            'thumbs_count': str(stats['zan'])
+        })
+
+        if len(self.pending) >= self.chunk_size:
+            self.flush()
+        return True
+
+    def flush(self) -> int:
+        """
+        写入待写入队列中的所有数据（快照一并写入），设置了 history 时记录写入耗时
+
+        Returns:
+            int: 实际更新的行数
+        """
+        if self.history is None:
+            return self._flush()
+        with self.history.stage('db_write'):
+            return self._flush()
+
+    def _flush(self) -> int:
+        """
+        写入待写入队列中的所有数据（快照一并写入）
+
+        使用 UNION ALL 拼出的派生表与 fx_article_records 关联，一条语句更新整批数据，
+        WHERE 条件再次过滤数值未变化的行（<=> 为NULL安全比较）
+
+        Returns:
+            int: 实际更新的行数
+        """
+        self.snapshots.flush()
+
+        if not self.pending:
+            return 0
+
+        chunk, self.pending = self.pending, []
+
+        if not self.db.ensure_connection():
+            logger.error(f"数据库连接失败，{len(chunk)} 篇文章的阅读数据未写入")
+            self.counts['failed'] += len(chunk)
+            return 0
+
+        rows_sql = " UNION ALL ".join(
+            ["SELECT %s AS article_id, %s AS view_count, %s AS likes, %s AS thumbs_count"] * len(chunk)
+        )
+        sql = f"""
+        UPDATE fx_article_records ar
+        INNER JOIN ({rows_sql}) v ON ar.article_id = v.article_id
+        SET ar.view_count = v.view_count,
+            ar.likes = v.likes,
+            ar.thumbs_count = v.thumbs_count,
+            ar.update_time = %s
+        WHERE NOT (ar.view_count <=> v.view_count
+                   AND ar.likes <=> v.likes
+                   AND ar.thumbs_count <=> v.thumbs_count)
+        """
+
+        params = []
+        for row in chunk:
+            params.extend([row['article_id'], row['view_count'], row['likes'], row['thumbs_count']])
+        params.append(datetime.now())
+
+        try:
+            with self.db.connection.cursor() as cursor:
+                affected = cursor.execute(sql, params)
+            self.db.connection.commit()
+
+            self.counts['written'] += len(chunk)
+            self.updated_days.update(row['publish_time'] for row in chunk if row['publish_time'])
+            logger.info(f"批量写入阅读数据: {len(chunk)} 篇，实际更新 {affected} 行")
+            return affected
+
+        except Exception as e:
+            logger.error(f"批量写入阅读数据时出错: {e}")
+            self.counts['failed'] += len(chunk)
+            try:
+                self.db.connection.rollback()
+            except Exception:
+                pass
+            return 0
+
+    def finish(self) -> Dict[str, int]:
+        """
+        写入剩余数据并更新涉及日期的阅读数据日汇总
+
+        Returns:
+            Dict[str, int]: 写入计数 {'written', 'unchanged', 'failed'}
+        """
+        self.flush()
+
+        if self.updated_days:
+            ReadingSummary(self.db, self.summary_max_age_minutes).refresh_days(self.updated_days)
+            self.updated_days = set()
+
+        return dict(self.counts)
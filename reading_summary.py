@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+普法文章阅读数据日汇总
+===================
+
+维护 fx_reading_daily_summary 表：按发布日期记录普法文章总数和阅读数据完整的文章数。
+统计任意时间窗口时只需对汇总表做按天求和，不再扫描文章表。
+
+汇总的维护方式：
+    1. 更新器写入阅读数据后，重新汇总涉及的发布日期
+    2. 爬虫插入新文章后，将该发布日期标记为需要重新汇总
+    3. 普法分类由外部任务写入 fx_education_articles，因此汇总超过有效期后也会重新汇总
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from spider.log.utils import logger
+
+# 标记为需要重新汇总时使用的刷新时间
+STALE_REFRESH_TIME = datetime(1970, 1, 1)
+
+
+class ReadingSummary:
+    """普法文章阅读数据日汇总"""
+
+    def __init__(self, db, max_age_minutes: int = 60):
+        """
+        初始化日汇总
+
+        Args:
+            db: DatabaseManager 实例（由调用方负责连接）
+            max_age_minutes: 汇总有效期（分钟），超过后读取前会重新汇总
+        """
+        self.db = db
+        self.max_age_minutes = max_age_minutes
+
+    @staticmethod
+    def _to_date(value) -> date:
+        """将 datetime/date 统一为 date"""
+        if isinstance(value, datetime):
+            return value.date()
+        return value
+
+    def refresh_days(self, days: Iterable) -> bool:
+        """
+        重新汇总指定发布日期
+
+        汇总范围为给定日期中最早一天到最晚一天之间的每一天（没有文章的日期写入0）
+
+        Args:
+            days: 发布日期列表（date 或 datetime）
+
+        Returns:
+            bool: 汇总成功返回True
+        """
+        day_set = {self._to_date(d) for d in days if d}
+        if not day_set:
+            return True
+
+        if not self.db.ensure_connection():
+            logger.error("数据库连接失败，无法更新阅读数据日汇总")
+            return False
+
+        first_day, last_day = min(day_set), max(day_set)
+        all_days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+        refresh_time = datetime.now()
+
+        try:
+            self.db.connection.begin()
+            with self.db.connection.cursor() as cursor:
+                # 先把范围内的日期全部置0，保证当天文章被删除或取消普法分类后汇总也能归零
+                cursor.executemany(
+                    """
+                    INSERT INTO fx_reading_daily_summary
+                        (stat_date, total_articles, updated_articles, refresh_time)
+                    VALUES (%s, 0, 0, %s)
+                    ON DUPLICATE KEY UPDATE
+                        total_articles = 0,
+                        updated_articles = 0,
+                        refresh_time = VALUES(refresh_time)
+                    """,
+                    [(d, refresh_time) for d in all_days]
+                )
+
+                cursor.execute(
+                    """
+                    INSERT INTO fx_reading_daily_summary
+                        (stat_date, total_articles, updated_articles, refresh_time)
+                    SELECT
+                        DATE(ar.publish_time) AS stat_date,
+                        COUNT(*) AS total_articles,
+                        SUM(ar.view_count IS NOT NULL
+                            AND ar.likes IS NOT NULL
+                            AND ar.thumbs_count IS NOT NULL) AS updated_articles,
+                        %s
+                    FROM fx_article_records ar
+                    INNER JOIN fx_education_articles ea ON ar.article_id = ea.article_id
+                    WHERE ea.type_class = '1'
+                      AND ar.publish_time >= %s
+                      AND ar.publish_time < %s
+                    GROUP BY DATE(ar.publish_time)
+                    ON DUPLICATE KEY UPDATE
+                        total_articles = VALUES(total_articles),
+                        updated_articles = VALUES(updated_articles),
+                        refresh_time = VALUES(refresh_time)
+                    """,
+                    (
+                        refresh_time,
+                        datetime.combine(first_day, datetime.min.time()),
+                        datetime.combine(last_day + timedelta(days=1), datetime.min.time())
+                    )
+                )
+            self.db.connection.commit()
+
+            logger.debug(f"阅读数据日汇总已更新: {first_day} 到 {last_day} (共 {len(all_days)} 天)")
+            return True
+
+        except Exception as e:
+            logger.error(f"更新阅读数据日汇总时出错: {e}")
+            try:
+                self.db.connection.rollback()
+            except Exception:
+                pass
+            return False
+
+    def mark_stale(self, day) -> bool:
+        """
+        将某个发布日期标记为需要重新汇总（插入新文章时调用，只更新一行主键记录）
+
+        Args:
+            day: 发布日期（date 或 datetime）
+
+        Returns:
+            bool: 标记成功返回True
+        """
+        if not day:
+            return False
+
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO fx_reading_daily_summary
+                        (stat_date, total_articles, updated_articles, refresh_time)
+                    VALUES (%s, 0, 0, %s)
+                    ON DUPLICATE KEY UPDATE refresh_time = VALUES(refresh_time)
+                    """,
+                    (self._to_date(day), STALE_REFRESH_TIME)
+                )
+            return True
+        except Exception as e:
+            logger.debug(f"标记阅读数据日汇总失效时出错: {e}")
+            return False
+
+    def _get_stale_days(self, start_day: date, end_day: date) -> List[date]:
+        """获取时间窗口内缺失或已过期的汇总日期"""
+        expire_time = datetime.now() - timedelta(minutes=self.max_age_minutes)
+
+        with self.db.connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT stat_date, refresh_time
+                FROM fx_reading_daily_summary
+                WHERE stat_date >= %s AND stat_date <= %s
+                """,
+                (start_day, end_day)
+            )
+            fresh_days = {
+                row['stat_date'] for row in cursor.fetchall()
+                if row['refresh_time'] >= expire_time
+            }
+
+        stale_days = []
+        current = start_day
+        while current <= end_day:
+            if current not in fresh_days:
+                stale_days.append(current)
+            current += timedelta(days=1)
+        return stale_days
+
+    def get_window_stats(self, start_day, end_day) -> Optional[Dict[str, int]]:
+        """
+        获取时间窗口内（按发布日期，首尾包含）的普法文章汇总数
+
+        读取前会先重新汇总窗口内缺失或过期的日期
+
+        Args:
+            start_day: 开始日期
+            end_day: 结束日期
+
+        Returns:
+            Optional[Dict[str, int]]: {'total_articles': int, 'updated_articles': int}，
+                汇总表不可用时返回None
+        """
+        start_day = self._to_date(start_day)
+        end_day = self._to_date(end_day)
+
+        if not self.db.ensure_connection():
+            logger.error("数据库连接失败，无法读取阅读数据日汇总")
+            return None
+
+        try:
+            stale_days = self._get_stale_days(start_day, end_day)
+            if stale_days:
+                logger.debug(f"重新汇总 {len(stale_days)} 个过期日期")
+                if not self.refresh_days(stale_days):
+                    return None
+
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT
+                        COALESCE(SUM(total_articles), 0) AS total_articles,
+                        COALESCE(SUM(updated_articles), 0) AS updated_articles
+                    FROM fx_reading_daily_summary
+                    WHERE stat_date >= %s AND stat_date <= %s
+                    """,
+                    (start_day, end_day)
+                )
+                row = cursor.fetchone() or {}
+
+            return {
+                'total_articles': int(row.get('total_articles') or 0),
+                'updated_articles': int(row.get('updated_articles') or 0)
+            }
+
+        except Exception as e:
+            logger.warning(f"读取阅读数据日汇总失败: {e}")
+            return None
@@ -15,8 +15,7 @@ import signal
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
-from article_reading_updater import ArticleReadingUpdater
-from theme_reading_updater import ThemeReadingUpdater
+from refresh_planner import RefreshPlanner
 from spider.log.utils import logger
 
 
@@ -31,8 +30,9 @@ class ReadingUpdateScheduler:
             config_file: 配置文件路径
         """
         self.config_file = config_file
-        self.updater = ArticleReadingUpdater(config_file)
-        self.theme_updater = ThemeReadingUpdater(config_file)
+        self.planner = RefreshPlanner(config_file)
+        self.updater = self.planner.updater
+        self.theme_updater = self.planner.theme_updater
         self.running = False
         self.scheduler_thread = None
         
@@ -84,38 +84,8 @@ class ReadingUpdateScheduler:
             start_time = datetime.now()
             logger.info(f"任务开始时间: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
             
-            # 第一步：检查是否有即将结束的法律主题月
-            logger.info("\n" + "="*60)
-            logger.info("🎯 第一步：检查法律主题月")
-            logger.info("="*60)
-            
-            theme_success = False
-            if self.theme_updater.db.connect():
-                theme = self.theme_updater.get_upcoming_theme_end()
-                self.theme_updater.db.disconnect()
-                
-                if theme:
-                    logger.info(f"检测到即将结束的法律主题: {theme['theme_name']}")
-                    logger.info(f"主题时间范围: {theme['start_date']} 到 {theme['end_date']}")
-                    logger.info("开始更新主题期间的普法文章阅读量...")
-                    
-                    theme_success = self.theme_updater.run_theme_update()
-                    
-                    if theme_success:
-                        logger.success("✅ 法律主题月阅读量更新成功")
-                    else:
-                        logger.warning("⚠️ 法律主题月阅读量更新失败")
-                else:
-                    logger.info("今天不是法律主题结束前一天，跳过主题更新")
-            else:
-                logger.error("无法连接数据库检查法律主题")
-            
-            # 第二步：执行常规的阅读量更新任务
-            logger.info("\n" + "="*60)
-            logger.info("📝 第二步：执行常规阅读量更新")
-            logger.info("="*60)
-            
-            regular_success = self.updater.run_update()
+            # 常规规则和法律主题规则合并为一次刷新，同一篇文章只调用一次API
+            success = self.planner.run()
             
             # 记录任务结束时间
             end_time = datetime.now()
@@ -125,10 +95,8 @@ class ReadingUpdateScheduler:
             logger.info(f"执行耗时: {duration}")
             
             # 汇总结果
-            if theme and theme_success and regular_success:
-                logger.success("✅ 定时任务执行成功（含法律主题更新）")
-            elif regular_success:
-                logger.success("✅ 定时任务执行成功（仅常规更新）")
+            if success:
+                logger.success("✅ 定时任务执行成功")
             else:
                 logger.error("❌ 定时任务执行失败")
             
@@ -192,10 +160,35 @@ class ReadingUpdateScheduler:
         # 计算并显示下次执行时间
         self._show_next_execution_time(hour, minute)
     
+    def resume_interrupted_run(self):
+        """续跑上次被中断（或因致命错误中止）的刷新运行（统一刷新和法律主题更新）"""
+        runs = [
+            ('刷新运行', self.planner.find_interrupted_run, self.planner.run),
+            ('法律主题更新运行', self.theme_updater.find_interrupted_run,
+             lambda resume_run_id: self.theme_updater.run_theme_update(resume_run_id=resume_run_id)),
+        ]
+        for label, find_run, resume in runs:
+            try:
+                run = find_run()
+                if not run:
+                    continue
+                
+                logger.info(f"📌 发现未完成的{label} {run['id']} (开始于 {run['started_at']}，状态 {run['status']}，"
+                            f"已完成 {run['done_items'] + run['failed_items']}/{run['total_items']} 篇)，开始续跑")
+                if resume(resume_run_id=run['id']):
+                    logger.success(f"✅ {label} {run['id']} 续跑完成")
+                else:
+                    logger.error(f"❌ {label} {run['id']} 续跑失败")
+            except Exception as e:
+                logger.error(f"续跑未完成的{label}时发生异常: {e}")
+    
     def run_scheduler(self):
         """运行调度器主循环"""
         logger.info("调度器开始运行...")
         
+        # 启动时先续跑被中断的运行
+        self.resume_interrupted_run()
+        
         while self.running:
             try:
                 # 检查并执行待执行的任务
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+阅读数据刷新断点续跑
+=================
+
+长时间的刷新（如法律主题月的全量更新）被中断（SIGTERM、重启、数据库断开）后，
+下次运行不必从头开始、为每篇文章再付一次费：
+
+- 每次运行在 fx_refresh_run 中有一条记录（运行ID、参数、首次开始时间、状态）
+- 待处理的文章分页登记到 fx_refresh_run_item（pending），处理完成后改为 done/failed
+- 进度按批提交，提交前先让写入器写入已获取的数据，进度不会超前于写入的数据
+- 用同一个运行ID续跑时，按首次开始时间重建刷新规则，已完成的文章直接跳过
+
+运行正常结束为 finished，致命错误中止为 aborted，租约丢失等提前停止为 interrupted，
+被信号、异常中断的运行保持 running；running/aborted/interrupted 的运行可以续跑，
+开始一次新的运行时，同类型未完成的旧运行标记为 superseded。
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from spider.log.utils import logger
+
+# 可以续跑的状态
+RESUMABLE_STATUSES = ('running', 'aborted', 'interrupted')
+
+# 已结束运行的文章进度保留天数
+ITEM_RETENTION_DAYS = 30
+
+
+class RefreshCheckpoint:
+    """阅读数据刷新断点"""
+
+    def __init__(self, db, kind: str, flush_every: int = 50):
+        """
+        初始化断点
+
+        Args:
+            db: DatabaseManager 实例（由调用方负责连接）
+            kind: 运行类型（planner 统一刷新、theme 法律主题更新）
+            flush_every: 每完成多少篇文章提交一次进度
+        """
+        self.db = db
+        self.kind = kind
+        self.flush_every = max(1, flush_every)
+        self.run_id: Optional[int] = None
+        self.status: Optional[str] = None     # 运行状态（running，结束后为 finish 的状态）
+        self.params: Dict = {}
+        self.started_at: Optional[datetime] = None
+        self.completed_ids: Set[str] = set()  # 续跑前已完成的文章
+        self.pending_results: List = []       # 未提交的 (文章ID, 是否成功)
+        self.writer = None                    # 提交进度前先写入的写入器（由流水线设置）
+        self.skipped = 0                      # 续跑时跳过的已完成文章数
+
+    def _execute(self, sql: str, params=None) -> int:
+        """执行一条语句并提交，返回影响行数"""
+        with self.db.connection.cursor() as cursor:
+            affected = cursor.execute(sql, params)
+        self.db.connection.commit()
+        return affected
+
+    def find_interrupted(self, max_age_hours: float = 24) -> Optional[Dict]:
+        """
+        查找最近一次可以续跑的运行
+
+        Args:
+            max_age_hours: 只考虑这么多小时内开始的运行
+
+        Returns:
+            Optional[Dict]: 运行记录，没有时返回None
+        """
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id, status, params, started_at, updated_at, total_items, done_items, failed_items
+                    FROM fx_refresh_run
+                    WHERE kind = %s AND status IN %s AND started_at >= %s
+                    ORDER BY started_at DESC
+                    LIMIT 1
+                    """,
+                    (self.kind, RESUMABLE_STATUSES, datetime.now() - timedelta(hours=max_age_hours))
+                )
+                return cursor.fetchone()
+        except Exception as e:
+            logger.warning(f"查询未完成的刷新运行时出错: {e}")
+            return None
+
+    def start(self, params: Dict = None, started_at: datetime = None) -> Optional[int]:
+        """
+        开始一次新的运行
+
+        Args:
+            params: 续跑时需要的运行参数（如主题ID）
+            started_at: 开始时间（刷新规则按该时间生成），默认 datetime.now()
+
+        Returns:
+            Optional[int]: 运行ID，记录失败时返回None（本次运行不记录进度）
+        """
+        self.params = params or {}
+        self.started_at = (started_at or datetime.now()).replace(microsecond=0)
+        self.completed_ids = set()
+
+        try:
+            superseded = self._execute(
+                "UPDATE fx_refresh_run SET status = 'superseded', finished_at = %s WHERE kind = %s AND status IN %s",
+                (self.started_at, self.kind, RESUMABLE_STATUSES)
+            )
+            if superseded:
+                logger.info(f"{superseded} 个未完成的旧运行已被本次运行取代")
+
+            self._execute(
+                """
+                DELETE ri FROM fx_refresh_run_item ri
+                INNER JOIN fx_refresh_run r ON r.id = ri.run_id
+                WHERE r.status NOT IN %s AND r.started_at < %s
+                """,
+                (RESUMABLE_STATUSES, self.started_at - timedelta(days=ITEM_RETENTION_DAYS))
+            )
+
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(
+                    "INSERT INTO fx_refresh_run (kind, status, params, started_at, updated_at) "
+                    "VALUES (%s, 'running', %s, %s, %s)",
+                    (self.kind, json.dumps(self.params, ensure_ascii=False, default=str),
+                     self.started_at, self.started_at)
+                )
+                self.run_id = cursor.lastrowid
+            self.db.connection.commit()
+            self.status = 'running'
+
+            logger.info(f"📌 刷新运行ID: {self.run_id}（中断后可用该ID续跑）")
+            return self.run_id
+
+        except Exception as e:
+            logger.error(f"创建刷新运行记录时出错: {e}，本次运行不记录进度")
+            self.run_id = None
+            return None
+
+    def resume(self, run_id: int) -> bool:
+        """
+        续跑一次未完成的运行（加载参数和已完成的文章）
+
+        Args:
+            run_id: 运行ID
+
+        Returns:
+            bool: 可以续跑返回True
+        """
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT id, kind, status, params, started_at FROM fx_refresh_run WHERE id = %s",
+                    (run_id,)
+                )
+                run = cursor.fetchone()
+
+                if not run:
+                    logger.error(f"刷新运行 {run_id} 不存在")
+                    return False
+                if run['kind'] != self.kind:
+                    logger.error(f"刷新运行 {run_id} 的类型为 {run['kind']}，不是 {self.kind}")
+                    return False
+                if run['status'] not in RESUMABLE_STATUSES:
+                    logger.error(f"刷新运行 {run_id} 的状态为 {run['status']}，不能续跑")
+                    return False
+
+                cursor.execute(
+                    "SELECT article_id FROM fx_refresh_run_item WHERE run_id = %s AND status <> 'pending'",
+                    (run_id,)
+                )
+                self.completed_ids = {row['article_id'] for row in cursor.fetchall()}
+
+                cursor.execute(
+                    "UPDATE fx_refresh_run SET status = 'running', resume_count = resume_count + 1, "
+                    "updated_at = %s, finished_at = NULL WHERE id = %s",
+                    (datetime.now().replace(microsecond=0), run_id)
+                )
+            self.db.connection.commit()
+
+        except Exception as e:
+            logger.error(f"加载刷新运行 {run_id} 时出错: {e}")
+            return False
+
+        self.run_id = run_id
+        self.status = 'running'
+        self.params = json.loads(run['params'] or '{}')
+        self.started_at = run['started_at']
+        logger.info(f"📌 续跑刷新运行 {run_id}（首次开始于 {self.started_at}），"
+                    f"已完成 {len(self.completed_ids)} 篇将跳过")
+        return True
+
+    @property
+    def resumable(self) -> bool:
+        """本次运行是否已记录且可以用运行ID续跑"""
+        return self.run_id is not None and self.status in RESUMABLE_STATUSES
+
+    def track(self, articles: Iterable[Dict], page_size: int = 500) -> Iterator[Dict]:
+        """
+        逐页登记待处理的文章后再交给流水线，续跑时跳过已完成的文章
+
+        Args:
+            articles: 文章列表或生成器
+            page_size: 每次登记的文章数
+
+        Yields:
+            Dict: 需要处理的文章
+        """
+        if self.run_id is None:
+            yield from articles
+            return
+
+        page = []
+        for article in articles:
+            if article['article_id'] in self.completed_ids:
+                self.skipped += 1
+                continue
+            page.append(article)
+            if len(page) >= page_size:
+                self._register(page)
+                yield from page
+                page = []
+
+        if page:
+            self._register(page)
+            yield from page
+
+    def _register(self, articles: List[Dict]):
+        """登记一页待处理的文章（已登记的保持原状态）"""
+        now = datetime.now().replace(microsecond=0)
+        try:
+            with self.db.connection.cursor() as cursor:
+                inserted = cursor.executemany(
+                    "INSERT IGNORE INTO fx_refresh_run_item (run_id, article_id, status, updated_at) "
+                    "VALUES (%s, %s, 'pending', %s)",
+                    [(self.run_id, article['article_id'], now) for article in articles]
+                )
+                cursor.execute(
+                    "UPDATE fx_refresh_run SET total_items = total_items + %s, updated_at = %s WHERE id = %s",
+                    (inserted or 0, now, self.run_id)
+                )
+            self.db.connection.commit()
+        except Exception as e:
+            logger.warning(f"登记刷新进度时出错: {e}")
+
+    def complete(self, article_id: str, success: bool):
+        """
+        记录一篇文章处理完成（按批提交）
+
+        Args:
+            article_id: 文章ID
+            success: 是否获取成功（失败的文章已交给重试队列或不可用缓存，续跑时同样跳过）
+        """
+        if self.run_id is None:
+            return
+
+        self.pending_results.append((article_id, success))
+        if len(self.pending_results) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """先写入已获取的数据，再提交进度"""
+        if self.run_id is None or not self.pending_results:
+            return
+
+        if self.writer:
+            self.writer.flush()
+
+        results, self.pending_results = self.pending_results, []
+        now = datetime.now().replace(microsecond=0)
+        try:
+            updated = {}
+            with self.db.connection.cursor() as cursor:
+                for status in ('done', 'failed'):
+                    article_ids = [article_id for article_id, success in results if success == (status == 'done')]
+                    if not article_ids:
+                        updated[status] = 0
+                        continue
+                    placeholders = ', '.join(['%s'] * len(article_ids))
+                    updated[status] = cursor.execute(
+                        f"UPDATE fx_refresh_run_item SET status = %s, updated_at = %s "
+                        f"WHERE run_id = %s AND status = 'pending' AND article_id IN ({placeholders})",
+                        [status, now, self.run_id] + article_ids
+                    )
+                cursor.execute(
+                    "UPDATE fx_refresh_run SET done_items = done_items + %s, failed_items = failed_items + %s, "
+                    "updated_at = %s WHERE id = %s",
+                    (updated['done'], updated['failed'], now, self.run_id)
+                )
+            self.db.connection.commit()
+        except Exception as e:
+            logger.warning(f"提交刷新进度时出错: {e}")
+            try:
+                self.db.connection.rollback()
+            except Exception:
+                pass
+
+    def finish(self, status: str = 'finished'):
+        """
+        提交剩余进度并结束运行
+
+        Args:
+            status: finished（正常结束）、aborted（致命错误中止）、interrupted（提前停止）或 failed（无法续跑），
+                aborted/interrupted 之后可以续跑
+        """
+        if self.run_id is None:
+            return
+
+        self.flush()
+        now = datetime.now().replace(microsecond=0)
+        try:
+            self._execute(
+                "UPDATE fx_refresh_run SET status = %s, updated_at = %s, finished_at = %s WHERE id = %s",
+                (status, now, now, self.run_id)
+            )
+            self.status = status
+        except Exception as e:
+            logger.warning(f"结束刷新运行记录时出错: {e}")
+
+        if self.skipped:
+            logger.info(f"📌 续跑跳过已完成的文章 {self.skipped} 篇")
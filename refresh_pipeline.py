@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+阅读数据刷新流水线
+===============
+
+并发调用第三方API获取文章阅读数据，结果按到达顺序在调用方线程中交给批量写入器。
+API请求在线程池中执行并共用客户端的令牌桶，数据库查询和写入始终在调用方线程，
+同一个数据库连接不会被多个线程同时使用。
+
+临时性错误写入重试队列，本次的文章处理完后再按轮次重试已到期的条目，
+未到期的留给下次运行，不会因为等待重试而拖慢整批处理；
+永久性错误（文章被删除、链接有误）记入不可用文章表，之后的选择查询会排除。
+传入 should_stop 时（如租约丢失、进程退出），每提交一个新请求前检查一次，返回停止原因后不再提交；
+因租约丢失、进程退出停止的运行断点记为 interrupted，之后可以续跑，其他原因（如预算用完）按正常结束记录。
+传入 budget 时（见 budget_planner.py），配置了预算则按预期价值只处理预算内的文章、达到预算或余额下限时停止，
+结束后把本次消费记录到 fx_refresh_spend；统一刷新、单独的更新器和任务队列的工作进程都经过这里，共用每日预算。
+API返回致命错误（key错误、余额不足）时熔断器中止本次运行：不再提交请求也不再重试，
+已获取的数据照常写入。
+传入 checkpoint 时记录每篇文章的完成状态，中断后可以用同一个运行ID续跑剩余的文章。
+传入 history 时记录选择查询、API调用、批量写入的耗时和错误码（见 run_history.py）。
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from budget_planner import RefreshBudget
+from reading_stats_writer import ReadingStatsWriter
+from refresh_checkpoint import RefreshCheckpoint
+from retry_queue import RetryQueue
+from run_history import RunRecorder
+from unavailable_cache import UnavailableCache
+from spider.log.utils import logger
+
+# 停止后可以续跑的停止原因（预算用完等其他原因是有意不再处理剩余的文章）
+RESUMABLE_STOP_REASONS = ('lease_lost', 'shutdown')
+
+
+class RefreshPipeline:
+    """阅读数据刷新流水线"""
+
+    def __init__(self, api_client, writer: ReadingStatsWriter, concurrency: int = 5,
+                 retry_queue: RetryQueue = None, unavailable_cache: UnavailableCache = None,
+                 should_stop: Callable = None, checkpoint: RefreshCheckpoint = None,
+                 history: RunRecorder = None, budget: RefreshBudget = None):
+        """
+        初始化流水线
+
+        Args:
+            api_client: 第三方API客户端（DSFApiClient 或 DSFApiClientPool）
+            writer: 阅读数据批量写入器
+            concurrency: 同时在途的API请求线程数
+            retry_queue: 失败重试队列，为空时不重试
+            unavailable_cache: 永久不可用文章缓存，为空时不记录
+            should_stop: 提交新请求前调用，返回停止原因（如 lease_lost、budget，True 视为 stopped）时停止，
+                已在途的请求仍会处理完
+            checkpoint: 断点，为空时不记录进度
+            history: 运行耗时记录，为空时不记录
+            budget: 刷新预算，为空时不限制也不记录消费
+        """
+        self.api_client = api_client
+        self.writer = writer
+        self.concurrency = max(1, concurrency)
+        self.retry_queue = retry_queue
+        self.unavailable_cache = unavailable_cache
+        self.unavailable_count = 0  # 本次新发现的永久不可用文章数
+        self.should_stop = should_stop
+        self.aborted = None  # 致命错误导致中止时记录错误（DSFFatalError）
+        self.stop_reason = None  # should_stop 返回的停止原因
+        self.checkpoint = checkpoint
+        if checkpoint:
+            # 提交进度前先写入已获取的数据
+            checkpoint.writer = writer
+        self.history = history
+        if history:
+            writer.history = history
+        self.budget = budget
+        self.spend: Optional[Dict] = None  # 本次消费（record_run 的返回值），未传入 budget 时为None
+
+    def _stopped(self) -> bool:
+        """检查 should_stop，第一次返回停止原因时记录下来"""
+        if self.stop_reason is None:
+            reason = self.should_stop() if self.should_stop else None
+            if not reason and self.budget and self.budget.enabled:
+                reason = self.budget.should_stop()
+            if reason:
+                self.stop_reason = reason if isinstance(reason, str) else 'stopped'
+                logger.warning(f"刷新提前停止: {self.stop_reason}")
+        return self.stop_reason is not None
+
+    @property
+    def resumable(self) -> bool:
+        """本次运行是否提前停止且可以续跑"""
+        return bool(self.aborted) or self.stop_reason in RESUMABLE_STOP_REASONS
+
+    def _until_stopped(self, articles: Iterable[Dict]) -> Iterable[Dict]:
+        """逐条返回文章，should_stop 返回停止原因后结束"""
+        for article in articles:
+            if self._stopped():
+                return
+            yield article
+
+    def _process(self, articles: Iterable[Dict], on_result: Callable = None) -> Tuple[int, int, int]:
+        """
+        并发获取一批文章的阅读数据并交给写入器
+
+        Returns:
+            Tuple[int, int, int]: (处理数量, 获取成功数量, 加入重试队列数量)
+        """
+        # 用到时才导入（dsf_api_client 会加载 requests，查询断点、预览等命令不需要）
+        from dsf_api_client import DSFFatalError
+
+        total_count = 0
+        success_count = 0
+        queued_count = 0
+
+        results = self.api_client.iter_article_stats(
+            self._until_stopped(articles),
+            url_getter=lambda article: article['article_url'],
+            max_workers=self.concurrency
+        )
+
+        try:
+            for i, (article, result) in enumerate(results, 1):
+                total_count = i
+                article_title = article.get('article_title') or '无标题'
+                success, stats, error = result['success'], result['stats'], result['error']
+                if self.history:
+                    self.history.add('api', result.get('elapsed', 0.0))
+                    if not success:
+                        self.history.error(result['code'])
+
+                try:
+                    if success:
+                        # 阅读量 -> view_count，在看量 -> likes，点赞量 -> thumbs_count
+                        self.writer.add(article, stats)
+                        success_count += 1
+                        if self.retry_queue:
+                            self.retry_queue.discard(article['article_id'])
+                        if self.unavailable_cache:
+                            self.unavailable_cache.clear(article['article_id'])
+                        logger.success(f"文章数据获取成功: {article_title[:50]} - "
+                                       f"阅读:{stats['read']} 在看:{stats['looking']} 点赞:{stats['zan']}")
+                    else:
+                        logger.warning(f"获取文章数据失败: {article_title[:50]} - {error}")
+                        if self.unavailable_cache and self.unavailable_cache.mark(article, result['code'], error):
+                            self.unavailable_count += 1
+                            if self.retry_queue:
+                                self.retry_queue.discard(article['article_id'])
+                        elif self.retry_queue and self.retry_queue.push(article, result['code'], error):
+                            queued_count += 1
+
+                    if on_result:
+                        on_result(article, success, stats, error)
+
+                    if self.checkpoint:
+                        self.checkpoint.complete(article['article_id'], success)
+
+                except Exception as e:
+                    logger.error(f"处理第 {i} 篇文章时出错: {e}")
+                    continue
+
+                # 进度提示
+                if i % 10 == 0:
+                    logger.info(f"已处理 {i} 篇，成功 {success_count} 篇")
+
+        except DSFFatalError as e:
+            self.aborted = e
+            logger.error(f"API致命错误，中止本次刷新: {e}")
+
+        return total_count, success_count, queued_count
+
+    def drain_retries(self, on_result: Callable = None) -> Tuple[int, int]:
+        """
+        重试队列中已到期的条目（按轮次，每轮处理完再查询下一轮）
+
+        轮数不超过 max_retries + 1，未到期的条目留给下次运行
+
+        Returns:
+            Tuple[int, int]: (重试数量, 重试成功数量)
+        """
+        if not self.retry_queue:
+            return 0, 0
+
+        retried = 0
+        retry_success = 0
+
+        for round_no in range(1, self.retry_queue.max_retries + 2):
+            if self.aborted or self._stopped():
+                break
+
+            due = self.retry_queue.get_due()
+            if not due:
+                break
+
+            logger.info(f"🔁 第 {round_no} 轮重试: {len(due)} 篇到期的失败文章")
+            total_count, success_count, _ = self._process(due, on_result)
+            retried += total_count
+            retry_success += success_count
+
+        return retried, retry_success
+
+    def _record_spend(self, started_at: datetime):
+        """记录本次运行的消费（已经在途的请求计入本次）"""
+        if self.budget:
+            self.spend = self.budget.record_run(started_at)
+
+    def run(self, articles: Iterable[Dict], on_result: Callable = None, retry_due: bool = True,
+            select_budget: bool = True) -> Dict[str, int]:
+        """
+        刷新一批文章的阅读数据，处理完后重试队列中已到期的条目
+
+        Args:
+            articles: 文章列表或逐页产生文章的生成器
+            on_result: 每篇文章处理完成后的回调 on_result(article, success, stats, error)
+            retry_due: 是否重试队列中已到期的条目（任务队列的工作进程不重试，到期条目由入队时一并加入）
+            select_budget: 是否按预算选择文章（任务队列的工作进程不选择，入队时已按预算选过，
+                领取的任务只在达到预算或余额下限时停止）
+
+        Returns:
+            Dict[str, int]: 统计 {'total', 'success', 'queued', 'retried', 'retry_success', 'unavailable',
+                'aborted', 'stopped', 'resumable', 'written', 'unchanged', 'failed'}，
+                success 为获取成功且写入成功的文章数（不含重试），aborted 为致命错误信息（未中止时为None），
+                stopped 为提前停止的原因（未停止时为None），resumable 为提前结束后是否可以续跑
+        """
+        started_at = datetime.now()
+        if self.history:
+            articles = self.history.timed_iter('select', articles)
+        if self.budget and self.budget.enabled:
+            self.budget.start()
+            if select_budget:
+                # 在登记断点之前选择，超出预算的文章不登记
+                articles = self.budget.select(articles)
+        if self.checkpoint:
+            articles = self.checkpoint.track(articles)
+
+        try:
+            total_count, success_count, queued_count = self._process(articles, on_result)
+            retried, retry_success = self.drain_retries(on_result) if retry_due else (0, 0)
+        except BaseException:
+            # 被中断（信号、异常）：保存已获取的数据和进度，运行保持 running 状态以便续跑
+            if self.checkpoint:
+                self.checkpoint.flush()
+            self._record_spend(started_at)
+            raise
+
+        # 写入剩余数据并更新日汇总
+        counts = self.writer.finish()
+        self._record_spend(started_at)
+        if self.checkpoint:
+            if self.aborted:
+                self.checkpoint.finish('aborted')
+            else:
+                self.checkpoint.finish('interrupted' if self.resumable else 'finished')
+
+        result = {
+            'total': total_count,
+            'success': success_count - counts['failed'],
+            'queued': queued_count,
+            'retried': retried,
+            'retry_success': retry_success,
+            'unavailable': self.unavailable_count,
+            'aborted': str(self.aborted) if self.aborted else None,
+            'stopped': self.stop_reason,
+            'resumable': self.resumable
+        }
+        result.update(counts)
+
+        if self.history:
+            self.history.count('items', total_count + retried)
+            for key, value in result.items():
+                if isinstance(value, int) and not isinstance(value, bool):
+                    self.history.count(key, value)
+
+        if retried or queued_count:
+            logger.info(f"重试队列: 本次新加入 {queued_count} 篇，重试 {retried} 篇，成功 {retry_success} 篇")
+        return result
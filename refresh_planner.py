@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+阅读数据刷新计划
+=============
+
+把每天需要刷新阅读数据的各条规则（见 refresh_schedule.py）合并为一次刷新：
+
+- 近N天阅读量为空的文章（填充）
+- 发布后第1、3、6天的文章（按 refresh_schedule.horizons_days 更新）
+- 明天结束的法律主题月期间发布的文章（主题结束前更新）
+
+所有规则拼成一条 OR 查询，按 (publish_time, id) 分页扫描一次，
+同一篇文章即使命中多条规则也只调用一次付费API；
+结果经同一条限流流水线写回数据库，汇总中按规则分别统计。
+
+每条规则可以配置新鲜度（freshness_hours）：N 小时内已经获取过阅读数据的文章
+在查询条件中直接排除，不会被加载，也不会调用API。
+永久不可用的文章（fx_article_unavailable）同样在查询条件中排除。
+配置了刷新预算（budget）时，按预期价值只刷新预算内的文章；每次运行的实际消费记录到 fx_refresh_spend。
+每次运行的进度记录到 fx_refresh_run，被中断的运行可以用 --resume 运行ID 续跑（见 refresh_checkpoint.py）。
+需要多个进程或多台机器一起刷新时，用 --enqueue 把待刷新的文章写入任务队列，
+由 refresh_worker.py 分批领取处理（见 refresh_work_queue.py）。
+"""
+
+import sys
+import argparse
+import itertools
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Optional
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from article_reading_updater import ArticleReadingUpdater
+from job_lease import REFRESH_LEASE, JobLease
+from refresh_checkpoint import RefreshCheckpoint
+from refresh_pipeline import RefreshPipeline
+from refresh_work_queue import RefreshWorkQueue
+from metrics import start_exporter
+from run_history import RunRecorder
+from theme_reading_updater import ThemeReadingUpdater
+from unavailable_cache import UnavailableCache
+from spider.log.utils import logger
+
+
+class RefreshPlanner:
+    """阅读数据统一刷新计划"""
+
+    def __init__(self, config_file: str = "reading_updater_config.json"):
+        """
+        初始化刷新计划
+
+        Args:
+            config_file: 配置文件路径
+        """
+        self.config_file = config_file
+        self.updater = ArticleReadingUpdater(config_file)
+        self.theme_updater = ThemeReadingUpdater(config_file)
+
+        # 两个更新器共用一个数据库连接；API客户端只用 self.updater 的（theme_updater 只用于查询主题和续跑被中断的主题更新）
+        self.db = self.updater.db
+        self.theme_updater.db = self.db
+        self.config = self.updater.config
+
+        self.schedule = self.updater.schedule
+
+    @property
+    def api_client(self):
+        """第三方API客户端（即 self.updater.api_client，第一次使用时创建）"""
+        return self.updater.api_client
+
+    def _get_theme(self, force_theme_id: int = None) -> Optional[Dict]:
+        """获取本次需要刷新的法律主题"""
+        if force_theme_id:
+            logger.info(f"测试模式：强制使用主题ID {force_theme_id}")
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT id, year, theme_name, start_date, end_date, `generate` as is_generated "
+                    "FROM fx_theme WHERE id = %s",
+                    (force_theme_id,)
+                )
+                return cursor.fetchone()
+
+        return self.theme_updater.get_upcoming_theme_end()
+
+    def find_interrupted_run(self) -> Optional[Dict]:
+        """
+        查找可以续跑的统一刷新运行（resume_max_age_hours 小时内开始、被中断或致命错误中止）
+
+        Returns:
+            Optional[Dict]: 运行记录，没有时返回None
+        """
+        if not self.db.connect():
+            logger.error("数据库连接失败")
+            return None
+
+        try:
+            return RefreshCheckpoint(self.db, 'planner').find_interrupted(self.config.get('resume_max_age_hours', 24))
+        finally:
+            self.db.disconnect()
+
+    def run(self, force_theme_id: int = None, resume_run_id: int = None) -> bool:
+        """
+        执行一次统一刷新
+
+        Args:
+            force_theme_id: 强制指定主题ID（用于测试）
+            resume_run_id: 续跑的运行ID，按该运行的首次开始时间和主题重建规则，跳过已完成的文章
+
+        Returns:
+            bool: 任务执行成功返回True
+        """
+        lease = None
+        history = None
+        exporter = None
+        try:
+            # 检查配置
+            if not self.config.get('enabled', True):
+                logger.warning("阅读量更新功能已禁用")
+                return False
+
+            if not (self.config.get('api', {}).get('key') or self.config.get('api', {}).get('keys')):
+                logger.error("API密钥未配置")
+                return False
+
+            # 上次运行的致命错误（余额不足、key错误）可能已经处理，重新允许请求
+            self.api_client.reset()
+
+            # 同一时间只允许一个进程刷新阅读数据（多个入口、多个节点共用QPS上限）
+            lease = JobLease.from_config(self.db, self.config, REFRESH_LEASE)
+            if lease and not lease.acquire():
+                logger.warning("其他进程正在刷新阅读数据，本次跳过")
+                lease = None
+                return False
+
+            # 连接数据库
+            if not self.db.connect():
+                logger.error("数据库连接失败")
+                return False
+
+            start_time = datetime.now()
+            history = RunRecorder('refresh')
+            exporter = start_exporter(self.config, 'refresh')  # 运行指标（配置项 metrics）
+            logger.info("=" * 60)
+            logger.info("🚀 开始执行阅读数据统一刷新")
+            logger.info("=" * 60)
+            logger.info(f"任务开始时间: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+
+            checkpoint = RefreshCheckpoint(self.db, 'planner', self.updater.batch_size)
+            if resume_run_id:
+                if not checkpoint.resume(resume_run_id):
+                    return False
+                theme_id = checkpoint.params.get('theme_id')
+                theme = self._get_theme(theme_id) if theme_id else None
+                rules = self.schedule.build_rules(checkpoint.started_at, theme)
+            else:
+                theme = self._get_theme(force_theme_id)
+                rules = self.schedule.build_rules(start_time, theme)
+                checkpoint.start({'theme_id': theme['id'] if theme else None}, start_time)
+
+            for rule in rules:
+                fresh = f"，跳过 {rule['fresh_since'].strftime('%Y-%m-%d %H:%M')} 之后已刷新的文章" if rule['fresh_since'] else ""
+                logger.info(f"刷新规则: {rule['label']}{fresh}")
+
+            fresh_skipped = self.updater.count_fresh_skipped(rules)
+
+            # 按规则统计：命中数、获取成功数、失败数
+            rule_stats = {rule['name']: {'matched': 0, 'success': 0, 'failed': 0} for rule in rules}
+            shared = {'count': 0}
+
+            def on_result(article, success, stats, error):
+                # 重试队列中的文章不属于任何规则
+                matched = article.get('rules', [])
+                if len(matched) > 1:
+                    shared['count'] += 1
+                for name in matched:
+                    rule_stats[name]['matched'] += 1
+                    rule_stats[name]['success' if success else 'failed'] += 1
+
+            logger.info(f"并发数: {self.updater.concurrency}")
+            # 刷新预算：按预期价值选出预算内的文章，达到预算或余额下限时停止（由流水线应用）
+            budget = self.updater._create_budget('refresh')
+            unavailable_cache = UnavailableCache(self.db)
+            pipeline = RefreshPipeline(self.api_client, self.updater._create_writer(), self.updater.concurrency,
+                                       self.updater._create_retry_queue(), unavailable_cache,
+                                       should_stop=lambda: 'lease_lost' if lease and lease.lost else None,
+                                       checkpoint=checkpoint, history=history, budget=budget)
+            result = pipeline.run(self.updater.iter_work_set(rules), on_result)
+            spend = pipeline.spend
+
+            end_time = datetime.now()
+
+            logger.info("\n" + "=" * 60)
+            logger.info("📊 任务汇总")
+            logger.info("=" * 60)
+            for rule in rules:
+                counts = rule_stats[rule['name']]
+                logger.info(f"{rule['label']}: {counts['matched']} 篇 "
+                            f"(成功 {counts['success']}，失败 {counts['failed']})")
+            logger.info(f"去重后实际调用API: {result['total']} 篇 (其中同时命中多条规则 {shared['count']} 篇)")
+            logger.info(f"写入 {result['written']} 篇，数值无变化跳过 {result['unchanged']} 篇，"
+                        f"写入失败 {result['failed']} 篇")
+            logger.info(f"临时性错误加入重试队列 {result['queued']} 篇，"
+                        f"到期重试 {result['retried']} 篇 (成功 {result['retry_success']} 篇)")
+            unavailable_status = unavailable_cache.get_status()
+            logger.info(f"新发现永久不可用 {result['unavailable']} 篇，"
+                        f"不可用文章共 {sum(unavailable_status.values())} 篇 (按错误码: {unavailable_status})")
+            if fresh_skipped:
+                saved_money = self.api_client.estimate_cost(fresh_skipped, self.config.get('api', {}).get('cost_per_call'))
+                saved_text = f"约 {saved_money} 元" if saved_money is not None else "金额未知"
+                logger.info(f"近期已刷新跳过: {fresh_skipped} 篇 (节省API调用 {fresh_skipped} 次，{saved_text})")
+            if budget.enabled and budget.candidates > budget.selected:
+                logger.info(f"超出预算未刷新: {budget.candidates - budget.selected} 篇")
+            if budget.stopped_reason:
+                logger.warning(f"因预算提前停止: {budget.stopped_reason}")
+            logger.info(f"本次消费: {spend['cost_money']} 元 (计费调用 {spend['paid_calls']} 次)，"
+                        f"账户余额: {spend['remain_money']} 元")
+            logger.info(f"任务结束时间: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
+            logger.info(f"执行耗时: {end_time - start_time}")
+            logger.info(f"处理结果: 成功 {result['success']}/{result['total']} 篇")
+
+            if result['success'] > 0:
+                logger.success(f"✅ 成功处理了 {result['success']} 篇文章的阅读量数据")
+
+            if result['success'] < result['total']:
+                logger.warning(f"⚠️  有 {result['total'] - result['success']} 篇文章处理失败")
+
+            if result['aborted']:
+                logger.error(f"❌ 因API致命错误中止: {result['aborted']}")
+                history.status = 'aborted'
+                return False
+
+            if lease and lease.lost:
+                hint = f"（可用 --resume {checkpoint.run_id} 续跑）" if checkpoint.resumable else ""
+                logger.error(f"❌ 刷新租约已丢失，本次运行提前停止{hint}")
+                history.status = 'interrupted'
+                return False
+
+            history.status = 'success'
+            return True
+
+        except Exception as e:
+            logger.error(f"执行统一刷新任务时发生异常: {e}")
+            return False
+
+        finally:
+            if history:
+                history.save(self.db)
+            if exporter:
+                exporter.stop()
+            # 关闭数据库连接
+            self.db.disconnect()
+            if lease:
+                lease.release()
+
+    def preview(self, force_theme_id: int = None) -> Dict[str, int]:
+        """
+        预览本次刷新会处理的文章数量（不调用API）
+
+        Args:
+            force_theme_id: 强制指定主题ID（用于测试）
+
+        Returns:
+            Dict[str, int]: 规则名称 -> 命中文章数，'total' 为去重后的总数，
+                'fresh_skipped' 为因新鲜度跳过的文章数
+        """
+        if not self.db.connect():
+            logger.error("数据库连接失败")
+            return {}
+
+        try:
+            rules = self.schedule.build_rules(theme=self._get_theme(force_theme_id))
+            counts = {rule['name']: 0 for rule in rules}
+            counts['total'] = 0
+
+            for article in self.updater.iter_work_set(rules):
+                counts['total'] += 1
+                for name in article['rules']:
+                    counts[name] += 1
+
+            counts['fresh_skipped'] = self.updater.count_fresh_skipped(rules)
+
+            for rule in rules:
+                logger.info(f"{rule['label']}: {counts[rule['name']]} 篇")
+            logger.info(f"去重后共 {counts['total']} 篇，近期已刷新跳过 {counts['fresh_skipped']} 篇")
+            return counts
+
+        finally:
+            self.db.disconnect()
+
+    def enqueue(self, force_theme_id: int = None) -> int:
+        """
+        把本次需要刷新的文章（含重试队列中已到期的条目）写入任务队列，由工作进程处理
+
+        配置了刷新预算时按预期价值只加入预算内的文章
+
+        Args:
+            force_theme_id: 强制指定主题ID（用于测试）
+
+        Returns:
+            int: 入队的文章数，失败返回-1
+        """
+        if not self.db.connect():
+            logger.error("数据库连接失败")
+            return -1
+
+        try:
+            rules = self.schedule.build_rules(theme=self._get_theme(force_theme_id))
+            for rule in rules:
+                logger.info(f"刷新规则: {rule['label']}")
+
+            work_set = self.updater.iter_work_set(rules)
+            budget = self.updater._create_budget('refresh')
+            if budget.enabled:
+                budget.start()
+                work_set = budget.select(work_set)
+
+            # 先加入到期的重试条目，同时命中规则的文章随后以规则名称覆盖
+            retries = self.updater._create_retry_queue().get_due()
+            for article in retries:
+                article['rules'] = ['retry']
+
+            queue_config = self.config.get('work_queue', {})
+            queue = RefreshWorkQueue(self.db, queue_config.get('claim_seconds', 300),
+                                     queue_config.get('max_attempts', 3))
+            count = queue.enqueue(itertools.chain(retries, work_set), self.updater.page_size)
+
+            status = queue.get_status()
+            logger.info(f"任务队列: 待领取 {status['pending']}，已领取 {status['claimed']} "
+                        f"(到期未完成 {status['expired']})，工作进程 {status['workers']} 个")
+            return count
+
+        except Exception as e:
+            logger.error(f"写入刷新任务队列时发生异常: {e}")
+            return -1
+
+        finally:
+            self.db.disconnect()
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="阅读数据统一刷新")
+    parser.add_argument("--config", default="reading_updater_config.json", help="配置文件路径")
+    parser.add_argument("--theme-id", type=int, help="强制指定法律主题ID（测试用）")
+    parser.add_argument("--dry-run", action="store_true", help="只统计待刷新文章，不调用API")
+    parser.add_argument("--resume", type=int, metavar="RUN_ID", help="续跑被中断的刷新运行")
+    parser.add_argument("--enqueue", action="store_true", help="只把待刷新文章写入任务队列，由 refresh_worker.py 处理")
+
+    args = parser.parse_args()
+
+    planner = RefreshPlanner(args.config)
+    if args.dry_run:
+        return 0 if planner.preview(args.theme_id) else 1
+    if args.enqueue:
+        return 0 if planner.enqueue(args.theme_id) >= 0 else 1
+    return 0 if planner.run(args.theme_id, resume_run_id=args.resume) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+阅读数据刷新时间表
+===============
+
+按文章发布后的天数声明刷新时间点，代替原来固定的"往前推6天"规则：
+
+    "refresh_schedule": {
+        "horizons_days": [1, 3, 6],   # 发布后第1、3、6天各刷新一次
+        "theme_end": true             # 法律主题月结束前一天刷新主题期间的全部文章
+    }
+
+加上"近N天阅读量为空"的填充规则，每条规则都是发布时间上的一个区间，
+全部规则合并成一条 OR 查询，扫描范围是各区间的并集（idx_publish_time 上的一段范围），
+每天的API调用量约为 各时间点当天发布的文章数之和 + 空数据文章数，可预估且有上限。
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from article_selection import EMPTY_STATS_CONDITION, NOT_FRESH_CONDITION, get_fresh_since
+
+DEFAULT_HORIZONS_DAYS = [1, 3, 6]
+
+
+class RefreshSchedule:
+    """阅读数据刷新时间表"""
+
+    def __init__(self, config: Dict):
+        """
+        初始化时间表
+
+        Args:
+            config: 更新器配置（读取 days_to_check、refresh_schedule、freshness_hours）
+        """
+        schedule_config = config.get('refresh_schedule', {})
+        self.config = config
+        self.days_to_check = config.get('days_to_check', 7)
+        self.horizons_days = sorted(set(schedule_config.get('horizons_days', DEFAULT_HORIZONS_DAYS)))
+        self.theme_end = schedule_config.get('theme_end', True)
+
+    def build_rules(self, now: datetime = None, theme: Dict = None) -> List[Dict]:
+        """
+        生成本次刷新的规则列表
+
+        Args:
+            now: 当前时间，默认 datetime.now()
+            theme: 即将结束的法律主题（为空或未启用 theme_end 时没有主题规则）
+
+        Returns:
+            List[Dict]: 规则列表，每条规则包含 name/label/start/end/only_empty/fresh_since
+        """
+        if now is None:
+            now = datetime.now()
+
+        rules = [{
+            'name': 'empty',
+            'label': f"近{self.days_to_check}天阅读量为空(填充)",
+            'start': now - timedelta(days=self.days_to_check),
+            'end': now,
+            'only_empty': True
+        }]
+
+        for days in self.horizons_days:
+            target_day = (now - timedelta(days=days)).date()
+            rules.append({
+                'name': f"day_{days}",
+                'label': f"发布后第{days}天({target_day.strftime('%Y-%m-%d')})(更新)",
+                'start': datetime.combine(target_day, datetime.min.time()),
+                'end': datetime.combine(target_day, datetime.max.time()),
+                'only_empty': False
+            })
+
+        if theme and self.theme_end:
+            rules.append({
+                'name': 'theme',
+                'label': f"法律主题「{theme['theme_name']}」({theme['start_date']} 到 {theme['end_date']})",
+                'start': datetime.combine(theme['start_date'], datetime.min.time()),
+                'end': datetime.combine(theme['end_date'], datetime.max.time()),
+                'only_empty': False
+            })
+
+        for rule in rules:
+            rule['fresh_since'] = get_fresh_since(self.config, rule['name'], now)
+
+        return rules
+
+    @staticmethod
+    def window(rules: List[Dict]) -> Tuple[datetime, datetime]:
+        """所有规则发布时间区间的并集范围 (开始, 结束)"""
+        return min(rule['start'] for rule in rules), max(rule['end'] for rule in rules)
+
+    @staticmethod
+    def rule_condition(rule: Dict, with_freshness: bool = True) -> Tuple[str, List]:
+        """
+        生成单条规则的查询条件
+
+        Args:
+            rule: 规则
+            with_freshness: 是否带上新鲜度条件
+
+        Returns:
+            Tuple[str, List]: (条件, 参数)
+        """
+        condition = "(ar.publish_time >= %s AND ar.publish_time <= %s"
+        params = [rule['start'], rule['end']]
+        if rule['only_empty']:
+            condition += f" AND {EMPTY_STATS_CONDITION}"
+        if with_freshness and rule.get('fresh_since'):
+            condition += f" AND {NOT_FRESH_CONDITION}"
+            params.append(rule['fresh_since'])
+        return condition + ")", params
+
+    @classmethod
+    def rules_condition(cls, rules: List[Dict], with_freshness: bool = True) -> Tuple[str, List]:
+        """把多条规则合并为一个 OR 条件，返回 (条件, 参数)"""
+        conditions = []
+        params = []
+        for rule in rules:
+            condition, rule_params = cls.rule_condition(rule, with_freshness)
+            conditions.append(condition)
+            params.extend(rule_params)
+        return f"({' OR '.join(conditions)})", params
+
+    @staticmethod
+    def match_rules(article: Dict, rules: List[Dict]) -> List[str]:
+        """
+        计算文章命中的规则
+
+        Args:
+            article: 文章信息字典（需包含 last_fetched_at 才能判断新鲜度）
+            rules: 规则列表
+
+        Returns:
+            List[str]: 命中的规则名称
+        """
+        publish_time = article.get('publish_time')
+        last_fetched_at = article.get('last_fetched_at')
+        is_empty = (article.get('view_count') is None or article.get('likes') is None
+                    or article.get('thumbs_count') is None)
+
+        matched = []
+        for rule in rules:
+            if publish_time is None or not (rule['start'] <= publish_time <= rule['end']):
+                continue
+            if rule['only_empty'] and not is_empty:
+                continue
+            if rule.get('fresh_since') and last_fetched_at and last_fetched_at >= rule['fresh_since']:
+                continue
+            matched.append(rule['name'])
+        return matched
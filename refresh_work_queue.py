@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+阅读数据刷新任务队列
+=================
+
+统一刷新按规则选出的文章写入 fx_refresh_task，任意数量的工作进程（可以在不同的机器上）
+用 SELECT ... FOR UPDATE SKIP LOCKED 分批领取，互不阻塞也不会重复领取：
+
+- 每篇文章一条任务（主键 article_id），重复入队时已完成的任务重新变为 pending，已领取的保持原状
+- 领取时记录工作进程和到期时间（claimed_until），工作进程每次提交进度时为未完成的任务续期
+- 工作进程崩溃后，到期未完成的任务重新入队；领取次数达到 max_attempts 的任务标记为 failed
+- 完成状态按批提交，提交前先让写入器写入已获取的数据，状态不会超前于写入的数据
+- 所有时间比较使用数据库的 NOW()，不受各节点时钟偏差影响
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from spider.log.utils import logger
+
+# 已完成任务的保留天数
+TASK_RETENTION_DAYS = 30
+
+# 任务中保存的文章字段（工作进程不再查询文章表）
+TASK_COLUMNS = ['article_id', 'article_url', 'article_title', 'publish_time', 'view_count', 'likes', 'thumbs_count']
+
+
+class RefreshWorkQueue:
+    """阅读数据刷新任务队列"""
+
+    def __init__(self, db, claim_seconds: int = 300, max_attempts: int = 3, flush_every: int = 50):
+        """
+        初始化任务队列
+
+        Args:
+            db: DatabaseManager 实例（由调用方负责连接）
+            claim_seconds: 领取有效期（秒），到期未完成的任务重新入队
+            max_attempts: 最多领取次数
+            flush_every: 每完成多少个任务提交一次状态
+        """
+        self.db = db
+        self.claim_seconds = max(30, int(claim_seconds))
+        self.max_attempts = max(1, int(max_attempts))
+        self.flush_every = max(1, flush_every)
+        self.worker: Optional[str] = None
+        self.claimed_ids: Set[str] = set()  # 本进程领取但尚未完成的任务
+        self.pending_results: List = []     # 未提交的 (文章ID, 是否成功, 错误信息)
+        self.writer = None                  # 提交状态前先写入的写入器
+
+    def enqueue(self, articles: Iterable[Dict], page_size: int = 500) -> int:
+        """
+        分页写入任务
+
+        Args:
+            articles: 文章列表或生成器（选择查询的结果）
+            page_size: 每次写入的任务数
+
+        Returns:
+            int: 入队的文章数
+        """
+        self._execute(
+            "DELETE FROM fx_refresh_task WHERE status IN ('done', 'failed') "
+            "AND finished_at < NOW() - INTERVAL %s DAY",
+            (TASK_RETENTION_DAYS,)
+        )
+
+        count = 0
+        page = []
+        for article in articles:
+            page.append(article)
+            if len(page) >= page_size:
+                count += self._insert(page)
+                page = []
+        if page:
+            count += self._insert(page)
+
+        logger.info(f"📥 已将 {count} 篇文章加入刷新任务队列")
+        return count
+
+    def _insert(self, articles: List[Dict]) -> int:
+        """写入一页任务（已领取的任务只更新文章字段）"""
+        rows = [[article.get(column) for column in TASK_COLUMNS] + [','.join(article.get('rules', []))]
+                for article in articles]
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.executemany(
+                    f"""
+                    INSERT INTO fx_refresh_task ({', '.join(TASK_COLUMNS)}, rules, status, attempts, enqueued_at)
+                    VALUES ({', '.join(['%s'] * len(TASK_COLUMNS))}, %s, 'pending', 0, NOW())
+                    ON DUPLICATE KEY UPDATE
+                        article_url = VALUES(article_url),
+                        article_title = VALUES(article_title),
+                        publish_time = VALUES(publish_time),
+                        view_count = VALUES(view_count),
+                        likes = VALUES(likes),
+                        thumbs_count = VALUES(thumbs_count),
+                        rules = VALUES(rules),
+                        attempts = IF(status = 'claimed', attempts, 0),
+                        enqueued_at = IF(status IN ('done', 'failed'), VALUES(enqueued_at), enqueued_at),
+                        worker = IF(status = 'claimed', worker, NULL),
+                        finished_at = IF(status = 'claimed', finished_at, NULL),
+                        error = IF(status = 'claimed', error, NULL),
+                        status = IF(status = 'claimed', status, 'pending')
+                    """,
+                    rows
+                )
+            self.db.connection.commit()
+            return len(rows)
+        except Exception as e:
+            logger.error(f"写入刷新任务时出错: {e}")
+            return 0
+
+    def _execute(self, sql: str, params=None) -> int:
+        """执行一条语句并提交，返回影响行数（出错时记录日志并返回0）"""
+        try:
+            with self.db.connection.cursor() as cursor:
+                affected = cursor.execute(sql, params)
+            self.db.connection.commit()
+            return affected
+        except Exception as e:
+            logger.warning(f"更新刷新任务队列时出错: {e}")
+            return 0
+
+    def recover_expired(self) -> int:
+        """
+        处理到期未完成的任务：重新入队，领取次数已满的标记为失败
+
+        Returns:
+            int: 重新入队的任务数
+        """
+        failed = self._execute(
+            "UPDATE fx_refresh_task SET status = 'failed', finished_at = NOW(), error = '领取次数已满，未能完成' "
+            "WHERE status = 'claimed' AND claimed_until < NOW() AND attempts >= %s",
+            (self.max_attempts,)
+        )
+        if failed:
+            logger.warning(f"{failed} 个任务领取 {self.max_attempts} 次仍未完成，已标记为失败")
+
+        requeued = self._execute(
+            "UPDATE fx_refresh_task SET status = 'pending', worker = NULL, claimed_until = NULL "
+            "WHERE status = 'claimed' AND claimed_until < NOW()"
+        )
+        if requeued:
+            logger.info(f"🔁 {requeued} 个领取到期未完成的任务已重新入队")
+        return requeued
+
+    def claim(self, worker: str, limit: int) -> List[Dict]:
+        """
+        领取一批待处理的任务（SKIP LOCKED，多个工作进程同时领取时互不阻塞）
+
+        Args:
+            worker: 工作进程标识
+            limit: 最多领取的数量
+
+        Returns:
+            List[Dict]: 文章信息列表（字段与选择查询一致，rules 为命中的规则名称列表）
+        """
+        self.worker = worker
+        if not self.db.ensure_connection():
+            logger.error("数据库连接失败，无法领取刷新任务")
+            return []
+        self.recover_expired()
+
+        connection = self.db.connection
+        try:
+            connection.begin()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT {', '.join(TASK_COLUMNS)}, rules
+                    FROM fx_refresh_task
+                    WHERE status = 'pending'
+                    ORDER BY enqueued_at, article_id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                    """,
+                    (limit,)
+                )
+                tasks = list(cursor.fetchall())
+                if tasks:
+                    placeholders = ', '.join(['%s'] * len(tasks))
+                    cursor.execute(
+                        f"UPDATE fx_refresh_task SET status = 'claimed', worker = %s, attempts = attempts + 1, "
+                        f"claimed_until = NOW() + INTERVAL %s SECOND WHERE article_id IN ({placeholders})",
+                        [worker, self.claim_seconds] + [task['article_id'] for task in tasks]
+                    )
+            connection.commit()
+        except Exception as e:
+            logger.error(f"领取刷新任务时出错: {e}")
+            try:
+                connection.rollback()
+            except Exception:
+                pass
+            return []
+
+        for task in tasks:
+            task['rules'] = [name for name in (task['rules'] or '').split(',') if name]
+            self.claimed_ids.add(task['article_id'])
+        return tasks
+
+    def iter_claimed(self, worker: str, batch_size: int = 50) -> Iterator[Dict]:
+        """
+        逐批领取任务并逐条返回，队列中没有待处理的任务时结束
+
+        Args:
+            worker: 工作进程标识
+            batch_size: 每次领取的数量
+
+        Yields:
+            Dict: 需要处理的文章
+        """
+        while True:
+            tasks = self.claim(worker, batch_size)
+            if not tasks:
+                return
+            yield from tasks
+
+    def complete(self, article_id: str, success: bool, error: str = None):
+        """
+        记录一个任务处理完成（按批提交）
+
+        Args:
+            article_id: 文章ID
+            success: 是否获取成功（失败的文章已交给重试队列或不可用缓存）
+            error: 失败原因
+        """
+        self.pending_results.append((article_id, success, error))
+        if len(self.pending_results) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """先写入已获取的数据，再提交任务状态，并为本进程未完成的任务续期"""
+        if self.writer:
+            self.writer.flush()
+
+        results, self.pending_results = self.pending_results, []
+        try:
+            with self.db.connection.cursor() as cursor:
+                for article_id, success, error in results:
+                    cursor.execute(
+                        "UPDATE fx_refresh_task SET status = %s, finished_at = NOW(), error = %s "
+                        "WHERE article_id = %s AND status = 'claimed' AND worker = %s",
+                        ('done' if success else 'failed', None if success else (error or '')[:255],
+                         article_id, self.worker)
+                    )
+                    self.claimed_ids.discard(article_id)
+                if self.claimed_ids:
+                    cursor.execute(
+                        "UPDATE fx_refresh_task SET claimed_until = NOW() + INTERVAL %s SECOND "
+                        "WHERE worker = %s AND status = 'claimed'",
+                        (self.claim_seconds, self.worker)
+                    )
+            self.db.connection.commit()
+        except Exception as e:
+            logger.warning(f"提交刷新任务状态时出错: {e}")
+
+    def release(self) -> int:
+        """
+        提交剩余状态，本进程领取但未处理的任务放回队列（停止或中止时调用）
+
+        Returns:
+            int: 放回队列的任务数
+        """
+        self.flush()
+        if not self.claimed_ids:
+            return 0
+
+        placeholders = ', '.join(['%s'] * len(self.claimed_ids))
+        released = self._execute(
+            f"UPDATE fx_refresh_task SET status = 'pending', worker = NULL, claimed_until = NULL, "
+            f"attempts = GREATEST(attempts, 1) - 1 "
+            f"WHERE worker = %s AND status = 'claimed' AND article_id IN ({placeholders})",
+            [self.worker] + list(self.claimed_ids)
+        )
+        self.claimed_ids.clear()
+        if released:
+            logger.info(f"{released} 个已领取但未处理的任务已放回队列")
+        return released
+
+    def get_status(self) -> Dict[str, int]:
+        """
+        获取队列状态
+
+        Returns:
+            Dict[str, int]: {'pending', 'claimed', 'expired', 'done', 'failed', 'workers'}
+        """
+        status = {'pending': 0, 'claimed': 0, 'expired': 0, 'done': 0, 'failed': 0, 'workers': 0}
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute("SELECT status, COUNT(*) AS cnt FROM fx_refresh_task GROUP BY status")
+                for row in cursor.fetchall():
+                    status[row['status']] = int(row['cnt'])
+                # 到期未完成的领取（工作进程可能已崩溃）和仍在工作的进程数
+                cursor.execute(
+                    "SELECT SUM(claimed_until < NOW()) AS expired, "
+                    "COUNT(DISTINCT IF(claimed_until >= NOW(), worker, NULL)) AS workers "
+                    "FROM fx_refresh_task WHERE status = 'claimed'"
+                )
+                row = cursor.fetchone()
+                status['expired'] = int(row['expired'] or 0)
+                status['workers'] = int(row['workers'] or 0)
+        except Exception as e:
+            logger.error(f"查询刷新任务队列状态时出错: {e}")
+        return status
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+阅读数据刷新工作进程
+=================
+
+从任务队列（fx_refresh_task，由 refresh_planner.py --enqueue 写入）分批领取文章，
+调用第三方API并写回阅读数据。可以在多个进程、多台机器上同时运行，吞吐量随密钥和进程数增加：
+
+- 领取使用 SELECT ... FOR UPDATE SKIP LOCKED，不同进程不会领到同一篇文章
+- 每个密钥的QPS上限由使用它的进程分摊：--keys 指定本进程使用的密钥（api.keys 的序号），
+  多个进程共用同一个密钥时用 --qps-share（或配置 work_queue.qps_share）按比例降低QPS
+- 进程崩溃后，其领取的任务在 claim_seconds 秒后重新入队；正常停止（Ctrl+C、SIGTERM）时
+  处理完在途请求，未处理的任务立即放回队列
+- 失败的文章照常进入重试队列或不可用缓存，到期的重试条目在下次入队时一并加入
+- 配置了刷新预算（budget）时，每批开始时按已记录的消费计算今日剩余预算，达到预算或余额下限后
+  不再领取新任务并退出（入队时已按预算选择，多个进程同时运行时各自按开始时的剩余预算判断）；
+  每批的消费以 worker:工作进程ID 为来源记录到 fx_refresh_spend
+
+配置项 work_queue：
+    {"batch_size": 50, "claim_seconds": 300, "max_attempts": 3, "qps_share": 1.0, "poll_seconds": 30}
+
+使用示例：
+    python refresh_planner.py --enqueue
+    python refresh_worker.py
+    python refresh_worker.py --keys 0,1
+    python refresh_worker.py --qps-share 0.5 --wait
+    python refresh_worker.py --status
+"""
+
+import os
+import sys
+import time
+import signal
+import socket
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from article_reading_updater import ArticleReadingUpdater
+from budget_planner import RefreshBudget
+from metrics import start_exporter
+from refresh_work_queue import RefreshWorkQueue
+from run_history import RunRecorder
+from unavailable_cache import UnavailableCache
+from spider.log.utils import logger
+
+
+def share_api_config(api_config: Dict, key_indexes: List[int] = None, qps_share: float = 1.0) -> Dict:
+    """
+    生成本进程使用的API配置
+
+    Args:
+        api_config: 配置中的 api 部分
+        key_indexes: 本进程使用的 api.keys 序号，为空时使用全部密钥
+        qps_share: 本进程占每个密钥QPS上限的比例
+
+    Returns:
+        Dict: API配置
+
+    Raises:
+        ValueError: 密钥序号超出 api.keys 的范围
+    """
+    api_config = dict(api_config)
+    default_qps = api_config.get('qps', 5)
+    api_config['qps'] = default_qps * qps_share
+
+    keys = api_config.get('keys') or []
+    if key_indexes:
+        missing = [i for i in key_indexes if not 0 <= i < len(keys)]
+        if missing:
+            raise ValueError(f"api.keys 中没有序号为 {missing} 的密钥（共 {len(keys)} 个）")
+        keys = [keys[i] for i in key_indexes]
+    api_config['keys'] = [dict(key_config, qps=key_config.get('qps', default_qps) * qps_share)
+                          for key_config in keys]
+    return api_config
+
+
+class RefreshWorker:
+    """阅读数据刷新工作进程"""
+
+    def __init__(self, config_file: str = "reading_updater_config.json",
+                 key_indexes: List[int] = None, qps_share: float = None):
+        """
+        初始化工作进程
+
+        Args:
+            config_file: 配置文件路径
+            key_indexes: 本进程使用的 api.keys 序号，为空时使用全部密钥
+            qps_share: 本进程占每个密钥QPS上限的比例，默认取配置 work_queue.qps_share
+        """
+        self.updater = ArticleReadingUpdater(config_file)
+        self.db = self.updater.db
+        self.config = self.updater.config
+
+        queue_config = self.config.get('work_queue', {})
+        self.batch_size = queue_config.get('batch_size', 50)
+        self.claim_seconds = queue_config.get('claim_seconds', 300)
+        self.max_attempts = queue_config.get('max_attempts', 3)
+        self.poll_seconds = queue_config.get('poll_seconds', 30)
+        qps_share = qps_share if qps_share is not None else queue_config.get('qps_share', 1.0)
+
+        # API客户端在 run() 中创建（--status 不加载 requests）
+        self.api_config = share_api_config(self.config.get('api', {}), key_indexes, qps_share)
+        self.api_client = None
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = False
+
+    def _signal_handler(self, signum, frame):
+        """信号处理器：处理完在途请求后停止"""
+        logger.info(f"接收到信号 {signum}，处理完在途请求后停止...")
+        self.stopping = True
+
+    def process_queue(self, queue: RefreshWorkQueue) -> Dict:
+        """
+        领取并处理任务，直到队列为空、收到停止信号、达到刷新预算或发生致命错误
+        （处理过任务时记录运行耗时和消费）
+
+        Returns:
+            Dict: 流水线统计
+        """
+        from refresh_pipeline import RefreshPipeline
+
+        history = RunRecorder('worker')
+        pipeline = RefreshPipeline(self.api_client, self.updater._create_writer(), self.updater.concurrency,
+                                   self.updater._create_retry_queue(), UnavailableCache(self.db),
+                                   should_stop=lambda: 'shutdown' if self.stopping else None, history=history,
+                                   budget=RefreshBudget(self.db, self.api_client, self.config.get('budget'),
+                                                        f"worker:{self.worker_id}"))
+        queue.writer = pipeline.writer
+
+        try:
+            result = pipeline.run(
+                queue.iter_claimed(self.worker_id, self.batch_size),
+                on_result=lambda article, success, stats, error: queue.complete(article['article_id'], success, error),
+                retry_due=False,
+                select_budget=False
+            )
+        finally:
+            # 提交剩余状态，未处理的任务（停止、致命错误、异常）放回队列
+            queue.release()
+
+        if result['total']:
+            history.status = 'aborted' if result['aborted'] else ('interrupted' if self.stopping else 'success')
+            history.save(self.db)
+        return result
+
+    def run(self, wait: bool = False) -> bool:
+        """
+        运行工作进程
+
+        Args:
+            wait: 队列为空时等待新任务（常驻），否则处理完当前任务后退出
+
+        Returns:
+            bool: 正常结束返回True，致命错误中止返回False
+        """
+        signal.signal(signal.SIGINT, self._signal_handler)
+        signal.signal(signal.SIGTERM, self._signal_handler)
+
+        if not self.db.connect():
+            logger.error("数据库连接失败")
+            return False
+
+        from dsf_client_pool import create_api_client
+        self.api_client = create_api_client(self.api_config)
+
+        start_time = datetime.now()
+        logger.info("=" * 60)
+        logger.info(f"🚀 阅读数据刷新工作进程启动: {self.worker_id}")
+        logger.info("=" * 60)
+
+        queue = RefreshWorkQueue(self.db, self.claim_seconds, self.max_attempts, self.batch_size)
+        exporter = start_exporter(self.config, 'worker')  # 运行指标（配置项 metrics）
+        totals = {'total': 0, 'success': 0, 'queued': 0, 'unavailable': 0, 'written': 0, 'unchanged': 0, 'failed': 0}
+        aborted = None
+        budget_stopped = None
+
+        try:
+            while not self.stopping:
+                result = self.process_queue(queue)
+                for key in totals:
+                    totals[key] += result.get(key, 0)
+                if result['aborted']:
+                    aborted = result['aborted']
+                    break
+                if result['stopped'] and result['stopped'] != 'shutdown':
+                    # 达到刷新预算或余额下限，剩余任务留在队列中
+                    budget_stopped = result['stopped']
+                    break
+                if not wait or self.stopping:
+                    break
+                if not result['total']:
+                    time.sleep(self.poll_seconds)
+        finally:
+            self.db.disconnect()
+            if exporter:
+                exporter.stop()
+
+        logger.info("=" * 60)
+        logger.info(f"📊 工作进程 {self.worker_id} 汇总（耗时 {datetime.now() - start_time}）")
+        logger.info("=" * 60)
+        logger.info(f"处理 {totals['total']} 篇: 成功 {totals['success']}，加入重试队列 {totals['queued']}，"
+                    f"永久不可用 {totals['unavailable']}")
+        logger.info(f"写入 {totals['written']} 篇，数值无变化跳过 {totals['unchanged']} 篇，写入失败 {totals['failed']} 篇")
+        logger.info(f"API调用 {self.api_client.total_calls} 次，本次消费 {self.api_client.total_cost_money} 元")
+
+        if budget_stopped:
+            logger.warning(f"💰 已达到刷新预算 ({budget_stopped})，工作进程停止领取新任务")
+
+        if aborted:
+            logger.error(f"❌ 因API致命错误中止: {aborted}")
+            return False
+        return True
+
+    def show_status(self):
+        """显示任务队列状态"""
+        if not self.db.connect():
+            logger.error("数据库连接失败")
+            return
+
+        try:
+            status = RefreshWorkQueue(self.db, self.claim_seconds, self.max_attempts).get_status()
+        finally:
+            self.db.disconnect()
+
+        print("\n" + "=" * 60)
+        print("📋 阅读数据刷新任务队列")
+        print("=" * 60)
+        print(f"待领取: {status['pending']}")
+        print(f"已领取: {status['claimed']} (到期未完成 {status['expired']}，工作中的进程 {status['workers']} 个)")
+        print(f"已完成: {status['done']}    失败: {status['failed']}")
+        print("=" * 60)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(
+        description="阅读数据刷新工作进程（处理任务队列）",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("使用示例：")[1]
+    )
+    parser.add_argument("--config", default="reading_updater_config.json", help="配置文件路径")
+    parser.add_argument("--keys", help="本进程使用的密钥序号（api.keys 中的位置，逗号分隔），默认全部")
+    parser.add_argument("--qps-share", type=float, help="本进程占每个密钥QPS上限的比例（0-1）")
+    parser.add_argument("--wait", action="store_true", help="队列为空时等待新任务（常驻运行）")
+    parser.add_argument("--status", action="store_true", help="显示任务队列状态")
+    args = parser.parse_args()
+
+    key_indexes = [int(index) for index in args.keys.split(',')] if args.keys else None
+    worker = RefreshWorker(args.config, key_indexes, args.qps_share)
+
+    if args.status:
+        worker.show_status()
+        return 0
+    return 0 if worker.run(wait=args.wait) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+阅读数据获取失败重试队列
+=====================
+
+临时性错误（-1 QPS超限、107 解析失败请重试、50000 内部错误、超时和网络异常）
+不在当场阻塞重试，而是写入 fx_reading_retry_queue 并按错误码计算下次重试时间：
+
+    下次重试时间 = 失败时间 + min(基础间隔 × 2^(已失败次数-1), 最大间隔)
+
+刷新流水线在处理完本次的文章后取出已到期的条目重试，未到期的留给下次运行；
+失败次数超过 max_retries 的条目标记为 exhausted，保留在表中便于排查，不会被静默丢弃。
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+from article_selection import ARTICLE_COLUMNS
+from spider.log.utils import logger
+
+# 各错误码的基础重试间隔（秒）
+DEFAULT_BACKOFF_SECONDS = {
+    '-1': 5,            # QPS超过上限，接口要求5秒后再试
+    '107': 60,          # 解析失败，请重试
+    '50000': 120,       # 内部服务器错误
+    'timeout': 60,
+    'network': 60,
+    'invalid_json': 120,
+    'default': 300
+}
+
+# 最大重试间隔（秒）
+MAX_BACKOFF_SECONDS = 6 * 3600
+
+
+class RetryQueue:
+    """阅读数据获取失败重试队列"""
+
+    def __init__(self, db, max_retries: int = 3, backoff_seconds: Dict = None):
+        """
+        初始化重试队列
+
+        Args:
+            db: DatabaseManager 实例（由调用方负责连接）
+            max_retries: 最大重试次数（超过后标记为 exhausted）
+            backoff_seconds: 各错误码的基础重试间隔（秒），覆盖默认值
+        """
+        self.db = db
+        self.max_retries = max_retries
+        self.backoff_seconds = dict(DEFAULT_BACKOFF_SECONDS)
+        self.backoff_seconds.update({str(k): v for k, v in (backoff_seconds or {}).items()})
+        self.queued_ids: Optional[Set[str]] = None  # 队列中的文章ID（首次使用时加载）
+
+    @staticmethod
+    def is_transient(code) -> bool:
+        """判断错误码是否为可重试的临时性错误"""
+        # 用到时才导入（dsf_api_client 会加载 requests，只查询统计的命令不需要）
+        from dsf_api_client import TRANSIENT_ERROR_CODES
+        return str(code) in TRANSIENT_ERROR_CODES
+
+    def get_delay(self, code, attempts: int) -> int:
+        """
+        计算下次重试前的等待时间
+
+        Args:
+            code: 错误码
+            attempts: 已失败次数（含本次）
+
+        Returns:
+            int: 等待秒数
+        """
+        base = self.backoff_seconds.get(str(code), self.backoff_seconds['default'])
+        return int(min(base * 2 ** max(attempts - 1, 0), MAX_BACKOFF_SECONDS))
+
+    def _load_queued_ids(self) -> Set[str]:
+        """加载队列中的文章ID"""
+        if self.queued_ids is None:
+            self.queued_ids = set()
+            try:
+                with self.db.connection.cursor() as cursor:
+                    cursor.execute("SELECT article_id FROM fx_reading_retry_queue")
+                    self.queued_ids = {row['article_id'] for row in cursor.fetchall()}
+            except Exception as e:
+                logger.warning(f"加载重试队列时出错: {e}")
+        return self.queued_ids
+
+    def push(self, article: Dict, code, error_msg: str = None) -> bool:
+        """
+        记录一次失败，临时性错误加入重试队列
+
+        Args:
+            article: 文章信息字典
+            code: 错误码
+            error_msg: 错误信息
+
+        Returns:
+            bool: 已安排重试返回True；不可重试或已达最大重试次数返回False
+        """
+        if not self.is_transient(code):
+            return False
+
+        article_id = article['article_id']
+        now = datetime.now().replace(microsecond=0)
+
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT attempts FROM fx_reading_retry_queue WHERE article_id = %s",
+                    (article_id,)
+                )
+                row = cursor.fetchone()
+                attempts = (row['attempts'] if row else 0) + 1
+                status = 'pending' if attempts <= self.max_retries else 'exhausted'
+                next_retry_at = now + timedelta(seconds=self.get_delay(code, attempts))
+
+                cursor.execute(
+                    """
+                    INSERT INTO fx_reading_retry_queue
+                        (article_id, error_code, error_msg, attempts, status,
+                         next_retry_at, first_failed_at, last_failed_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        error_code = VALUES(error_code),
+                        error_msg = VALUES(error_msg),
+                        attempts = VALUES(attempts),
+                        status = VALUES(status),
+                        next_retry_at = VALUES(next_retry_at),
+                        last_failed_at = VALUES(last_failed_at)
+                    """,
+                    (article_id, str(code), (error_msg or '')[:255], attempts, status,
+                     next_retry_at, now, now)
+                )
+            self.db.connection.commit()
+            self._load_queued_ids().add(article_id)
+
+            if status == 'exhausted':
+                logger.error(f"文章 {article_id} 已连续失败 {attempts} 次 (错误码 {code})，停止自动重试")
+                return False
+
+            logger.info(f"文章 {article_id} 加入重试队列: 错误码 {code}，第 {attempts} 次失败，"
+                        f"{next_retry_at.strftime('%H:%M:%S')} 后重试")
+            return True
+
+        except Exception as e:
+            logger.error(f"写入重试队列时出错: {e}")
+            try:
+                self.db.connection.rollback()
+            except Exception:
+                pass
+            return False
+
+    def discard(self, article_id: str):
+        """
+        获取成功后从队列中移除（只有在队列中的文章才会产生写入）
+
+        Args:
+            article_id: 文章ID
+        """
+        queued_ids = self._load_queued_ids()
+        if article_id not in queued_ids:
+            return
+
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute("DELETE FROM fx_reading_retry_queue WHERE article_id = %s", (article_id,))
+            self.db.connection.commit()
+            queued_ids.discard(article_id)
+        except Exception as e:
+            logger.warning(f"从重试队列移除文章 {article_id} 时出错: {e}")
+
+    def get_due(self, limit: int = 500) -> List[Dict]:
+        """
+        获取已到重试时间的文章
+
+        Args:
+            limit: 最多返回的数量
+
+        Returns:
+            List[Dict]: 文章信息列表（字段与选择查询一致）
+        """
+        if not self.db.ensure_connection():
+            return []
+
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT {', '.join(ARTICLE_COLUMNS)}, q.error_code AS retry_error_code
+                    FROM fx_reading_retry_queue q
+                    INNER JOIN fx_article_records ar ON ar.article_id = q.article_id
+                    WHERE q.status = 'pending' AND q.next_retry_at <= %s
+                    ORDER BY q.next_retry_at
+                    LIMIT %s
+                    """,
+                    (datetime.now(), limit)
+                )
+                return list(cursor.fetchall())
+        except Exception as e:
+            logger.error(f"查询到期的重试条目时出错: {e}")
+            return []
+
+    def get_status(self) -> Dict[str, int]:
+        """
+        获取队列状态
+
+        Returns:
+            Dict[str, int]: {'pending', 'due', 'exhausted'}
+        """
+        if not self.db.ensure_connection():
+            return {}
+
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT
+                        COALESCE(SUM(status = 'pending'), 0) AS pending,
+                        COALESCE(SUM(status = 'pending' AND next_retry_at <= %s), 0) AS due,
+                        COALESCE(SUM(status = 'exhausted'), 0) AS exhausted
+                    FROM fx_reading_retry_queue
+                    """,
+                    (datetime.now(),)
+                )
+                row = cursor.fetchone()
+                return {key: int(value) for key, value in row.items()}
+        except Exception as e:
+            logger.error(f"查询重试队列状态时出错: {e}")
+            return {}
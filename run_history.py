@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+运行耗时历史
+==========
+
+每次爬取和阅读数据刷新结束后，把分阶段耗时、计数、错误码和有效速率写入 fx_run_history：
+
+- 爬虫：登录、搜索公众号（fakeid）、文章列表分页、全文获取、正文提取、去重查询、写入数据库
+- 刷新：选择查询（或领取任务）、API调用、批量写入
+- 每个阶段记录累计秒数、次数和字节数；并发执行的阶段（API调用）累计秒数可以超过总耗时
+- 有效速率 = 处理数量 / 总耗时
+
+报告把一次运行与同类型之前若干次运行的中位数对比，找出变慢的阶段。
+记录的同时更新进程内的运行指标（run_stage_seconds 等，见 metrics.py），运行中即可由 Prometheus 采集。
+
+使用示例：
+    python run_history.py
+    python run_history.py --kind crawl
+    python run_history.py --kind refresh --run 123 --window 20
+    python run_history.py --kind refresh --list
+"""
+
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+from pathlib import Path
+from statistics import median
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from metrics import RUN_ERRORS, RUN_EVENTS, STAGE_BYTES, STAGE_SECONDS
+from spider.log.utils import logger
+
+# 运行历史保留天数
+HISTORY_RETENTION_DAYS = 180
+
+# 报告中的阶段名称
+STAGE_LABELS = {
+    'login': '登录',
+    'search': '搜索公众号',
+    'list_page': '文章列表分页',
+    'body_fetch': '全文获取',
+    'extract': '正文提取',
+    'db_check': '去重查询',
+    'db_write': '写入数据库',
+    'select': '选择查询/领取任务',
+    'api': 'API调用',
+}
+
+
+class RunRecorder:
+    """一次运行的分阶段耗时和计数（线程安全）"""
+
+    def __init__(self, kind: str):
+        """
+        初始化记录器
+
+        Args:
+            kind: 运行类型（crawl 爬虫、refresh 统一刷新、article 常规更新、theme 主题更新、worker 刷新工作进程）
+        """
+        self.kind = kind
+        self.status = 'failed'  # 调用方在运行成功后改为 success
+        self.started_at = datetime.now().replace(microsecond=0)
+        self._started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.stages: Dict[str, Dict] = {}
+        self.counts: Dict[str, int] = {}
+        self.error_codes: Dict[str, int] = {}
+
+    def add(self, stage: str, seconds: float = 0.0, count: int = 1, size: int = 0):
+        """
+        累计一个阶段的耗时
+
+        Args:
+            stage: 阶段名称
+            seconds: 耗时（秒）
+            count: 次数
+            size: 字节数
+        """
+        with self.lock:
+            totals = self.stages.setdefault(stage, {'seconds': 0.0, 'count': 0, 'bytes': 0})
+            totals['seconds'] += seconds
+            totals['count'] += count
+            totals['bytes'] += size
+        if count:
+            STAGE_SECONDS.observe(seconds / count, kind=self.kind, stage=stage)
+        if size:
+            STAGE_BYTES.inc(size, kind=self.kind, stage=stage)
+
+    @contextmanager
+    def stage(self, name: str):
+        """计时一次阶段执行（with 语句）"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def timed_iter(self, stage: str, items: Iterable) -> Iterator:
+        """
+        逐条返回 items，每次取下一条（如分页查询）的耗时计入阶段
+
+        Args:
+            stage: 阶段名称
+            items: 列表或生成器
+
+        Yields:
+            items 中的元素
+        """
+        items = iter(items)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(items)
+            except StopIteration:
+                self.add(stage, time.perf_counter() - started, count=0)
+                return
+            self.add(stage, time.perf_counter() - started)
+            yield item
+
+    def count(self, name: str, n: int = 1):
+        """累计一项计数"""
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + n
+        RUN_EVENTS.inc(n, kind=self.kind, name=name)
+
+    def error(self, code):
+        """记录一次错误码"""
+        with self.lock:
+            self.error_codes[str(code)] = self.error_codes.get(str(code), 0) + 1
+        RUN_ERRORS.inc(kind=self.kind, code=str(code))
+
+    def save(self, db, items: int = None) -> Optional[int]:
+        """
+        写入运行历史（出错时只记录日志）
+
+        Args:
+            db: DatabaseManager 实例
+            items: 处理数量（计算有效速率），默认取计数 items
+
+        Returns:
+            Optional[int]: 记录ID，写入失败返回None
+        """
+        duration = time.perf_counter() - self._started
+        items = items if items is not None else self.counts.get('items', 0)
+        rate = items / duration if duration > 0 else 0.0
+        stages = {name: {'seconds': round(totals['seconds'], 3), 'count': totals['count'], 'bytes': totals['bytes']}
+                  for name, totals in self.stages.items()}
+
+        if not db.ensure_connection():
+            logger.warning("数据库连接失败，本次运行历史未记录")
+            return None
+
+        try:
+            with db.connection.cursor() as cursor:
+                cursor.execute(
+                    "DELETE FROM fx_run_history WHERE started_at < %s",
+                    (self.started_at - timedelta(days=HISTORY_RETENTION_DAYS),)
+                )
+                cursor.execute(
+                    """
+                    INSERT INTO fx_run_history
+                        (kind, host, status, started_at, finished_at, duration_seconds, items, rate,
+                         stages, counts, error_codes)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    """,
+                    (self.kind, socket.gethostname(), self.status, self.started_at,
+                     datetime.now().replace(microsecond=0), round(duration, 2), items, round(rate, 3),
+                     json.dumps(stages, ensure_ascii=False), json.dumps(self.counts, ensure_ascii=False),
+                     json.dumps(self.error_codes, ensure_ascii=False))
+                )
+                run_id = cursor.lastrowid
+            db.connection.commit()
+            logger.info(f"⏱️ 运行历史已记录 (ID {run_id})：耗时 {duration:.1f} 秒，处理 {items}，"
+                        f"有效速率 {rate:.2f}/秒")
+            return run_id
+        except Exception as e:
+            logger.warning(f"记录运行历史时出错: {e}")
+            return None
+
+
+def load_runs(db, kind: str = None, before_id: int = None, limit: int = 10) -> List[Dict]:
+    """
+    查询运行历史（按开始时间倒序）
+
+    Args:
+        db: DatabaseManager 实例
+        kind: 运行类型，为空时不限
+        before_id: 只返回ID小于该值的记录
+        limit: 最多返回的数量
+
+    Returns:
+        List[Dict]: 运行记录，stages/counts/error_codes 已解析
+    """
+    where, params = [], []
+    if kind:
+        where.append("kind = %s")
+        params.append(kind)
+    if before_id:
+        where.append("id < %s")
+        params.append(before_id)
+
+    with db.connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT * FROM fx_run_history {'WHERE ' + ' AND '.join(where) if where else ''} "
+            f"ORDER BY started_at DESC, id DESC LIMIT %s",
+            params + [limit]
+        )
+        return [_parse_run(run) for run in cursor.fetchall()]
+
+
+def _parse_run(run: Dict) -> Dict:
+    """解析运行记录中的JSON列"""
+    for column in ('stages', 'counts', 'error_codes'):
+        run[column] = json.loads(run[column] or '{}')
+    return run
+
+
+def compare_with_median(run: Dict, baseline: List[Dict]) -> List[Dict]:
+    """
+    把一次运行的各项指标与基线运行的中位数对比
+
+    Args:
+        run: 运行记录
+        baseline: 基线运行记录
+
+    Returns:
+        List[Dict]: [{'label', 'value', 'median', 'ratio', 'higher_is_better'}]，没有基线数据时 median/ratio 为None
+    """
+    def metric(label, getter, higher_is_better=False):
+        value = getter(run)
+        values = [v for v in (getter(other) for other in baseline) if v is not None]
+        mid = median(values) if values else None
+        ratio = value / mid if value is not None and mid else None
+        return {'label': label, 'value': value, 'median': mid, 'ratio': ratio, 'higher_is_better': higher_is_better}
+
+    def per_call_ms(name):
+        def getter(r):
+            totals = r['stages'].get(name)
+            return totals['seconds'] * 1000 / totals['count'] if totals and totals['count'] else None
+        return getter
+
+    metrics = [
+        metric('总耗时（秒）', lambda r: float(r['duration_seconds'])),
+        metric('处理数量', lambda r: r['items'], higher_is_better=True),
+        metric('有效速率（/秒）', lambda r: float(r['rate']), higher_is_better=True),
+    ]
+    stage_names = list(run['stages']) + [name for other in baseline for name in other['stages']
+                                         if name not in run['stages']]
+    for name in dict.fromkeys(stage_names):
+        label = STAGE_LABELS.get(name, name)
+        metrics.append(metric(f"{label} 累计（秒）", lambda r, n=name: r['stages'].get(n, {}).get('seconds')))
+        metrics.append(metric(f"{label} 平均（毫秒/次）", per_call_ms(name)))
+    return metrics
+
+
+def print_report(db, kind: str = None, run_id: int = None, window: int = 10, threshold: float = 1.5) -> bool:
+    """
+    打印一次运行与之前 window 次同类型运行中位数的对比
+
+    Args:
+        db: DatabaseManager 实例
+        kind: 运行类型，为空时取最近一次运行的类型
+        run_id: 运行ID，为空时取最近一次运行
+        window: 基线运行次数
+        threshold: 比中位数差多少倍时标记为变慢
+
+    Returns:
+        bool: 找到运行记录返回True
+    """
+    if run_id:
+        with db.connection.cursor() as cursor:
+            cursor.execute("SELECT * FROM fx_run_history WHERE id = %s", (run_id,))
+            row = cursor.fetchone()
+        if not row:
+            logger.error(f"运行记录 {run_id} 不存在")
+            return False
+        run = _parse_run(row)
+    else:
+        runs = load_runs(db, kind, limit=1)
+        if not runs:
+            logger.error("没有运行记录")
+            return False
+        run = runs[0]
+
+    baseline = [other for other in load_runs(db, run['kind'], run['id'], window) if other['status'] == 'success']
+
+    print("\n" + "=" * 90)
+    print(f"⏱️ 运行 {run['id']}（{run['kind']}，{run['host']}，{run['status']}）开始于 {run['started_at']}，"
+          f"对比之前 {len(baseline)} 次成功运行的中位数")
+    print("=" * 90)
+    print(f"{'指标':<28}{'本次':>14}{'中位数':>14}{'比值':>10}")
+    for item in compare_with_median(run, baseline):
+        if item['value'] is None:
+            continue
+        ratio = item['ratio']
+        slower = ratio is not None and (ratio < 1 / threshold if item['higher_is_better'] else ratio > threshold)
+        print(f"{item['label']:<28}{item['value']:>14.2f}"
+              f"{item['median'] if item['median'] is not None else float('nan'):>14.2f}"
+              f"{(f'{ratio:.2f}x' if ratio is not None else '-'):>10}"
+              + ("  ⚠️ 变慢" if slower else ""))
+    if run['counts']:
+        print(f"计数: {run['counts']}")
+    if run['error_codes']:
+        print(f"错误码: {run['error_codes']}")
+    print("=" * 90)
+    return True
+
+
+def print_runs(db, kind: str = None, limit: int = 20):
+    """列出最近的运行"""
+    print("\n" + "=" * 90)
+    print(f"{'ID':<8}{'类型':<10}{'状态':<10}{'开始时间':<22}{'耗时(秒)':>10}{'数量':>8}{'速率/秒':>10}")
+    for run in load_runs(db, kind, limit=limit):
+        print(f"{run['id']:<8}{run['kind']:<10}{run['status']:<10}{str(run['started_at']):<22}"
+              f"{float(run['duration_seconds']):>10.1f}{run['items']:>8}{float(run['rate']):>10.2f}")
+    print("=" * 90)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(
+        description="运行耗时历史报告",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("使用示例：")[1]
+    )
+    parser.add_argument("--config", default="reading_updater_config.json", help="配置文件路径（读取数据库连接）")
+    parser.add_argument("--kind", help="运行类型（crawl、refresh、article、theme、worker）")
+    parser.add_argument("--run", type=int, help="运行ID，默认最近一次")
+    parser.add_argument("--window", type=int, default=10, help="基线运行次数")
+    parser.add_argument("--threshold", type=float, default=1.5, help="比中位数差多少倍时标记为变慢")
+    parser.add_argument("--list", action="store_true", help="列出最近的运行")
+    args = parser.parse_args()
+
+    from database import DatabaseManager
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        db_config = json.load(f).get('database', {})
+    db = DatabaseManager(
+        host=db_config.get('host', '127.0.0.1'),
+        port=db_config.get('port', 3306),
+        user=db_config.get('user', 'root'),
+        password=db_config.get('password', '123456'),
+        database=db_config.get('database', 'faxuan')
+    )
+    if not db.connect():
+        logger.error("数据库连接失败")
+        return 1
+
+    try:
+        if args.list:
+            print_runs(db, args.kind)
+            return 0
+        return 0 if print_report(db, args.kind, args.run, args.window, args.threshold) else 1
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
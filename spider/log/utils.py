@@ -6,19 +6,19 @@
 ===========
 
 提供统一的日志记录功能
+
+日志文件在第一条日志写入时才创建（连同 logs 目录），
+导入本模块不会创建文件，只输出到控制台的命令（如 --help）不产生磁盘操作。
 """
 
 from loguru import logger
 import sys
-import os
 
 # 配置日志格式
 LOG_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
 
-# 创建日志目录
+# 日志目录（写入第一条日志时自动创建）
 log_dir = "logs"
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
 
 # 配置日志输出
 logger.remove()  # 移除默认的日志处理器
@@ -39,7 +39,8 @@ logger.add(
     rotation="10 MB",  # 当文件超过10MB时自动轮转到新文件
     retention="30 days",  # 保留7天的日志文件
     compression="zip",  # 压缩旧日志文件节省空间
-    encoding="utf-8"
+    encoding="utf-8",
+    delay=True  # 第一条日志写入时才打开文件
 )
 
 # 导出logger供其他模块使用
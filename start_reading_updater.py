@@ -6,6 +6,8 @@
 ==================
 
 统一入口脚本，提供多种运行模式
+
+各模式用到的模块在执行该模式时才导入，--stats、--check-theme 等查询命令不加载调度器和API客户端
 """
 
 import sys
@@ -18,9 +20,6 @@ from datetime import datetime, timedelta
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from article_reading_updater import ArticleReadingUpdater
-from reading_update_scheduler import ReadingUpdateScheduler
-from theme_reading_updater import ThemeReadingUpdater
 from spider.log.utils import logger
 
 
@@ -37,6 +36,7 @@ def run_immediate_update(config_file: str, days: int = None):
     """立即执行更新任务"""
     logger.info("🚀 立即执行模式")
     
+    from article_reading_updater import ArticleReadingUpdater
     updater = ArticleReadingUpdater(config_file)
     
     if days:
@@ -58,6 +58,7 @@ def run_scheduler(config_file: str, hour: int = 18, minute: int = 30):
     """运行定时调度器"""
     logger.info("⏰ 定时调度器模式")
     
+    from reading_update_scheduler import ReadingUpdateScheduler
     scheduler = ReadingUpdateScheduler(config_file)
     
     try:
@@ -75,6 +76,7 @@ def show_statistics(config_file: str, days: int = 7):
     """显示统计信息"""
     logger.info("📊 统计信息模式")
     
+    from article_reading_updater import ArticleReadingUpdater
     updater = ArticleReadingUpdater(config_file)
     stats = updater.get_update_statistics(days)
     
@@ -144,6 +146,7 @@ def check_theme_end(config_file: str):
     """检查明天是否有法律主题结束"""
     logger.info("🎯 法律主题检查模式")
     
+    from theme_reading_updater import ThemeReadingUpdater
     updater = ThemeReadingUpdater(config_file)
     
     if not updater.db.connect():
@@ -189,6 +192,7 @@ def run_theme_update(config_file: str, theme_id: int = None):
     """执行法律主题阅读量更新"""
     logger.info("🎯 法律主题更新模式")
     
+    from theme_reading_updater import ThemeReadingUpdater
     updater = ThemeReadingUpdater(config_file)
     
     if theme_id:
@@ -208,6 +212,7 @@ def list_themes(config_file: str):
     """列出所有活动的法律主题"""
     logger.info("📋 法律主题列表模式")
     
+    from theme_reading_updater import ThemeReadingUpdater
     updater = ThemeReadingUpdater(config_file)
     themes = updater.list_active_themes()
     
@@ -241,6 +246,7 @@ def dry_run(config_file: str, days: int = None):
     """试运行模式"""
     logger.info("🔍 试运行模式 - 只查询不更新")
     
+    from article_reading_updater import ArticleReadingUpdater
     updater = ArticleReadingUpdater(config_file)
     
     if not updater.db.connect():
@@ -248,42 +254,25 @@ def dry_run(config_file: str, days: int = None):
         return 1
     
     try:
-        # 第一步：获取近N天阅读量为空的文章
-        logger.info("\n" + "="*50)
-        logger.info("📝 第一步：查询近7天内阅读量为空的文章")
-        logger.info("="*50)
-        empty_articles = updater.get_articles_need_update(days, only_empty=True)
-        
-        # 第二步：获取前6天的文章
-        six_days_ago = datetime.now() - timedelta(days=6)
-        logger.info("\n" + "="*50)
-        logger.info(f"📅 第二步：查询往前推6天的文章 (发布日期: {six_days_ago.strftime('%Y-%m-%d')})")
-        logger.info("="*50)
-        six_days_ago_articles = updater.get_articles_for_specific_day(six_days_ago)
-        
-        # 合并并去重
-        all_articles = empty_articles.copy() if empty_articles else []
-        existing_article_ids = {article['article_id'] for article in all_articles}
-        
-        additional_count = 0
-        for article in six_days_ago_articles:
-            if article['article_id'] not in existing_article_ids:
-                all_articles.append(article)
-                existing_article_ids.add(article['article_id'])
-                additional_count += 1
+        # 按刷新时间表查询：近N天阅读量为空 + 发布后第1/3/6天
+        if days:
+            updater.schedule.days_to_check = days
+        rules = updater.schedule.build_rules()
+        all_articles = list(updater.iter_work_set(rules))
+        fresh_skipped = updater.count_fresh_skipped(rules)
         
         if not all_articles:
-            logger.info("\n没有需要更新的文章")
+            logger.info(f"\n没有需要更新的文章 (近期已刷新跳过 {fresh_skipped} 篇)")
             return 0
         
         logger.info("\n" + "="*50)
         logger.info("📊 更新任务汇总")
         logger.info("="*50)
-        logger.info(f"近{days if days else updater.days_to_check}天阅读量为空: {len(empty_articles)} 篇")
-        logger.info(f"往前推6天({six_days_ago.strftime('%Y-%m-%d')}): {len(six_days_ago_articles)} 篇")
+        for rule in rules:
+            matched = sum(1 for article in all_articles if rule['name'] in article['rules'])
+            logger.info(f"{rule['label']}: {matched} 篇")
         logger.info(f"去重后实际需要更新: {len(all_articles)} 篇")
-        logger.info(f"  - 其中来自近7天为空: {len(empty_articles)} 篇")
-        logger.info(f"  - 其中来自前6天额外: {additional_count} 篇")
+        logger.info(f"近期已刷新跳过: {fresh_skipped} 篇")
         logger.info("")
         
         # 显示前10篇文章信息
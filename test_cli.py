@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""统一命令行入口测试：查询命令的导入耗时回归检查"""
+
+import pytest
+
+from cli import COMMANDS, HEAVY_MODULES, IMPORT_BUDGET_MS, measure_import
+
+QUERY_COMMANDS = [name for name, command in COMMANDS.items() if command[3]]
+
+
+@pytest.mark.parametrize("name", QUERY_COMMANDS)
+def test_query_command_imports_stay_light(name):
+    elapsed_ms, modules = measure_import(name)
+    heavy = sorted({module.split('.')[0] for module in modules} & set(HEAVY_MODULES))
+    assert not heavy, f"{name} 导入了重量级模块: {heavy}"
+    assert elapsed_ms <= IMPORT_BUDGET_MS
+
+
+def test_measure_import_includes_command_module():
+    _, modules = measure_import('stats')
+    assert 'start_reading_updater' in modules
+    assert 'article_reading_updater' in modules
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""第三方API客户端测试：令牌桶限流和熔断器"""
+
+import pytest
+
+import dsf_api_client
+from dsf_api_client import CircuitBreaker, DSFFatalError, TokenBucket
+
+
+class FakeClock:
+    """代替 time 模块：sleep 只推进时间"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(dsf_api_client, 'time', clock)
+    return clock
+
+
+def test_token_bucket_spaces_requests_at_rate(clock):
+    bucket = TokenBucket(rate=4)
+    for _ in range(5):
+        bucket.acquire()
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_token_bucket_allows_burst_up_to_capacity(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.now == 0
+    bucket.acquire()
+    assert clock.now == pytest.approx(0.5)
+
+
+def test_token_bucket_refills_while_idle(clock):
+    bucket = TokenBucket(rate=1, capacity=2)
+    bucket.acquire()
+    bucket.acquire()
+    clock.sleep(10)
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.now == pytest.approx(10)
+
+
+def test_breaker_opens_after_transient_failures_and_probes(clock):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=30)
+    breaker.record_failure('timeout')
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure('timeout')
+    assert breaker.state == CircuitBreaker.OPEN
+
+    breaker.before_request()
+    assert clock.now == pytest.approx(30)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_ignores_late_responses_while_open(clock):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=30)
+    breaker.record_failure('timeout')
+    breaker.record_failure('timeout')
+    # 断开前发出的请求陆续返回，不应结束冷却
+    breaker.record_failure('101')
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    breaker.before_request()
+    assert clock.now == pytest.approx(30)
+    breaker.record_failure('101')
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_fatal_error_alerts_once_until_reset(clock):
+    alerts = []
+    breaker = CircuitBreaker(on_fatal=lambda code, message: alerts.append(code))
+    breaker.record_failure('20001', '余额不足')
+    breaker.record_failure('20001', '余额不足')
+    assert alerts == ['20001']
+    with pytest.raises(DSFFatalError):
+        breaker.before_request()
+
+    breaker.reset()
+    breaker.before_request()
+    assert breaker.fatal is None
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""统一任务调度器测试：cron 解析、触发时间、补跑和依赖等待"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from job_scheduler import CronExpression, JobScheduler
+
+
+def test_cron_parses_steps_ranges_and_lists():
+    cron = CronExpression("*/15 1-3,22 * * 1-5")
+    assert cron.minutes == {0, 15, 30, 45}
+    assert cron.hours == {1, 2, 3, 22}
+    assert cron.weekdays == {1, 2, 3, 4, 5}
+
+
+def test_cron_sunday_is_zero_or_seven():
+    assert CronExpression("0 0 * * 7").weekdays == {0}
+    assert CronExpression("0 0 * * 0").weekdays == {0}
+
+
+def test_cron_value_with_step_runs_to_end_of_range():
+    assert CronExpression("0 20/2 * * *").hours == {20, 22}
+
+
+@pytest.mark.parametrize("expression", ["0 6 * *", "60 6 * * *", "0 5-3 * * *", "0 24 * * *"])
+def test_cron_rejects_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+def test_cron_latest_before_and_next_after():
+    cron = CronExpression("30 6 * * *")
+    moment = datetime(2024, 5, 10, 6, 30, 45)
+    assert cron.latest_before(moment) == datetime(2024, 5, 10, 6, 30)
+    assert cron.next_after(moment) == datetime(2024, 5, 11, 6, 30)
+    assert cron.latest_before(datetime(2024, 5, 10, 6, 29)) == datetime(2024, 5, 9, 6, 30)
+
+
+def test_cron_day_and_weekday_match_either():
+    # 每月1日或每个周一（2024-05-06 是周一）
+    cron = CronExpression("0 0 1 * 1")
+    assert cron.next_after(datetime(2024, 5, 1, 12, 0)) == datetime(2024, 5, 6, 0, 0)
+    assert cron.next_after(datetime(2024, 5, 27, 12, 0)) == datetime(2024, 6, 1, 0, 0)
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    config = {
+        "state_file": str(tmp_path / "state.json"),
+        "catch_up_hours": 24,
+        "jobs": {
+            "crawl": {"cron": "0 1 * * *"},
+            "reading_refresh": {"cron": "0 6 * * *", "after": ["crawl"], "max_wait_hours": 6}
+        }
+    }
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(config), encoding='utf-8')
+    return JobScheduler(str(config_file))
+
+
+def test_first_start_waits_for_next_slot(scheduler):
+    now = datetime(2024, 5, 10, 7, 0)
+    assert scheduler._due_slot(scheduler.jobs['crawl'], now) is None
+    assert scheduler.state['crawl']['last_slot'] == datetime(2024, 5, 10, 1, 0).isoformat()
+
+
+def test_missed_slot_is_caught_up_once(scheduler):
+    scheduler.state['crawl'] = {'last_slot': datetime(2024, 5, 8, 1, 0).isoformat(), 'status': 'success'}
+    # 错过了 5-09 和 5-10 两次，只补跑最近一次
+    assert scheduler._due_slot(scheduler.jobs['crawl'], datetime(2024, 5, 10, 7, 0)) == datetime(2024, 5, 10, 1, 0)
+
+
+def test_slot_older_than_catch_up_window_is_missed(scheduler):
+    scheduler.catch_up_hours = 4
+    scheduler.state['crawl'] = {'last_slot': datetime(2024, 5, 9, 1, 0).isoformat(), 'status': 'success'}
+    assert scheduler._due_slot(scheduler.jobs['crawl'], datetime(2024, 5, 10, 7, 0)) is None
+    assert scheduler.state['crawl']['status'] == 'missed'
+    assert scheduler.state['crawl']['last_slot'] == datetime(2024, 5, 10, 1, 0).isoformat()
+
+
+def test_dependency_wait(scheduler):
+    job = scheduler.jobs['reading_refresh']
+    slot = datetime(2024, 5, 10, 6, 0)
+    scheduler.state['crawl'] = {'last_slot': datetime(2024, 5, 9, 1, 0).isoformat(), 'status': 'success'}
+
+    # 今天的爬虫还没完成
+    assert not scheduler._dependencies_ready(job, slot, slot + timedelta(minutes=5))
+    # 超过 max_wait_hours 后不再等待
+    assert scheduler._dependencies_ready(job, slot, slot + timedelta(hours=6, minutes=1))
+
+    scheduler.state['crawl']['last_slot'] = datetime(2024, 5, 10, 1, 0).isoformat()
+    assert scheduler._dependencies_ready(job, slot, slot + timedelta(minutes=5))
+
+    scheduler.jobs['crawl'].running = True
+    assert not scheduler._dependencies_ready(job, slot, slot + timedelta(minutes=5))
+
+
+def test_disabled_dependency_is_ignored(scheduler):
+    scheduler.jobs['crawl'].enabled = False
+    scheduler.state['crawl'] = {'last_slot': datetime(2024, 5, 9, 1, 0).isoformat(), 'status': 'success'}
+    slot = datetime(2024, 5, 10, 6, 0)
+    assert scheduler._dependencies_ready(scheduler.jobs['reading_refresh'], slot, slot)
+
+
+def test_failed_run_is_retried_and_blocks_dependents(scheduler):
+    crawl = scheduler.jobs['crawl']
+    crawl.runner = lambda: False
+    slot = datetime(2024, 5, 10, 1, 0)
+    scheduler.state['crawl'] = {'last_slot': datetime(2024, 5, 9, 1, 0).isoformat(), 'status': 'success'}
+
+    assert not scheduler._execute(crawl, slot)
+    assert scheduler.state['crawl']['status'] == 'failed'
+    assert scheduler.state['crawl']['last_slot'] == datetime(2024, 5, 9, 1, 0).isoformat()
+
+    # 重试时间之前不执行，之后再次到期
+    retry_at = datetime.fromisoformat(scheduler.state['crawl']['retry_at'])
+    scheduler.catch_up_hours = 24 * 365 * 10
+    assert scheduler._due_slot(crawl, retry_at - timedelta(minutes=1)) is None
+    assert scheduler._due_slot(crawl, retry_at) is not None
+
+    # 依赖失败任务的刷新在重试期间继续等待
+    refresh_slot = datetime(2024, 5, 10, 6, 0)
+    assert not scheduler._dependencies_ready(scheduler.jobs['reading_refresh'], refresh_slot, refresh_slot)
+
+    crawl.runner = lambda: True
+    assert scheduler._execute(crawl, slot)
+    assert 'retry_at' not in scheduler.state['crawl']
+    assert scheduler._dependencies_ready(scheduler.jobs['reading_refresh'], refresh_slot, refresh_slot)
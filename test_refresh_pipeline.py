@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""刷新流水线测试：提前停止时的断点状态、刷新预算"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from budget_planner import RefreshBudget
+from refresh_pipeline import RefreshPipeline
+
+
+class FakeApiClient:
+    """逐条返回成功结果（按顺序消费文章，便于检查停止时机），每次调用计费 0.01 元"""
+
+    def __init__(self):
+        self.total_calls = 0
+        self.paid_calls = 0
+        self.total_cost_money = 0.0
+        self.last_cost_money = None
+        self.remain_money = None
+
+    def iter_article_stats(self, articles, url_getter, max_workers):
+        for article in articles:
+            self.total_calls += 1
+            self.paid_calls += 1
+            self.total_cost_money += 0.01
+            self.last_cost_money = 0.01
+            yield article, {'success': True, 'stats': {'read': 1, 'looking': 0, 'zan': 0},
+                            'error': None, 'code': 0}
+
+
+class FakeWriter:
+    def __init__(self):
+        self.added = []
+
+    def add(self, article, stats):
+        self.added.append(article['article_id'])
+        return True
+
+    def flush(self):
+        return 0
+
+    def finish(self):
+        return {'written': len(self.added), 'unchanged': 0, 'failed': 0}
+
+
+class FakeCheckpoint:
+    def __init__(self):
+        self.writer = None
+        self.completed = []
+        self.status = 'running'
+
+    def track(self, articles):
+        return articles
+
+    def complete(self, article_id, success):
+        self.completed.append(article_id)
+
+    def flush(self):
+        pass
+
+    def finish(self, status='finished'):
+        self.status = status
+
+
+def articles(count):
+    return [{'article_id': str(i), 'article_url': f'https://example.com/{i}'} for i in range(count)]
+
+
+def run_pipeline(should_stop):
+    checkpoint = FakeCheckpoint()
+    pipeline = RefreshPipeline(FakeApiClient(), FakeWriter(), should_stop=should_stop, checkpoint=checkpoint)
+    return pipeline.run(articles(5)), checkpoint
+
+
+@pytest.mark.parametrize("reason, status", [('lease_lost', 'interrupted'), ('shutdown', 'interrupted'),
+                                            ('call_budget', 'finished')])
+def test_stop_reason_decides_checkpoint_status(reason, status):
+    calls = {'count': 0}
+
+    def should_stop():
+        calls['count'] += 1
+        return reason if calls['count'] > 2 else None
+
+    result, checkpoint = run_pipeline(should_stop)
+    assert result['total'] == 2
+    assert result['stopped'] == reason
+    assert result['resumable'] == (status == 'interrupted')
+    assert checkpoint.status == status
+
+
+def test_completed_run_is_finished():
+    result, checkpoint = run_pipeline(lambda: None)
+    assert result['total'] == 5
+    assert result['stopped'] is None
+    assert checkpoint.status == 'finished'
+
+
+def test_boolean_should_stop_is_not_resumable():
+    result, checkpoint = run_pipeline(lambda: True)
+    assert result['stopped'] == 'stopped'
+    assert checkpoint.status == 'finished'
+
+
+def test_budget_selects_most_valuable_articles_and_records_spend():
+    api_client = FakeApiClient()
+    # 数据库不可用时今日消费按0计，记录消费失败只记日志
+    budget = RefreshBudget(None, api_client, {'daily_calls': 2})
+    now = datetime.now()
+    candidates = [dict(article, publish_time=now - timedelta(days=int(article['article_id'])),
+                       view_count=1, likes=1, thumbs_count=1) for article in articles(5)]
+
+    writer = FakeWriter()
+    pipeline = RefreshPipeline(api_client, writer, budget=budget)
+    result = pipeline.run(candidates)
+
+    assert writer.added == ['0', '1']
+    assert (budget.candidates, budget.selected) == (5, 2)
+    assert result['stopped'] is None  # 选出的文章恰好用完预算，不算提前停止
+    assert pipeline.spend['paid_calls'] == 2
+
+
+def test_budget_stops_on_remain_money():
+    api_client = FakeApiClient()
+    api_client.remain_money = 1.0
+    budget = RefreshBudget(None, api_client, {'min_remain_money': 5})
+    result = RefreshPipeline(api_client, FakeWriter(), budget=budget).run(articles(5))
+    assert result['total'] == 0
+    assert result['stopped'] == 'remain_money'
+
+
+def test_worker_budget_stops_claimed_tasks_without_selecting():
+    api_client = FakeApiClient()
+    budget = RefreshBudget(None, api_client, {'daily_calls': 2}, source='worker:host:1')
+    writer = FakeWriter()
+    pipeline = RefreshPipeline(api_client, writer, budget=budget)
+    result = pipeline.run(articles(5), retry_due=False, select_budget=False)
+
+    # 领取的任务按原顺序处理，达到预算后停止（剩余任务放回队列）
+    assert writer.added == ['0', '1']
+    assert result['stopped'] == 'call_budget'
+    assert not result['resumable']
+    assert pipeline.spend['paid_calls'] == 2
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""阅读数据刷新时间表测试：规则生成和文章命中"""
+
+from datetime import date, datetime
+
+from refresh_schedule import RefreshSchedule
+
+NOW = datetime(2024, 5, 10, 6, 0)
+
+
+def article(publish_time, view_count=100, last_fetched_at=None):
+    return {'publish_time': publish_time, 'view_count': view_count, 'likes': 1, 'thumbs_count': 1,
+            'last_fetched_at': last_fetched_at}
+
+
+def test_rules_cover_horizon_days():
+    rules = RefreshSchedule({'refresh_schedule': {'horizons_days': [3, 1]}}).build_rules(NOW)
+    assert [rule['name'] for rule in rules] == ['empty', 'day_1', 'day_3']
+    day_3 = rules[2]
+    assert day_3['start'] == datetime(2024, 5, 7, 0, 0)
+    assert day_3['end'].date() == date(2024, 5, 7)
+    assert RefreshSchedule.window(rules) == (datetime(2024, 5, 3, 6, 0), NOW)
+
+
+def test_theme_rule_only_when_enabled():
+    theme = {'theme_name': '宪法', 'start_date': date(2024, 4, 1), 'end_date': date(2024, 5, 11)}
+    assert 'theme' in [rule['name'] for rule in RefreshSchedule({}).build_rules(NOW, theme)]
+    disabled = RefreshSchedule({'refresh_schedule': {'theme_end': False}})
+    assert 'theme' not in [rule['name'] for rule in disabled.build_rules(NOW, theme)]
+
+
+def test_match_rules_by_publish_day_and_empty_stats():
+    rules = RefreshSchedule({}).build_rules(NOW)
+    assert RefreshSchedule.match_rules(article(datetime(2024, 5, 9, 12, 0)), rules) == ['day_1']
+    assert RefreshSchedule.match_rules(article(datetime(2024, 5, 9, 12, 0), view_count=None), rules) == \
+        ['empty', 'day_1']
+    assert RefreshSchedule.match_rules(article(datetime(2024, 5, 8, 12, 0)), rules) == []
+
+
+def test_match_rules_skips_fresh_articles():
+    rules = RefreshSchedule({'freshness_hours': {'day_1': 12}}).build_rules(NOW)
+    published = datetime(2024, 5, 9, 12, 0)
+    assert RefreshSchedule.match_rules(article(published, last_fetched_at=datetime(2024, 5, 10, 1, 0)), rules) == []
+    assert RefreshSchedule.match_rules(article(published, last_fetched_at=datetime(2024, 5, 9, 13, 0)), rules) == \
+        ['day_1']
+
+
+def test_rules_condition_params_follow_placeholders():
+    rules = RefreshSchedule({'freshness_hours': {'default': 12}}).build_rules(NOW)
+    condition, params = RefreshSchedule.rules_condition(rules)
+    assert condition.count('%s') == len(params)
+    condition, params = RefreshSchedule.rules_condition(rules, with_freshness=False)
+    assert condition.count('%s') == len(params) == 2 * len(rules)
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""重试队列测试：重试间隔"""
+
+from retry_queue import MAX_BACKOFF_SECONDS, RetryQueue
+
+
+def test_delay_doubles_per_attempt():
+    queue = RetryQueue(db=None)
+    assert [queue.get_delay('107', attempts) for attempts in (1, 2, 3)] == [60, 120, 240]
+
+
+def test_unknown_code_uses_default_delay():
+    assert RetryQueue(db=None).get_delay('999', 1) == 300
+
+
+def test_configured_backoff_overrides_default():
+    queue = RetryQueue(db=None, backoff_seconds={-1: 10, 'default': 30})
+    assert queue.get_delay(-1, 2) == 20
+    assert queue.get_delay('unknown', 1) == 30
+
+
+def test_delay_is_capped():
+    assert RetryQueue(db=None).get_delay('default', 50) == MAX_BACKOFF_SECONDS
@@ -6,14 +6,25 @@
 ===================
 
 在法律主题日结束前一天，更新该主题期间(start_date到end_date)的普法文章阅读量
+
+主题期间的文章较多，每次运行的进度记录到 fx_refresh_run，
+被中断后可以用 --resume 运行ID 续跑剩余的文章（见 refresh_checkpoint.py）
 """
 
 import json
 import argparse
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from article_selection import count_fresh_articles, freshness_condition, get_fresh_since, iter_pufa_articles
+from budget_planner import RefreshBudget
 from database import DatabaseManager
-from dsf_api_client import DSFApiClient
+from job_lease import REFRESH_LEASE, JobLease
+from reading_stats_writer import ReadingStatsWriter
+from refresh_checkpoint import RefreshCheckpoint
+from retry_queue import RetryQueue
+from metrics import start_exporter
+from run_history import RunRecorder
+from unavailable_cache import UnavailableCache, unavailable_condition
 from spider.log.utils import logger
 
 
@@ -39,17 +50,41 @@ class ThemeReadingUpdater:
             database=self.config.get('database', {}).get('database', 'faxuan')
         )
         
-        # 初始化API客户端
-        api_config = self.config.get('api', {})
-        self.api_client = DSFApiClient(
-            api_key=api_config.get('key', ''),
-            verify_code=api_config.get('verify_code', ''),
-            base_url=api_config.get('base_url', 'https://www.dajiala.com')
-        )
+        # API客户端第一次使用时创建（见 api_client）
+        self._api_client = None
         
         # 配置参数
         self.batch_size = self.config.get('batch_size', 50)
         self.max_retries = self.config.get('max_retries', 3)
+        self.page_size = self.config.get('page_size', 500)
+        self.concurrency = self.config.get('concurrency', 5)
+        self.fresh_skipped = 0
+        self.lease = None  # 本次运行持有的刷新租约
+        self.history = None  # 本次运行的耗时记录
+    
+    @property
+    def api_client(self):
+        """第三方API客户端（第一次使用时创建，统计、检查等不调用API的命令不加载 requests）"""
+        if self._api_client is None:
+            from dsf_client_pool import create_api_client
+            self._api_client = create_api_client(self.config.get('api', {}))  # 配置了多个密钥时为客户端池
+        return self._api_client
+    
+    def find_interrupted_run(self) -> Optional[Dict]:
+        """
+        查找可以续跑的法律主题更新运行（resume_max_age_hours 小时内开始、被中断或致命错误中止）
+        
+        Returns:
+            Optional[Dict]: 运行记录，没有时返回None
+        """
+        if not self.db.connect():
+            logger.error("数据库连接失败")
+            return None
+        
+        try:
+            return RefreshCheckpoint(self.db, 'theme').find_interrupted(self.config.get('resume_max_age_hours', 24))
+        finally:
+            self.db.disconnect()
     
     def _load_config(self) -> Dict:
         """加载配置文件"""
@@ -78,11 +113,17 @@ class ThemeReadingUpdater:
             "api": {
                 "key": "your_api_key_here",
                 "verify_code": "",
-                "base_url": "https://www.dajiala.com"
+                "base_url": "https://www.dajiala.com",
+                "qps": 5
             },
             "batch_size": 50,
             "max_retries": 3,
-            "enabled": True
+            "page_size": 500,
+            "concurrency": 5,
+            "freshness_hours": {"default": 12},
+            "unavailable_recheck_days": 30,
+            "enabled": True,
+            "summary_max_age_minutes": 60
         }
     
     def get_upcoming_theme_end(self, check_date: datetime = None) -> Optional[Dict]:
@@ -140,9 +181,46 @@ class ThemeReadingUpdater:
             logger.error(f"查询法律主题时出错: {e}")
             return None
     
+    def iter_articles_in_theme_period(self, start_date: datetime, end_date: datetime) -> Iterator[Dict]:
+        """
+        逐页获取法律主题期间发布的普法文章
+        
+        Args:
+            start_date: 主题开始日期
+            end_date: 主题结束日期
+            
+        Yields:
+            Dict: 该期间发布的普法文章
+        """
+        # 转换日期为datetime类型（包含整天）
+        day_start = datetime.combine(start_date, datetime.min.time())
+        day_end = datetime.combine(end_date, datetime.max.time())
+        
+        # 跳过近期已经获取过阅读数据的文章
+        fresh_since = get_fresh_since(self.config, 'theme')
+        fresh_conditions, fresh_params = freshness_condition(fresh_since)
+        
+        # 排除永久不可用的文章（被删除、链接有误等）
+        available_conditions, available_params = unavailable_condition(self.config)
+        
+        # 在刷新之前统计跳过的文章（本次刷新过的文章随后也会变成"新鲜"的）
+        skipped = count_fresh_articles(self.db, day_start, day_end, fresh_since, available_conditions, available_params)
+        if skipped:
+            self.fresh_skipped += skipped
+            logger.info(f"跳过 {skipped} 篇 {fresh_since.strftime('%Y-%m-%d %H:%M')} 之后已刷新的文章")
+        
+        count = 0
+        for article in iter_pufa_articles(self.db, day_start, day_end, fresh_conditions + available_conditions,
+                                          fresh_params + available_params, page_size=self.page_size):
+            count += 1
+            yield article
+        
+        logger.info(f"查询到 {count} 篇主题期间的普法文章 "
+                   f"(时间范围: {start_date} 到 {end_date})")
+    
     def get_articles_in_theme_period(self, start_date: datetime, end_date: datetime) -> List[Dict]:
         """
-        获取法律主题期间发布的普法文章
+        获取法律主题期间发布的普法文章（一次性返回列表，供预览使用）
         
         Args:
             start_date: 主题开始日期
@@ -151,68 +229,21 @@ class ThemeReadingUpdater:
         Returns:
             List[Dict]: 该期间发布的普法文章列表
         """
-        # 确保数据库连接有效
-        if not self.db.ensure_connection():
-            logger.error("数据库连接失败，无法查询文章")
-            return []
-        
-        try:
-            with self.db.connection.cursor() as cursor:
-                # 转换日期为datetime类型（包含整天）
-                day_start = datetime.combine(start_date, datetime.min.time())
-                day_end = datetime.combine(end_date, datetime.max.time())
-                
-                # 查询条件：
-                # 1. 是普法文章 (fx_education_articles.type_class = '1')
-                # 2. 发布时间在主题期间内
-                # 3. 有有效的文章URL
-                sql = """
-                SELECT 
-                    ar.id,
-                    ar.article_id,
-                    ar.article_title,
-                    ar.article_url,
-                    ar.publish_time,
-                    ar.unit_name,
-                    ar.view_count,
-                    ar.likes,
-                    ar.thumbs_count,
-                    ea.type_class
-                FROM fx_article_records ar
-                INNER JOIN fx_education_articles ea ON ar.article_id = ea.article_id
-                WHERE ea.type_class = '1'
-                  AND ar.publish_time >= %s
-                  AND ar.publish_time <= %s
-                  AND ar.article_url IS NOT NULL 
-                  AND ar.article_url != ''
-                ORDER BY ar.publish_time DESC
-                """
-                
-                cursor.execute(sql, (day_start, day_end))
-                articles = cursor.fetchall()
-                
-                logger.info(f"查询到 {len(articles)} 篇主题期间的普法文章 "
-                           f"(时间范围: {start_date} 到 {end_date})")
-                
-                return articles
-                
-        except Exception as e:
-            logger.error(f"查询主题期间文章时出错: {e}")
-            return []
+        return list(self.iter_articles_in_theme_period(start_date, end_date))
     
-    def update_article_reading_data(self, article: Dict) -> bool:
+    def update_article_reading_data(self, article: Dict, writer: ReadingStatsWriter = None) -> bool:
         """
         更新单篇文章的阅读量数据
         
         Args:
             article: 文章信息字典
+            writer: 批量写入器，为空时立即写入这一篇
             
         Returns:
-            bool: 更新成功返回True
+            bool: 获取数据成功返回True（数值无变化时不写入数据库）
         """
         try:
             article_url = article['article_url']
-            article_id = article['article_id']
             article_title = article.get('article_title', '无标题')
             
             logger.info(f"更新文章阅读数据: {article_title[:50]}...")
@@ -224,111 +255,134 @@ class ThemeReadingUpdater:
                 logger.warning(f"获取文章数据失败: {error}")
                 return False
             
-            # 确保数据库连接有效
-            if not self.db.ensure_connection():
-                logger.error("数据库连接失败，无法更新文章数据")
-                return False
+            # 交给写入器批量写入（阅读量 -> view_count，在看量 -> likes，点赞量 -> thumbs_count）
+            single_writer = writer is None
+            if single_writer:
+                writer = self._create_writer()
             
-            # 更新数据库
-            with self.db.connection.cursor() as cursor:
-                sql = """
-                UPDATE fx_article_records 
-                SET view_count = %s,
-                    likes = %s,
-                    thumbs_count = %s,
-                    update_time = %s
-                WHERE article_id = %s
-                """
-                
-                current_time = datetime.now()
-                values = (
-                    stats['read'],
-                    stats['zan'],
-                    stats['looking'],
-                    current_time,
-                    article_id
-                )
-                
-                cursor.execute(sql, values)
-                self.db.connection.commit()
-                
-                logger.success(f"文章数据已更新: 阅读{stats['read']} 点赞{stats['zan']} 在看{stats['looking']}")
-                return True
+            writer.add(article, stats)
+            
+            if single_writer:
+                counts = writer.finish()
+                if counts['failed']:
+                    return False
+            
+            logger.success(f"文章数据获取成功: {article_title[:50]} - "
+                         f"阅读:{stats['read']} 在看:{stats['looking']} 点赞:{stats['zan']}")
+            return True
                 
         except Exception as e:
             logger.error(f"更新文章数据时出错: {e}")
-            if self.db.connection:
-                self.db.connection.rollback()
             return False
     
-    def batch_update_articles(self, articles: List[Dict]) -> Tuple[int, int]:
+    def _create_writer(self) -> ReadingStatsWriter:
+        """创建阅读数据批量写入器"""
+        return ReadingStatsWriter(
+            self.db,
+            chunk_size=self.batch_size,
+            summary_max_age_minutes=self.config.get('summary_max_age_minutes', 60)
+        )
+    
+    def _create_retry_queue(self) -> RetryQueue:
+        """创建失败重试队列"""
+        return RetryQueue(self.db, self.max_retries, self.config.get('retry_backoff_seconds'))
+    
+    def _create_budget(self, source: str = 'theme') -> RefreshBudget:
+        """创建刷新预算（配置项 budget，未配置时只记录消费），source 为消费记录的来源"""
+        return RefreshBudget(self.db, self.api_client, self.config.get('budget'), source)
+    
+    def _lease_lost(self) -> Optional[str]:
+        """刷新租约已丢失时返回停止原因 lease_lost（被其他节点接管时停止发起新请求）"""
+        return 'lease_lost' if self.lease is not None and self.lease.lost else None
+    
+    def batch_update_articles(self, articles: Iterable[Dict],
+                              checkpoint: RefreshCheckpoint = None) -> Tuple[int, int]:
         """
         批量更新文章阅读量数据
         
+        并发调用API（共用QPS令牌桶），结果按到达顺序批量写入数据库；
+        临时性错误加入重试队列，处理完后重试已到期的条目
+        
         Args:
-            articles: 文章列表
+            articles: 文章列表或逐页产生文章的生成器
+            checkpoint: 断点，为空时不记录进度
             
         Returns:
             Tuple[int, int]: (成功数量, 总数量)
         """
-        if not articles:
-            logger.info("没有需要更新的文章")
-            return 0, 0
+        logger.info(f"开始批量更新文章的阅读量 (并发数: {self.concurrency})...")
         
-        total_count = len(articles)
-        success_count = 0
+        from refresh_pipeline import RefreshPipeline
+        pipeline = RefreshPipeline(self.api_client, self._create_writer(), self.concurrency,
+                                   self._create_retry_queue(), UnavailableCache(self.db),
+                                   should_stop=self._lease_lost, checkpoint=checkpoint,
+                                   history=self.history, budget=self._create_budget())
+        result = pipeline.run(articles)
         
-        logger.info(f"开始批量更新 {total_count} 篇文章的阅读量...")
+        if result['aborted']:
+            logger.error(f"批量更新因API致命错误中止: {result['aborted']}")
         
-        for i, article in enumerate(articles, 1):
-            try:
-                logger.info(f"处理进度: {i}/{total_count}")
-                
-                if self.update_article_reading_data(article):
-                    success_count += 1
-                
-                # 避免请求过快，每次请求后暂停
-                import time
-                time.sleep(0.5)
-                
-            except Exception as e:
-                logger.error(f"处理第 {i} 篇文章时出错: {e}")
-                continue
+        if result['total'] == 0 and result['retried'] == 0:
+            logger.info("没有需要更新的文章")
+            return 0, 0
         
-        logger.info(f"批量更新完成: 成功 {success_count}/{total_count} 篇")
-        return success_count, total_count
+        logger.info(f"批量更新完成: 成功 {result['success']}/{result['total']} 篇 "
+                   f"(写入 {result['written']} 篇，数值无变化跳过 {result['unchanged']} 篇，"
+                   f"加入重试队列 {result['queued']} 篇，重试成功 {result['retry_success']}/{result['retried']} 篇，"
+                   f"新发现不可用 {result['unavailable']} 篇)")
+        return result['success'], result['total']
     
-    def run_theme_update(self, force_theme_id: int = None) -> bool:
+    def run_theme_update(self, force_theme_id: int = None, resume_run_id: int = None) -> bool:
         """
         执行法律主题月阅读量更新任务
         
         Args:
             force_theme_id: 强制指定主题ID（用于测试）
+            resume_run_id: 续跑的运行ID，使用该运行的主题并跳过已完成的文章
             
         Returns:
             bool: 任务执行成功返回True
         """
+        exporter = None
         try:
             # 检查配置
             if not self.config.get('enabled', True):
                 logger.warning("阅读量更新功能已禁用")
                 return False
             
-            if not self.config.get('api', {}).get('key'):
+            if not (self.config.get('api', {}).get('key') or self.config.get('api', {}).get('keys')):
                 logger.error("API密钥未配置")
                 return False
+
+            # 上次运行的致命错误（余额不足、key错误）可能已经处理，重新允许请求
+            self.api_client.reset()
+            
+            # 同一时间只允许一个进程刷新阅读数据（多个入口、多个节点共用QPS上限）
+            self.lease = JobLease.from_config(self.db, self.config, REFRESH_LEASE)
+            if self.lease and not self.lease.acquire():
+                logger.warning("其他进程正在刷新阅读数据，本次跳过")
+                self.lease = None
+                return False
             
             # 连接数据库
             if not self.db.connect():
                 logger.error("数据库连接失败")
                 return False
             
+            self.fresh_skipped = 0
             start_time = datetime.now()
             logger.info("="*60)
             logger.info("🎯 开始执行法律主题月阅读量更新任务")
             logger.info("="*60)
             logger.info(f"任务开始时间: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
             
+            # 续跑时使用原运行的主题
+            checkpoint = RefreshCheckpoint(self.db, 'theme', self.batch_size)
+            if resume_run_id:
+                if not checkpoint.resume(resume_run_id):
+                    return False
+                force_theme_id = checkpoint.params.get('theme_id')
+            
             # 获取即将结束的主题
             theme = None
             if force_theme_id:
@@ -343,6 +397,11 @@ class ThemeReadingUpdater:
                 theme = self.get_upcoming_theme_end()
             
             if not theme:
+                if resume_run_id:
+                    # 主题已被删除，这次运行无法续跑，结束它以免每次启动都重试
+                    logger.error(f"续跑的刷新运行 {resume_run_id} 对应的主题 {force_theme_id} 不存在")
+                    checkpoint.finish('failed')
+                    return False
                 logger.info("当前没有需要更新的法律主题")
                 return True
             
@@ -350,21 +409,29 @@ class ThemeReadingUpdater:
             logger.info(f"主题年份: {theme['year']}")
             logger.info(f"主题时间范围: {theme['start_date']} 到 {theme['end_date']}")
             
-            # 获取主题期间的普法文章
-            articles = self.get_articles_in_theme_period(
+            if not resume_run_id:
+                checkpoint.start({'theme_id': theme['id']}, start_time)
+            
+            # 逐页获取主题期间的普法文章并批量更新阅读量
+            self.history = RunRecorder('theme')
+            exporter = start_exporter(self.config, 'theme')  # 运行指标（配置项 metrics）
+            articles = self.iter_articles_in_theme_period(
                 theme['start_date'], 
                 theme['end_date']
             )
+            success_count, total_count = self.batch_update_articles(articles, checkpoint)
+            
+            if self._lease_lost():
+                hint = f"（可用 --resume {checkpoint.run_id} 续跑）" if checkpoint.resumable else ""
+                logger.error(f"❌ 刷新租约已丢失，本次运行提前停止{hint}")
+                self.history.status = 'interrupted'
+                return False
             
-            if not articles:
+            if total_count == 0:
                 logger.info(f"主题期间没有普法文章需要更新")
+                self.history.status = 'success'
                 return True
             
-            logger.info(f"找到 {len(articles)} 篇主题期间的普法文章")
-            
-            # 批量更新文章阅读量
-            success_count, total_count = self.batch_update_articles(articles)
-            
             # 统计结果
             end_time = datetime.now()
             duration = end_time - start_time
@@ -377,6 +444,10 @@ class ThemeReadingUpdater:
             logger.info(f"任务结束时间: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
             logger.info(f"执行耗时: {duration}")
             logger.info(f"处理结果: 成功 {success_count}/{total_count} 篇")
+            if self.fresh_skipped:
+                saved_money = self.api_client.estimate_cost(self.fresh_skipped, self.config.get('api', {}).get('cost_per_call'))
+                saved_text = f"约 {saved_money} 元" if saved_money is not None else "金额未知"
+                logger.info(f"近期已刷新跳过: {self.fresh_skipped} 篇 (节省API调用 {self.fresh_skipped} 次，{saved_text})")
             
             if success_count > 0:
                 logger.success(f"✅ 成功更新 {success_count} 篇文章的阅读量")
@@ -384,6 +455,12 @@ class ThemeReadingUpdater:
             if success_count < total_count:
                 logger.warning(f"⚠️ 有 {total_count - success_count} 篇文章更新失败")
             
+            # 致命错误（key错误、余额不足）中止了本次运行
+            if self.api_client.fatal:
+                self.history.status = 'aborted'
+                return False
+            
+            self.history.status = 'success'
             return True
             
         except Exception as e:
@@ -391,8 +468,16 @@ class ThemeReadingUpdater:
             return False
             
         finally:
+            if self.history:
+                self.history.save(self.db)
+                self.history = None
+            if exporter:
+                exporter.stop()
             # 关闭数据库连接
             self.db.disconnect()
+            if self.lease:
+                self.lease.release()
+                self.lease = None
     
     def list_active_themes(self) -> List[Dict]:
         """
@@ -443,6 +528,7 @@ def main():
     parser.add_argument("--list", action="store_true", help="列出所有活动主题")
     parser.add_argument("--theme-id", type=int, help="强制更新指定主题ID的文章（测试用）")
     parser.add_argument("--run", action="store_true", help="执行更新任务")
+    parser.add_argument("--resume", type=int, metavar="RUN_ID", help="续跑被中断的更新任务")
     
     args = parser.parse_args()
     
@@ -480,9 +566,9 @@ def main():
         
         updater.db.disconnect()
     
-    elif args.run or args.theme_id:
+    elif args.run or args.theme_id or args.resume:
         # 执行更新任务
-        success = updater.run_theme_update(force_theme_id=args.theme_id)
+        success = updater.run_theme_update(force_theme_id=args.theme_id, resume_run_id=args.resume)
         if success:
             logger.success("✅ 法律主题更新任务执行成功")
         else:
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+永久不可用文章缓存
+===============
+
+API返回 101（文章被删除或违规或公众号已迁移）、20002/20003（链接有误）的文章
+再次请求也不会成功，这些文章的阅读数据一直为空，会被"阅读量为空"规则每天选中。
+
+这类文章记录到 fx_article_unavailable，选择查询中直接排除；
+超过 recheck_days 天未确认的记录会重新参与一次选择（低频复查），
+复查成功说明文章已恢复，记录会被删除。
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from spider.log.utils import logger
+
+# 永久性错误
+PERMANENT_ERROR_CODES = {'101', '20002', '20003'}
+
+# 不在不可用文章表中（或记录早于复查截止时间）
+AVAILABLE_CONDITION = (
+    "NOT EXISTS (SELECT 1 FROM fx_article_unavailable u "
+    "WHERE u.article_id = ar.article_id AND u.last_checked_at >= %s)"
+)
+
+
+def unavailable_condition(config: Dict, now: datetime = None) -> Tuple[List[str], List]:
+    """
+    生成排除永久不可用文章的查询条件
+
+    配置项 unavailable_recheck_days：记录超过这么多天后重新复查一次，0 表示从不复查
+
+    Args:
+        config: 更新器配置
+        now: 当前时间，默认 datetime.now()
+
+    Returns:
+        Tuple[List[str], List]: (条件列表, 参数列表)
+    """
+    recheck_days = config.get('unavailable_recheck_days', 30)
+    if recheck_days:
+        recheck_before = (now or datetime.now()) - timedelta(days=recheck_days)
+    else:
+        recheck_before = datetime.min
+    return [AVAILABLE_CONDITION], [recheck_before]
+
+
+class UnavailableCache:
+    """永久不可用文章缓存"""
+
+    def __init__(self, db):
+        """
+        初始化缓存
+
+        Args:
+            db: DatabaseManager 实例（由调用方负责连接）
+        """
+        self.db = db
+        self.cached_ids: Optional[Set[str]] = None  # 表中的文章ID（首次使用时加载）
+
+    @staticmethod
+    def is_permanent(code) -> bool:
+        """判断错误码是否为永久性错误"""
+        return str(code) in PERMANENT_ERROR_CODES
+
+    def _load_cached_ids(self) -> Set[str]:
+        """加载表中的文章ID"""
+        if self.cached_ids is None:
+            self.cached_ids = set()
+            try:
+                with self.db.connection.cursor() as cursor:
+                    cursor.execute("SELECT article_id FROM fx_article_unavailable")
+                    self.cached_ids = {row['article_id'] for row in cursor.fetchall()}
+            except Exception as e:
+                logger.warning(f"加载不可用文章列表时出错: {e}")
+        return self.cached_ids
+
+    def mark(self, article: Dict, code, error_msg: str = None) -> bool:
+        """
+        记录一篇永久不可用的文章
+
+        Args:
+            article: 文章信息字典
+            code: 错误码
+            error_msg: 错误信息
+
+        Returns:
+            bool: 是永久性错误并已记录返回True
+        """
+        if not self.is_permanent(code):
+            return False
+
+        article_id = article['article_id']
+        now = datetime.now().replace(microsecond=0)
+
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO fx_article_unavailable
+                        (article_id, error_code, error_msg, check_count, first_seen_at, last_checked_at)
+                    VALUES (%s, %s, %s, 1, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        error_code = VALUES(error_code),
+                        error_msg = VALUES(error_msg),
+                        check_count = check_count + 1,
+                        last_checked_at = VALUES(last_checked_at)
+                    """,
+                    (article_id, str(code), (error_msg or '')[:255], now, now)
+                )
+            self.db.connection.commit()
+            self._load_cached_ids().add(article_id)
+            logger.info(f"文章 {article_id} 标记为不可用 (错误码 {code})，后续刷新将跳过")
+            return True
+
+        except Exception as e:
+            logger.error(f"记录不可用文章时出错: {e}")
+            try:
+                self.db.connection.rollback()
+            except Exception:
+                pass
+            return False
+
+    def clear(self, article_id: str):
+        """
+        复查成功后移除记录（只有在表中的文章才会产生写入）
+
+        Args:
+            article_id: 文章ID
+        """
+        cached_ids = self._load_cached_ids()
+        if article_id not in cached_ids:
+            return
+
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute("DELETE FROM fx_article_unavailable WHERE article_id = %s", (article_id,))
+            self.db.connection.commit()
+            cached_ids.discard(article_id)
+            logger.success(f"文章 {article_id} 已恢复可用，移出不可用列表")
+        except Exception as e:
+            logger.warning(f"移除不可用文章 {article_id} 时出错: {e}")
+
+    def get_status(self) -> Dict[str, int]:
+        """
+        按错误码统计不可用文章数量
+
+        Returns:
+            Dict[str, int]: 错误码 -> 文章数量
+        """
+        if not self.db.ensure_connection():
+            return {}
+
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT error_code, COUNT(*) AS cnt FROM fx_article_unavailable GROUP BY error_code"
+                )
+                return {row['error_code']: int(row['cnt']) for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"统计不可用文章时出错: {e}")
+            return {}
@@ -22,6 +22,10 @@ from typing import List, Dict, Optional
 from spider.log.utils import logger
 from auto_login import AutoLogin
 from database import DatabaseManager
+from job_lease import CRAWL_LEASE, JobLease
+from login_coordinator import LoginCoordinator
+from metrics import WECHAT_REQUESTS, start_exporter
+from run_history import RunRecorder
 from get_cookie import extract_article_content_from_html
 
 # 禁用SSL警告
@@ -41,12 +45,17 @@ class WeChatCrawlerAuto:
     def __init__(self):
         """初始化爬虫"""
         self.auto_login = AutoLogin()
+        self.config = self.auto_login.config  # 爬虫配置（文件修改后自动重新加载）
+        self.login = LoginCoordinator(self.auto_login)  # 重新登录协调器（同一时间只进行一次登录）
         self.db = DatabaseManager()
         self.token = None
         self.cookie_string = None
         self.headers = None
         self.accounts = []
         self.login_time = None  # 记录登录时间
+        self.login_generation = 0  # 正在使用的登录信息对应的协调器登录次数
+        self.lease = None  # 爬虫租约（同一时间只允许一个爬虫进程）
+        self.history = RunRecorder('crawl')  # 分阶段耗时记录
         
     def initialize(self):
         """初始化爬虫，包括登录和数据库连接"""
@@ -55,11 +64,11 @@ class WeChatCrawlerAuto:
         logger.info("="*60)
         
         # 确保登录
-        self.token, self.cookie_string, self.headers = self.auto_login.ensure_login()
-        if not self.token:
+        with self.history.stage('login'):
+            credentials = self.login.ensure()
+        if not self._use_login(credentials):
             logger.error("无法登录，爬虫初始化失败")
             return False
-        self.login_time = datetime.now()  # 记录登录时间
         
         # 加载公众号列表
         self.accounts = self.auto_login.update_accounts_in_config()
@@ -75,42 +84,62 @@ class WeChatCrawlerAuto:
         logger.success("爬虫初始化成功")
         return True
     
+    def _use_login(self, credentials) -> bool:
+        """
+        使用协调器给出的登录信息
+        
+        Args:
+            credentials: (token, cookie_string, headers)
+            
+        Returns:
+            bool: 登录信息是否有效
+        """
+        if not credentials[0]:
+            return False
+        self.token, self.cookie_string, self.headers = credentials
+        self.login_time = self.login.login_time  # 记录登录时间（沿用缓存时为缓存的写入时间）
+        self.login_generation = self.login.generation
+        return True
+    
     def check_and_refresh_login(self) -> bool:
         """
-        检查登录状态，如果超过配置的小时数则自动重新登录
+        检查登录状态，如果超过配置的小时数则在后台发起重新登录
+        
+        登录期间继续使用当前的登录信息，登录完成后自动切换；
+        当前的登录信息在此期间失效时，handle_api_error 会等待登录完成
         
         Returns:
             bool: 登录状态是否有效
         """
-        if self.login_time:
+        # 后台登录已完成时切换到新的登录信息（token 相同时也要更新登录时间）
+        if self.login.credentials[0] and self.login.generation != self.login_generation:
+            self._use_login(self.login.credentials)
+            logger.success("✅ 重新登录成功，已切换到新的登录信息")
+        
+        if self.login_time and not self.login.logging_in:
             elapsed_hours = (datetime.now() - self.login_time).total_seconds() / 3600
             
-            # 从配置文件读取登录缓存时间，默认为89小时
-            config = self.auto_login.load_config()
-            login_cache_hours = config.get('login_cache_hours', 89)
+            # 登录缓存时间，默认为89小时
+            login_cache_hours = self.config.login_cache_hours
             
             if elapsed_hours >= login_cache_hours:
                 logger.warning(f"登录已超过{login_cache_hours}小时({elapsed_hours:.1f}小时)，开始自动重新登录...")
                 logger.error("⚠️⚠️⚠️ Token即将过期！请立即扫码重新登录！⚠️⚠️⚠️")
                 logger.info("★★★ 请在浏览器中扫码重新登录 ★★★")
-                logger.info("🔔 浏览器窗口将保持打开状态，直到您完成登录...")
-                self.token, self.cookie_string, self.headers = self.auto_login.ensure_login()
-                if self.token:
-                    self.login_time = datetime.now()
-                    logger.success("✅ 重新登录成功，继续爬取")
-                    return True
-                else:
-                    logger.error("❌ 重新登录失败")
-                    return False
+                logger.info("🔔 浏览器窗口将保持打开状态，直到您完成登录，期间继续使用当前登录信息爬取...")
+                self.history.count('relogins')
+                # 强制扫码登录：沿用缓存只会拿回同一份即将到期的登录信息
+                self.login.refresh(stale_token=self.token, wait=False, force=True)
         return True
     
-    def handle_api_error(self, response_data: dict, account_name: str = "") -> bool:
+    def handle_api_error(self, response_data: dict, account_name: str = "", endpoint: str = "") -> bool:
         """
         处理API响应错误，检查是否需要重新登录
         
         Args:
             response_data: API响应数据
             account_name: 当前处理的公众号名称
+            endpoint: 请求的接口（searchbiz、appmsg），用于请求计数
             
         Returns:
             bool: 是否需要重新登录并已成功重新登录
@@ -118,6 +147,13 @@ class WeChatCrawlerAuto:
         base_resp = response_data.get('base_resp', {}) if isinstance(response_data, dict) else {}
         ret = base_resp.get('ret', None)
         err_msg = base_resp.get('err_msg') or base_resp.get('errmsg')
+        WECHAT_REQUESTS.inc(endpoint=endpoint, ret=ret)
+        if ret not in (None, 0):
+            self.history.error(ret)
+        
+        # 请求成功，更新登录信息的最近成功时间（各入口启动时据此跳过验证请求）
+        if ret == 0:
+            self.auto_login.login_manager.mark_good()
         
         # 检测登录失效错误码
         if ret in [200003, 200013]:  # invalid session 或未登录
@@ -125,9 +161,11 @@ class WeChatCrawlerAuto:
             logger.error("⚠️⚠️⚠️ 登录失效！请立即扫码重新登录！⚠️⚠️⚠️")
             logger.info("★★★ 请在浏览器中扫码重新登录 ★★★")
             logger.info("🔔 浏览器窗口将保持打开状态，直到您完成登录...")
-            self.token, self.cookie_string, self.headers = self.auto_login.ensure_login()
-            if self.token:
-                self.login_time = datetime.now()
+            self.history.count('relogins')
+            # 已有登录在进行时等待同一次登录；缓存的登录信息标记为失效，登录时不再信任最近成功时间
+            with self.history.stage('login'):
+                credentials = self.login.refresh(stale_token=self.token, rejected=True)
+            if self._use_login(credentials):
                 logger.success("✅ 重新登录成功，继续爬取")
                 return True
             else:
@@ -164,6 +202,7 @@ class WeChatCrawlerAuto:
         }
         
         try:
+            started = time.perf_counter()
             response = requests.get(
                 search_url, 
                 headers=self.headers,
@@ -172,12 +211,13 @@ class WeChatCrawlerAuto:
                 timeout=30,
                 proxies={}  # 禁用代理
             )
+            self.history.add('search', time.perf_counter() - started, size=len(response.content))
             
             if response.status_code == 200:
                 data = response.json()
                 
                 # 检查是否需要重新登录
-                if self.handle_api_error(data, account_name) and retry_count < 1:
+                if self.handle_api_error(data, account_name, 'searchbiz') and retry_count < 1:
                     # 重新登录成功，重试搜索
                     return self.search_account(account_name, retry_count + 1)
                 
@@ -191,9 +231,13 @@ class WeChatCrawlerAuto:
                     logger.warning(f"未找到公众号: {account_name}")
             else:
                 logger.error(f"搜索公众号失败，状态码: {response.status_code}")
+                self.history.error(f"http_{response.status_code}")
+                WECHAT_REQUESTS.inc(endpoint='searchbiz', ret=f"http_{response.status_code}")
                 
         except Exception as e:
             logger.error(f"搜索公众号时出错: {e}")
+            self.history.error(type(e).__name__)
+            WECHAT_REQUESTS.inc(endpoint='searchbiz', ret=type(e).__name__)
         
         return None
     
@@ -214,16 +258,23 @@ class WeChatCrawlerAuto:
                 'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
             }
             
+            started = time.perf_counter()
             response = requests.get(url, headers=headers, timeout=30, verify=False, proxies={})
+            self.history.add('body_fetch', time.perf_counter() - started, size=len(response.content))
+            WECHAT_REQUESTS.inc(endpoint='article', ret=f"http_{response.status_code}")
             if response.status_code == 200:
-                content_data = extract_article_content_from_html(response.text)
+                with self.history.stage('extract'):
+                    content_data = extract_article_content_from_html(response.text)
                 return content_data.get('content', '获取内容失败')
             else:
                 logger.warning(f"获取文章内容失败，状态码: {response.status_code}")
+                self.history.error(f"http_{response.status_code}")
                 return "获取内容失败"
                 
         except Exception as e:
             logger.error(f"获取文章内容时出错: {e}")
+            self.history.error(type(e).__name__)
+            WECHAT_REQUESTS.inc(endpoint='article', ret=type(e).__name__)
             return "获取内容失败"
     
     def crawl_account_articles(self, account_name: str, fakeid: str, max_articles: int = 50, retry_count: int = 0) -> List[Dict]:
@@ -243,9 +294,8 @@ class WeChatCrawlerAuto:
         logger.info(f"开始爬取公众号: {account_name}")
         
         # 获取配置参数
-        config = self.auto_login.load_config()
-        crawl_days = config.get('crawl_days', 7)  # 包含今天至当前时刻 + 前 N 个完整自然日
-        article_interval = config.get('article_interval', [2, 5])  # 文章间隔时间
+        crawl_days = self.config.crawl_days  # 包含今天至当前时刻 + 前 N 个完整自然日
+        article_interval = self.config.article_interval  # 文章间隔时间
         
         # 计算时间范围：从今天00:00往前推 N 天（完整自然日），再加上今天至当前时刻
         now = datetime.now()
@@ -279,6 +329,7 @@ class WeChatCrawlerAuto:
             }
             
             try:
+                started = time.perf_counter()
                 response = requests.get(
                     url,
                     headers=self.headers,
@@ -287,12 +338,13 @@ class WeChatCrawlerAuto:
                     timeout=30,
                     proxies={}  # 禁用代理
                 )
+                self.history.add('list_page', time.perf_counter() - started, size=len(response.content))
                 
                 if response.status_code == 200:
                     data = response.json()
                     
                     # 检查是否需要重新登录
-                    if self.handle_api_error(data, account_name) and retry_count < 1:
+                    if self.handle_api_error(data, account_name, 'appmsg') and retry_count < 1:
                         # 重新登录成功，重新开始爬取这个公众号
                         return self.crawl_account_articles(account_name, fakeid, max_articles, retry_count + 1)
                     
@@ -323,17 +375,25 @@ class WeChatCrawlerAuto:
                         if article_data['url']:
                             logger.info(f"正在检查文章: {article_data['title']}")
                             
-                            # 获取映射后的单位名称（用于标题去重）
-                            unit_name = self.db.get_unit_name(account_name)
+                            with self.history.stage('db_check'):
+                                # 获取映射后的单位名称（用于标题去重）
+                                unit_name = self.db.get_unit_name(account_name)
+                                
+                                # 检查文章URL是否已存在
+                                url_exists = self.db.check_article_exists(article_data['url'])
+                                
+                                # 检查文章标题是否已存在
+                                title_exists = not url_exists and bool(article_data['title']) and \
+                                    self.db.check_article_exists_by_title(article_data['title'], unit_name)
                             
-                            # 检查文章URL是否已存在
-                            if self.db.check_article_exists(article_data['url']):
+                            if url_exists:
                                 logger.info(f"文章URL已存在，跳过: {article_data['title']}")
+                                self.history.count('articles_skipped')
                                 continue
                             
-                            # 检查文章标题是否已存在
-                            if article_data['title'] and self.db.check_article_exists_by_title(article_data['title'], unit_name):
+                            if title_exists:
                                 logger.info(f"文章标题已存在，跳过: {article_data['title']} (单位: {unit_name})")
+                                self.history.count('articles_skipped')
                                 continue
                             
                             logger.info(f"正在获取文章全文: {article_data['title']}")
@@ -342,8 +402,11 @@ class WeChatCrawlerAuto:
                             article_data['content'] = content
                             
                             # 实时保存到数据库
-                            if self.db.insert_article(article_data):
+                            with self.history.stage('db_write'):
+                                saved = self.db.insert_article(article_data)
+                            if saved:
                                 articles.append(article_data)
+                                self.history.count('items')
                                 logger.success(f"文章已保存: {article_data['title']}")
                             
                             # 使用配置的文章间隔时间
@@ -353,10 +416,14 @@ class WeChatCrawlerAuto:
                         
                 else:
                     logger.error(f"获取文章列表失败，状态码: {response.status_code}")
+                    self.history.error(f"http_{response.status_code}")
+                    WECHAT_REQUESTS.inc(endpoint='appmsg', ret=f"http_{response.status_code}")
                     break
                     
             except Exception as e:
                 logger.error(f"获取文章列表时出错: {e}")
+                self.history.error(type(e).__name__)
+                WECHAT_REQUESTS.inc(endpoint='appmsg', ret=type(e).__name__)
                 break
             
             # 批次间延时
@@ -371,25 +438,30 @@ class WeChatCrawlerAuto:
         success_accounts = 0
         
         # 获取配置参数
-        config = self.auto_login.load_config()
-        account_interval = config.get('account_interval', [10, 20])  # 公众号间隔时间
+        account_interval = self.config.account_interval  # 公众号间隔时间
         
         logger.info(f"开始爬取 {len(self.accounts)} 个公众号")
         
         for i, account_name in enumerate(self.accounts, 1):
+            if self.lease and self.lease.lost:
+                logger.error(f"爬虫租约已丢失，停止爬取（已处理 {i - 1}/{len(self.accounts)} 个公众号）")
+                return
+            
             logger.info(f"\n处理第 {i}/{len(self.accounts)} 个公众号: {account_name}")
             
             # 搜索公众号获取fakeid
+            self.history.count('accounts')
             fakeid = self.search_account(account_name)
             if not fakeid:
                 logger.warning(f"跳过公众号: {account_name}")
+                self.history.count('accounts_not_found')
                 continue
             
             # 爬取文章
             articles = self.crawl_account_articles(
                 account_name, 
                 fakeid,
-                max_articles=self.auto_login.load_config().get('max_articles_per_account', 50)
+                max_articles=self.config.max_articles_per_account
             )
             
             if articles:
@@ -415,23 +487,52 @@ class WeChatCrawlerAuto:
         
         logger.info("="*60)
     
-    def run(self):
-        """运行爬虫"""
+    def run(self) -> bool:
+        """
+        运行爬虫
+        
+        Returns:
+            bool: 爬取正常完成返回True
+        """
+        self.history = RunRecorder('crawl')
+        exporter = start_exporter(self.config.data, 'crawl')  # 运行指标（配置项 metrics）
         try:
+            # 同一时间只允许一个爬虫进程（多个节点共用同一个公众号登录）
+            self.lease = JobLease.from_config(self.db, self.config.data, CRAWL_LEASE)
+            if self.lease and not self.lease.acquire():
+                logger.warning("其他进程正在爬取，本次跳过")
+                self.lease = None
+                return False
+            
             # 初始化
             if not self.initialize():
-                return
+                return False
             
             # 开始爬取
             self.crawl_all_accounts()
+            if self.lease and self.lease.lost:
+                self.history.status = 'interrupted'
+                return False
+            self.history.status = 'success'
+            return True
             
         except KeyboardInterrupt:
             logger.warning("用户中断爬虫")
+            self.history.status = 'interrupted'
+            return False
         except Exception as e:
             logger.error(f"爬虫运行出错: {e}")
+            return False
         finally:
             # 清理资源
+            if self.db.connection:
+                self.history.save(self.db)
             self.db.disconnect()
+            if self.lease:
+                self.lease.release()
+                self.lease = None
+            if exporter:
+                exporter.stop()
             logger.info("爬虫已停止")
     
     def test_single_account(self, account_name: str):
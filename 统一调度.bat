@@ -0,0 +1,11 @@
+@echo off
+chcp 65001 >nul
+echo ========================================
+echo    微信公众号爬虫 - 统一任务调度器
+echo ========================================
+echo.
+echo 爬虫、阅读数据刷新、Token监控统一按 job_scheduler_config.json 调度
+echo 按 Ctrl+C 可以停止程序
+echo.
+.\venv\Scripts\python.exe job_scheduler.py
+pause
\ No newline at end of file